@@ -0,0 +1,374 @@
+"""
+adaptive.py
+
+Adaptive quiz mode: picks each question for the player's estimated ability.
+
+Items follow the two-parameter logistic (2PL) response model: a player of
+ability theta answers an item of difficulty b and discrimination a correctly
+with probability 1 / (1 + exp(-a * (theta - b))). The item that tells us most
+about a player is the one with the highest Fisher information
+a^2 * p * (1 - p). That is an item whose difficulty is close to theta, and
+the more discriminating the better.
+
+An ItemPool keeps every item in a difficulty bucket. Each bucket holds its
+items in a list sorted by discrimination, so a selection does not scan the
+bank. It looks up the bucket holding theta in O(1), takes the first unasked
+item from that bucket and its neighbours, and keeps the most informative one.
+A selection reads at most a few buckets, each to the depth of the questions
+already asked, whatever the size of the bank. Answers update the item's
+estimates with one stochastic-gradient step on the 2PL likelihood. The step
+shrinks as the item gathers responses. The item then moves to its new place
+with a bisect. Items are updated when a quiz ends, against the player's
+final ability estimate.
+
+Estimates can be seeded from graded history (see grading.Grader.question_stats)
+and are refined by every answer that streams in afterwards.
+
+Usage:
+    python adaptive.py BANK_FILE    Play an adaptive quiz from a question bank.
+
+Classes:
+	ItemPool: Difficulty-bucketed item statistics shared by adaptive quizzes.
+	AdaptiveQuiz: Quiz that asks the most informative question for the current ability estimate.
+
+Functions:
+	probability(theta, difficulty, discrimination): 2PL chance of a correct answer.
+"""
+
+import bisect
+import math
+import sys
+
+from quiz import Quiz
+
+# Difficulty range covered by buckets; items outside fall into the end buckets
+LOW = -4.0
+HIGH = 4.0
+BUCKET_WIDTH = 0.25
+
+# Bounds that keep discrimination estimates sane on few responses
+MIN_DISCRIMINATION = 0.2
+MAX_DISCRIMINATION = 4.0
+
+# Step size of item updates, shrinking as 1 / sqrt(1 + responses / RATE_RESPONSES)
+LEARNING_RATE = 0.4
+MIN_RATE = 0.01
+RATE_RESPONSES = 10
+# Discrimination is harder to pin down than difficulty, so it moves more slowly
+DISCRIMINATION_RATE = 0.25
+
+
+def probability(theta, difficulty, discrimination):
+    """
+    Return the 2PL probability of a correct answer.
+
+    Args:
+        theta (float): Player ability.
+        difficulty (float): Item difficulty b.
+        discrimination (float): Item discrimination a.
+    Returns:
+        float: Probability between 0 and 1.
+    """
+    z = discrimination * (theta - difficulty)
+    if z >= 0:
+        return 1 / (1 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1 + e)
+
+
+class ItemPool:
+    """
+    Item statistics indexed by difficulty bucket.
+
+    Attributes:
+        ids (list): Question id of each item.
+        difficulty (list): Difficulty estimate of each item.
+        discrimination (list): Discrimination estimate of each item.
+        responses (list): Answers recorded for each item.
+        bucket_width (float): Width of a difficulty bucket, in logits.
+    """
+
+    def __init__(self, ids, bucket_width=BUCKET_WIDTH):
+        """
+        Index items with difficulty 0 and discrimination 1.
+
+        Args:
+            ids (iterable): Question ids.
+            bucket_width (float, optional): Bucket width. Defaults to BUCKET_WIDTH.
+        """
+        self.ids = list(ids)
+        count = len(self.ids)
+        self.difficulty = [0.0] * count
+        self.discrimination = [1.0] * count
+        self.responses = [0] * count
+        self.bucket_width = bucket_width
+        self._positions = {qid: position for position, qid in enumerate(self.ids)}
+        # One list per bucket of (-discrimination, position), most discriminating first
+        self._buckets = []
+        self._bucket_of = [0] * count
+        self._reindex()
+
+    def __len__(self):
+        """int: Number of items."""
+        return len(self.ids)
+
+    def position(self, question_id):
+        """
+        Return the position of a question in the pool.
+
+        Args:
+            question_id (int): Question id.
+        Returns:
+            int: Item position, or None if the question is not in the pool.
+        """
+        return self._positions.get(question_id)
+
+    def _bucket(self, difficulty):
+        """
+        Return the bucket index holding a difficulty.
+
+        Args:
+            difficulty (float): Difficulty in logits.
+        Returns:
+            int: Bucket index, clamped to the end buckets.
+        """
+        index = int((difficulty - LOW) // self.bucket_width)
+        return min(max(index, 0), len(self._buckets) - 1)
+
+    def _reindex(self):
+        """Rebuild every bucket from the current estimates."""
+        self._buckets = [[] for _ in range(math.ceil((HIGH - LOW) / self.bucket_width))]
+        for position, difficulty in enumerate(self.difficulty):
+            bucket = self._bucket(difficulty)
+            self._bucket_of[position] = bucket
+            self._buckets[bucket].append((-self.discrimination[position], position))
+        for items in self._buckets:
+            items.sort()
+
+    def _insert(self, position):
+        """Put an item into the bucket of its current difficulty."""
+        bucket = self._bucket(self.difficulty[position])
+        self._bucket_of[position] = bucket
+        bisect.insort(self._buckets[bucket], (-self.discrimination[position], position))
+
+    def _remove(self, position):
+        """Take an item out of its bucket."""
+        items = self._buckets[self._bucket_of[position]]
+        del items[bisect.bisect_left(items, (-self.discrimination[position], position))]
+
+    def information(self, position, theta):
+        """
+        Return the Fisher information an item gives at an ability.
+
+        Args:
+            position (int): Item position.
+            theta (float): Player ability.
+        Returns:
+            float: a^2 * p * (1 - p).
+        """
+        a = self.discrimination[position]
+        p = probability(theta, self.difficulty[position], a)
+        return a * a * p * (1 - p)
+
+    def select(self, theta, asked=()):
+        """
+        Return the most informative unasked item near an ability.
+
+        The bucket holding theta and the buckets around it are searched
+        outwards until one yields an item; one more ring is then compared,
+        since theta may sit at the edge of its bucket.
+
+        Args:
+            theta (float): Player ability.
+            asked (set, optional): Positions to skip. Defaults to none.
+        Returns:
+            int: Item position, or None if every item was asked.
+        """
+        buckets = self._buckets
+        center = self._bucket(theta)
+        best = None
+        best_information = -1.0
+        last_ring = False
+        for distance in range(len(buckets)):
+            for index in {center - distance, center + distance}:
+                if 0 <= index < len(buckets):
+                    for _, position in buckets[index]:
+                        if position not in asked:
+                            information = self.information(position, theta)
+                            if information > best_information:
+                                best, best_information = position, information
+                            break
+            if best is not None:
+                if last_ring:
+                    break
+                last_ring = True
+            if center - distance <= 0 and center + distance >= len(buckets) - 1:
+                break
+        return best
+
+    def calibrate(self, question_id, attempts, correct):
+        """
+        Seed estimates from graded history, e.g. grading.Grader.question_stats().
+
+        Difficulty is set to minus the logit of the smoothed fraction correct,
+        which is the 2PL difficulty for a = 1 and abilities centered on 0.
+
+        Args:
+            question_id (iterable): Question ids.
+            attempts (iterable): Answers graded per question.
+            correct (iterable): Correct answers per question.
+        """
+        for qid, tries, right in zip(question_id, attempts, correct):
+            position = self._positions.get(int(qid))
+            if position is None:
+                continue
+            fraction = (int(right) + 0.5) / (int(tries) + 1)
+            self.difficulty[position] = -math.log(fraction / (1 - fraction))
+            self.responses[position] += int(tries)
+        self._reindex()
+
+    def update(self, position, theta, correct):
+        """
+        Refine an item's estimates with one answer.
+
+        Args:
+            position (int): Item position.
+            theta (float): Ability of the player who answered.
+            correct (bool): Whether the answer was correct.
+        """
+        a = self.discrimination[position]
+        b = self.difficulty[position]
+        residual = correct - probability(theta, b, a)
+        rate = max(MIN_RATE, LEARNING_RATE / math.sqrt(1 + self.responses[position] / RATE_RESPONSES))
+        self._remove(position)
+        self.difficulty[position] = b - rate * a * residual
+        self.discrimination[position] = min(MAX_DISCRIMINATION, max(
+            MIN_DISCRIMINATION, a + DISCRIMINATION_RATE * rate * (theta - b) * residual))
+        self.responses[position] += 1
+        self._insert(position)
+
+
+class AdaptiveQuiz(Quiz):
+    """
+    A quiz that asks the most informative question for the player's estimated ability.
+
+    The ability estimate starts at 0 with a standard normal prior. Each
+    answer moves it by a * (correct - p) divided by the information gathered
+    so far, the online form of the posterior-mode update. The quiz ends
+    after max_questions, or earlier once the standard error falls below
+    target_error, and its answers then update the items in the pool.
+
+    Attributes:
+        pool (ItemPool): Item statistics, shareable between quizzes.
+        theta (float): Current ability estimate.
+        information (float): Prior plus Fisher information gathered so far.
+        max_questions (int): Most questions asked.
+        min_questions (int): Questions asked before stopping early.
+        target_error (float): Standard error that ends the quiz early.
+        learn (bool): Whether answers update the pool's item estimates when the quiz ends.
+    """
+
+    def __init__(self, question_data, pool=None, max_questions=20, min_questions=5,
+                 target_error=0.3, learn=True):
+        """
+        Initialize an adaptive quiz.
+
+        Args:
+            question_data: A QuestionBank, whose questions are fetched by id
+                when asked, or a list of question dictionaries.
+            pool (ItemPool, optional): Shared item statistics. Defaults to a
+                new pool over question_data.
+            max_questions (int, optional): Most questions asked. Defaults to 20.
+            min_questions (int, optional): Questions before stopping early. Defaults to 5.
+            target_error (float, optional): Standard error that ends the quiz. Defaults to 0.3.
+            learn (bool, optional): Update item estimates from the answers when
+                the quiz ends. Defaults to True.
+        """
+        super().__init__(question_data)
+        if isinstance(question_data, (list, tuple)):
+            ids = [question.get('id', position) for position, question in enumerate(question_data)]
+            by_id = dict(zip(ids, question_data))
+            self._fetch = by_id.get
+        else:
+            ids = None
+            self._fetch = question_data.get
+        self.pool = pool if pool is not None else ItemPool(
+            ids if ids is not None else question_data.ids())
+        self.theta = 0.0
+        self.information = 1.0
+        self.max_questions = max_questions
+        self.min_questions = min_questions
+        self.target_error = target_error
+        self.learn = learn
+        self._asked = set()
+        self._current = None
+        # (position, correct) answers not yet fed back to the pool
+        self._responses = []
+
+    @property
+    def standard_error(self):
+        """float: Standard error of the ability estimate."""
+        return 1 / math.sqrt(self.information)
+
+    def _next_question(self):
+        """
+        Pick the most informative unasked question for the current estimate.
+
+        Returns:
+            dict: The next question dictionary, or None when the quiz is over.
+        """
+        asked = len(self._asked)
+        position = None
+        if asked < self.max_questions and (
+                asked < self.min_questions or self.standard_error > self.target_error):
+            position = self.pool.select(self.theta, self._asked)
+        if position is None:
+            self.finish()
+            return None
+        self._asked.add(position)
+        self._current = position
+        return self._fetch(self.pool.ids[position])
+
+    def check_answer(self, question, answer):
+        """
+        Score an answer and update the ability estimate.
+
+        Args:
+            question (dict): The question being answered, as returned by get_next_question().
+            answer (str or int): The 1-based number of the chosen answer.
+        Returns:
+            bool: True if the answer is correct.
+        """
+        correct = super().check_answer(question, answer)
+        position = self.pool.position(question['id']) if 'id' in question else self._current
+        pool = self.pool
+        a = pool.discrimination[position]
+        p = probability(self.theta, pool.difficulty[position], a)
+        if self.learn:
+            self._responses.append((position, correct))
+        item_information = a * a * p * (1 - p)
+        self.theta += a * (correct - p) / (self.information + item_information)
+        self.information += item_information
+        return correct
+
+    def finish(self):
+        """
+        Feed the quiz's answers back into the pool's item estimates.
+
+        Items are updated against the final ability estimate, which is far
+        better than the estimate at the time each question was asked.
+        get_next_question() calls this when the quiz ends; later calls do
+        nothing.
+        """
+        for position, correct in self._responses:
+            self.pool.update(position, self.theta, correct)
+        self._responses.clear()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python adaptive.py BANK_FILE")
+    from questionbank import QuestionBank  # pylint: disable=import-outside-toplevel
+    quiz = AdaptiveQuiz(QuestionBank(sys.argv[1]))
+    quiz.play()
+    print(f"Estimated ability: {quiz.theta:+.2f} (standard error {quiz.standard_error:.2f})")
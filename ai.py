@@ -0,0 +1,286 @@
+"""
+ai.py
+
+Computer opponents for Tic Tac Toe, independent of any GUI.
+
+Each strategy takes an engine (BitBoard or MNKBoard) and returns the cell to
+play, so the same opponent drives the tkinter game, the game server and the
+simulators.
+
+computer_move() keeps the outcome of each evaluation in a shared MoveCache
+keyed by the engine type, the player to move, the board shape and the
+engine's position_key(), so positions that recur across games,
+sessions and server connections are evaluated once. For the heuristic the
+cache holds the candidate cells the rules settle on rather than the final
+pick, so random tie-breaks are drawn exactly as without the cache. MCTS
+moves are budgeted searches that differ from run to run, while tablebase
+and policy moves are a single lookup or forward pass, so none of them is
+cached.
+
+Functions:
+	heuristic_options(engine, player): Cells the heuristic chooses between, and whether it picks at random.
+	heuristic_move(engine, player, rng): Rule-based move (win, block, center, corner, edge).
+	perfect_move(engine): Optimal move from the shared solver.
+	book_move(engine): Optimal move from the shared opening book.
+	mcts_move(engine, player, rng): Move from the shared Monte Carlo Tree Search player.
+	tablebase_move(engine): Optimal move from the endgame tablebase for the board shape.
+	policy_move(engine, player): Move from the self-play policy network for the board shape.
+	available(ai, rows, cols, k): Check if a strategy plays on a board shape.
+	computer_move(engine, player, ai, rng, cache): Dispatch to the strategy named by ai.
+"""
+
+import os
+import random
+
+from solver import get_solver
+from book import load_book
+from cache import MoveCache
+from mcts import get_player
+
+STRATEGIES = ('heuristic', 'perfect', 'book', 'mcts', 'tablebase', 'policy')
+# Strategies that play on any m,n,k board; 'tablebase' and 'policy' need a
+# small board or a prebuilt file, and the others the 3x3 solver
+ANY_BOARD = ('heuristic', 'mcts')
+
+# Evaluations shared by every game in the process
+MOVE_CACHE = MoveCache()
+
+
+def heuristic_options(engine, player):
+    """
+    Apply the heuristic rules without making the final random pick.
+
+    Args:
+        engine: BitBoard or MNKBoard holding the position.
+        player (int): X or O, the player to move.
+    Returns:
+        tuple: (cells, randomize) where cells is a tuple of equally good cells
+            and randomize says whether to draw one at random; cells is empty
+            if no moves are left.
+    """
+    # Every empty cell on 3x3, the cells near existing marks on larger boards
+    possible_moves = engine.candidate_moves()
+
+    if not possible_moves:
+        return (), False
+
+    # Check for winning move or blocking opponent's win
+    for symbol in (player, 1 - player):
+        for cell in possible_moves:
+            if engine.wins_with(cell, symbol):
+                return (cell,), False
+
+    # Take center if available
+    if engine.center in possible_moves:
+        return (engine.center,), False
+
+    # Take corners
+    corners = tuple(cell for cell in possible_moves if cell in engine.corners)
+    if corners:
+        return corners, True
+
+    # Take edges
+    edges = tuple(cell for cell in possible_moves if cell in engine.edges)
+    if edges:
+        return edges, True
+
+    # Take any candidate (only reached on boards larger than 3x3)
+    return tuple(possible_moves), True
+
+
+def _pick(options, rng):
+    """
+    Turn heuristic_options() output into a move.
+
+    Args:
+        options (tuple): (cells, randomize) from heuristic_options().
+        rng (random.Random): Random source for tie-breaks.
+    Returns:
+        int: Cell index of the move, or None if no moves left.
+    """
+    cells, randomize = options
+    if not cells:
+        return None
+    if randomize:
+        return cells[rng.randint(0, len(cells)-1)]
+    return cells[0]
+
+
+def heuristic_move(engine, player, rng=random):
+    """
+    Decide a move using basic rules.
+
+    The rules are applied in order:
+    1. Win if possible
+    2. Block opponent's win
+    3. Take center if free
+    4. Take a corner if free
+    5. Take any edge
+    6. Take any cell next to a mark (larger boards only)
+
+    Args:
+        engine: BitBoard or MNKBoard holding the position.
+        player (int): X or O, the player to move.
+        rng (random.Random, optional): Random source for tie-breaks.
+            Defaults to the global random module.
+    Returns:
+        int: Cell index of the move, or None if no moves left.
+    """
+    return _pick(heuristic_options(engine, player), rng)
+
+
+def perfect_move(engine):
+    """
+    Decide a move with the shared perfect-play solver.
+
+    Args:
+        engine (BitBoard): The 3x3 position.
+    Returns:
+        int: Cell index of the move, or None if the game is over.
+    """
+    return get_solver().best_move(engine)
+
+
+def book_move(engine):
+    """
+    Look up a move in the shared opening book.
+
+    Positions the book does not hold, because they cannot be reached from
+    the empty board, are solved directly.
+
+    Args:
+        engine (BitBoard): The 3x3 position.
+    Returns:
+        int: Cell index of the move, or None if the game is over.
+    """
+    entry = load_book().entry(engine)
+    if entry is None:
+        return perfect_move(engine)
+    return entry[1]
+
+
+def mcts_move(engine, player, rng=random):
+    """
+    Decide a move with the shared Monte Carlo Tree Search player.
+
+    Args:
+        engine: BitBoard or MNKBoard holding the position.
+        player (int): X or O, the player to move.
+        rng (random.Random, optional): Source of the search seeds.
+            Defaults to the global random module.
+    Returns:
+        int: Cell index of the move, or None if no moves left.
+    """
+    return get_player().best_move(engine, player, rng)
+
+
+def tablebase_move(engine):
+    """
+    Look up a move in the endgame tablebase for the engine's board shape.
+
+    The tablebase is generated on first use if its file does not exist.
+
+    Args:
+        engine: BitBoard, GameState or MNKBoard holding the position.
+    Returns:
+        int: Cell index of the move, or None if the game is over.
+    """
+    # Imported on first use so the other strategies load without NumPy
+    from tablebase import load_tablebase  # pylint: disable=import-outside-toplevel
+    return load_tablebase(engine.rows, engine.cols, engine.k).best_move(engine)
+
+
+def policy_move(engine, player):
+    """
+    Decide a move with the policy network for the engine's board shape.
+
+    The network is trained by self-play on first use if its file does not
+    exist, which is only done for boards of up to policy.MAX_AUTO_CELLS cells
+    and blocks the call for about 5-11 s on one CPU.
+
+    Args:
+        engine: BitBoard, GameState or MNKBoard holding the position.
+        player (int): X or O, the player to move.
+    Returns:
+        int: Cell index of the move, or None if no moves left.
+    """
+    # Imported on first use so the other strategies load without NumPy
+    from policy import load_policy  # pylint: disable=import-outside-toplevel
+    return load_policy(engine.rows, engine.cols, engine.k).best_move(engine, player)
+
+
+def available(ai, rows, cols, k):
+    """
+    Check if a strategy can play on a board shape.
+
+    Args:
+        ai (str): Strategy name.
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        bool: True if computer_move() supports ai on the board.
+    """
+    if ai in ANY_BOARD:
+        return True
+    if ai == 'tablebase':
+        # Mirrors tablebase.MAX_AUTO_CELLS without importing NumPy
+        return rows * cols <= 16
+    if ai == 'policy':
+        # Mirrors policy.MAX_AUTO_CELLS and policy.default_path() without importing NumPy
+        return rows * cols <= 16 or os.path.exists(os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), f'policy_{rows}x{cols}k{k}.npz'))
+    return (rows, cols, k) == (3, 3, 3)
+
+
+def computer_move(engine, player, ai='heuristic', rng=random, cache=MOVE_CACHE):
+    """
+    Decide a move with the named strategy.
+
+    Heuristic and solver evaluations are looked up in, and added to, cache.
+    The opening book is already a table lookup and bypasses it.
+
+    Args:
+        engine: BitBoard or MNKBoard holding the position.
+        player (int): X or O, the player to move.
+        ai (str, optional): 'heuristic', 'perfect', 'book', 'mcts',
+            'tablebase' or 'policy'. Defaults to 'heuristic'.
+        rng (random.Random, optional): Random source for the heuristic and MCTS.
+            Defaults to the global random module.
+        cache (MoveCache, optional): Evaluation cache, or None to disable
+            caching. Defaults to the shared MOVE_CACHE.
+    Returns:
+        int: Cell index of the move, or None if no moves left.
+    Raises:
+        ValueError: If ai is not a known strategy.
+    """
+    if ai == 'heuristic':
+        if cache is None:
+            return heuristic_move(engine, player, rng)
+        key = (ai, type(engine).__name__, player, engine.rows, engine.cols, engine.k,
+               engine.position_key())
+        options = cache.get(key)
+        if options is None:
+            options = heuristic_options(engine, player)
+            cache.put(key, options)
+        return _pick(options, rng)
+    if ai == 'perfect':
+        if cache is None:
+            return perfect_move(engine)
+        key = (ai, type(engine).__name__, player, engine.rows, engine.cols, engine.k,
+               engine.position_key())
+        move = cache.get(key)
+        if move is None:
+            move = perfect_move(engine)
+            if move is not None:
+                cache.put(key, move)
+        return move
+    if ai == 'book':
+        return book_move(engine)
+    if ai == 'mcts':
+        return mcts_move(engine, player, rng)
+    if ai == 'tablebase':
+        return tablebase_move(engine)
+    if ai == 'policy':
+        return policy_move(engine, player)
+    raise ValueError(f"Unknown ai {ai!r}; choose from {STRATEGIES}")
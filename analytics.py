@@ -0,0 +1,419 @@
+"""
+analytics.py
+
+Exhaustive game-tree statistics and an audit of the heuristic AI on m,n,k boards.
+
+Every position reachable under TicTacToeGame rules is collected and solved
+with the tablebase generator (see tablebase.py). Positions are gathered ply
+by ply, stopping at won or full boards. Each ply is deduplicated by sorting
+its keys, so a position met along many move orders is analysed once. The
+retrograde pass then labels each position WIN, DRAW or LOSS for the player
+to move, in parallel worker processes.
+
+A forward pass over the plies then counts game-tree nodes, the number of
+move sequences reaching each position, by pushing each position's count to
+its children. The same pass audits the heuristic, also in worker processes.
+For every open position, a vectorized copy of ai.heuristic_options() finds
+the cells the heuristic would choose between, and each choice is compared
+with the optimal result. A choice deviates if it gives a worse result. The
+worst deviations, where the heuristic turns a position it could hold into a
+loss, are written out as full lines. Each line runs from the empty board
+through the heuristic's move, followed by perfect play to the end.
+
+Results stream to a directory as they are computed:
+
+    <column>.npy     one row per position: key, depth, result, distance,
+                     paths, heuristic_options, heuristic_bad and heuristic_worst
+    summary.json     per-depth statistics as columns, totals and losing lines
+
+The position columns can be read in chunks through memory maps, like the
+submission columns in grading.py. Path counts are exact up to 20 cells.
+
+Usage:
+    python analytics.py ROWS COLS K [--out DIR] [--workers N] [--lines N]
+
+Functions:
+	heuristic_options(keys, stones, rows, cols, k): Vectorized ai.heuristic_options over packed positions.
+	analyse(rows, cols, k, out, workers, max_lines): Run the full analysis and write the results.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from book import LOSS, DRAW, WIN
+from mnk import MNKBoard
+from tablebase import (DISTANCE_BITS, DISTANCE_MASK, CHUNK_SIZE, generate, split_keys,
+                       terminal_mask, win_masks)
+
+# Position columns written to the output directory, with their dtypes
+COLUMNS = (
+    ('key', np.uint64),
+    ('depth', np.uint8),
+    ('result', np.uint8),
+    ('distance', np.uint8),
+    ('paths', np.uint64),
+    ('heuristic_options', np.uint8),
+    ('heuristic_bad', np.uint8),
+    ('heuristic_worst', np.uint8),
+)
+
+# Result for the player to move after a move into a child with this result
+_FLIP = np.array([0, WIN, DRAW, LOSS], dtype=np.uint8)
+
+
+def heuristic_options(keys, stones, rows, cols, k):
+    """
+    Apply the ai.heuristic_options rules to many positions at once.
+
+    Candidates are every empty cell on the classic 3x3 board (BitBoard) and
+    the cells next to a stone elsewhere (MNKBoard), as in TicTacToeGame.
+
+    Args:
+        keys (numpy.ndarray): uint64 keys of open positions with stones stones.
+        stones (int): Stones on the board in every position.
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        numpy.ndarray: uint64 mask per position of the cells the heuristic
+            picks from; a single bit when its choice is forced.
+    """
+    cells = rows * cols
+    board = MNKBoard(rows, cols, k)
+    x_bits, o_bits = split_keys(keys, cells)
+    occupied = x_bits | o_bits
+    empty = ~occupied & np.uint64((1 << cells) - 1)
+    if (rows, cols, k) == (3, 3, 3):
+        candidates = empty
+    elif stones == 0:
+        candidates = np.full(len(keys), 1 << board.center, dtype=np.uint64)
+    else:
+        near = np.zeros(len(keys), dtype=np.uint64)
+        for cell in range(cells):
+            neighbours = np.uint64(sum(1 << other for other in board.neighbours(cell)))
+            near |= np.where(occupied & np.uint64(1 << cell), neighbours, np.uint64(0))
+        candidates = empty & near
+
+    masks = win_masks(rows, cols, k)
+    options = np.zeros(len(keys), dtype=np.uint64)
+    decided = np.zeros(len(keys), dtype=bool)
+    # Win if possible, else block, taking the lowest such cell
+    for bits in ((x_bits, o_bits) if stones % 2 == 0 else (o_bits, x_bits)):
+        for cell in range(cells):
+            bit = np.uint64(1 << cell)
+            open_ = ~decided & ((candidates & bit) != 0)
+            if not open_.any():
+                continue
+            wins = np.zeros(len(keys), dtype=bool)
+            with_cell = bits | bit
+            for mask in masks:
+                if mask >> cell & 1:
+                    wins |= (with_cell & np.uint64(mask)) == np.uint64(mask)
+            hit = open_ & wins
+            options[hit] = bit
+            decided |= hit
+    # Then the center, a corner, an edge, or any candidate
+    groups = ((board.center,), board.corners, board.edges)
+    for group in groups:
+        group_mask = np.uint64(sum(1 << cell for cell in group))
+        choice = candidates & group_mask
+        hit = ~decided & (choice != 0)
+        options[hit] = choice[hit]
+        decided |= hit
+    options[~decided] = candidates[~decided]
+    return options
+
+
+def _audit_chunk(keys, values, stones, rows, cols, k, next_keys_path, next_values_path):
+    """
+    Compare the heuristic's choices with optimal play for a chunk of one ply.
+
+    Runs in a worker process; the next ply is memory-mapped from scratch files.
+
+    Args:
+        keys (numpy.ndarray): uint64 keys of open positions with stones stones.
+        values (numpy.ndarray): Their tablebase value bytes.
+        stones (int): Stones on the board in every position.
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        next_keys_path (str): .npy file of the sorted keys with stones + 1 stones.
+        next_values_path (str): .npy file of their values.
+    Returns:
+        tuple: uint8 arrays (options, bad, worst): how many cells the
+            heuristic picks from, how many of them deviate, and the worst
+            result it can reach.
+    """
+    cells = rows * cols
+    optimal = values >> DISTANCE_BITS
+    choices = heuristic_options(keys, stones, rows, cols, k)
+    next_keys = np.load(next_keys_path, mmap_mode='r')
+    next_values = np.load(next_values_path, mmap_mode='r')
+    shift = 0 if stones % 2 == 0 else cells
+    options = np.zeros(len(keys), dtype=np.uint8)
+    bad = np.zeros(len(keys), dtype=np.uint8)
+    worst = np.full(len(keys), WIN, dtype=np.uint8)
+    for cell in range(cells):
+        chosen = (choices & np.uint64(1 << cell)) != 0
+        if not chosen.any():
+            continue
+        child_keys = keys[chosen] | np.uint64(1 << (cell + shift))
+        child = next_values[np.searchsorted(next_keys, child_keys)]
+        result = _FLIP[child >> DISTANCE_BITS]
+        options[chosen] += 1
+        bad[chosen] += result < optimal[chosen]
+        worst[chosen] = np.minimum(worst[chosen], result)
+    return options, bad, worst
+
+
+def _find(layer, key):
+    """
+    Return the index of key in a sorted layer, or None.
+
+    Args:
+        layer (numpy.ndarray): Sorted uint64 keys.
+        key (int): Key to look up.
+    Returns:
+        int: Index of the key, or None if absent.
+    """
+    index = int(np.searchsorted(layer, np.uint64(key)))
+    if index < len(layer) and int(layer[index]) == key:
+        return index
+    return None
+
+
+def _line_to(layers, key, stones, cells):
+    """
+    Find a move sequence from the empty board to a position.
+
+    Args:
+        layers (list): (keys, values) per ply from tablebase.generate().
+        key (int): Key of the position.
+        stones (int): Stones in the position.
+        cells (int): Number of cells on the board.
+    Returns:
+        list: Cells in the order played.
+    """
+    moves = []
+    while stones:
+        shift = 0 if stones % 2 else cells
+        keys, values = layers[stones - 1]
+        for cell in range(cells):
+            if key >> (cell + shift) & 1:
+                parent = key & ~(1 << (cell + shift))
+                index = _find(keys, parent)
+                # The parent must be reachable and still open; terminal positions have distance 0
+                if index is not None and values[index] & DISTANCE_MASK:
+                    moves.append(cell)
+                    key = parent
+                    break
+        stones -= 1
+    return moves[::-1]
+
+
+def _best_line(layers, key, stones, cells):
+    """
+    Play perfectly for both sides from a position to the end of the game.
+
+    Args:
+        layers (list): (keys, values) per ply from tablebase.generate().
+        key (int): Key of the position.
+        stones (int): Stones in the position.
+        cells (int): Number of cells on the board.
+    Returns:
+        list: Cells in the order played.
+    """
+    moves = []
+    while stones < len(layers) - 1:
+        keys, values = layers[stones]
+        if not values[_find(keys, key)] & DISTANCE_MASK:
+            break
+        shift = 0 if stones % 2 == 0 else cells
+        next_keys, next_values = layers[stones + 1]
+        best = best_rank = None
+        for cell in range(cells):
+            if (key | key >> cells) >> cell & 1:
+                continue
+            child = int(next_values[_find(next_keys, key | 1 << (cell + shift))])
+            result, distance = child >> DISTANCE_BITS, child & DISTANCE_MASK
+            rank = (0, distance) if result == LOSS else (1, distance) if result == DRAW \
+                else (2, -distance)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = cell, rank
+        moves.append(best)
+        key |= 1 << (best + shift)
+        stones += 1
+    return moves
+
+
+def analyse(rows, cols, k, out, workers=None, max_lines=20):
+    """
+    Analyse every reachable position of a board and write the results to out.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        out (str): Output directory, created if needed.
+        workers (int, optional): Worker processes. Defaults to the CPU count.
+        max_lines (int, optional): Losing lines kept, most-travelled first. Defaults to 20.
+    Returns:
+        dict: The contents of summary.json.
+    """
+    cells = rows * cols
+    layers = generate(rows, cols, k, workers)
+    total = sum(len(keys) for keys, _ in layers)
+    os.makedirs(out, exist_ok=True)
+    columns = {name: np.lib.format.open_memmap(os.path.join(out, f"{name}.npy"), mode='w+',
+                                               dtype=dtype, shape=(total,))
+               for name, dtype in COLUMNS}
+    masks = np.array(win_masks(rows, cols, k), dtype=np.uint64)
+
+    depth_stats = {name: [] for name in (
+        'depth', 'positions', 'paths', 'x_wins', 'o_wins', 'draws',
+        'games_x_wins', 'games_o_wins', 'games_drawn',
+        'to_move_wins', 'to_move_draws', 'to_move_losses',
+        'audited', 'deviations', 'losing_deviations', 'paths_deviating')}
+    candidates = []
+    paths = np.ones(1, dtype=np.uint64)
+    row = 0
+    with tempfile.TemporaryDirectory() as scratch, ProcessPoolExecutor(workers) as executor:
+        for stones, (keys, values) in enumerate(layers):
+            count = len(keys)
+            won, full = terminal_mask(keys, stones, cells, masks)
+            ended = won | full
+            open_ = ~ended
+            result = values >> DISTANCE_BITS
+
+            options = np.zeros(count, dtype=np.uint8)
+            bad = np.zeros(count, dtype=np.uint8)
+            worst = np.zeros(count, dtype=np.uint8)
+            next_paths = None
+            if stones + 1 < len(layers) and open_.any():
+                next_keys, next_values = layers[stones + 1]
+                next_files = (os.path.join(scratch, 'keys.npy'), os.path.join(scratch, 'values.npy'))
+                np.save(next_files[0], next_keys)
+                np.save(next_files[1], next_values)
+                open_index = np.flatnonzero(open_)
+                futures = [(chunk, executor.submit(_audit_chunk, keys[chunk], values[chunk],
+                                                   stones, rows, cols, k, *next_files))
+                           for chunk in (open_index[start:start + CHUNK_SIZE]
+                                         for start in range(0, len(open_index), CHUNK_SIZE))]
+                for chunk, future in futures:
+                    options[chunk], bad[chunk], worst[chunk] = future.result()
+
+                # Each child is reached once per path to each of its parents
+                next_paths = np.zeros(len(next_keys), dtype=np.uint64)
+                shift = 0 if stones % 2 == 0 else cells
+                open_keys, open_paths = keys[open_], paths[open_]
+                occupied = open_keys | (open_keys >> np.uint64(cells))
+                for cell in range(cells):
+                    free = (occupied & np.uint64(1 << cell)) == 0
+                    # A parent and a cell determine the child, so indices are unique per cell
+                    index = np.searchsorted(next_keys, open_keys[free] | np.uint64(1 << (cell + shift)))
+                    next_paths[index] += open_paths[free]
+
+            deviating = open_ & (bad > 0)
+            losing = deviating & (worst == LOSS)
+            last_mover_x = stones % 2 == 1
+            stats = (
+                stones, count, int(paths.sum()),
+                int(won.sum()) if last_mover_x else 0, 0 if last_mover_x else int(won.sum()),
+                int((full & ~won).sum()),
+                int(paths[won].sum()) if last_mover_x else 0,
+                0 if last_mover_x else int(paths[won].sum()),
+                int(paths[full & ~won].sum()),
+                int((open_ & (result == WIN)).sum()), int((open_ & (result == DRAW)).sum()),
+                int((open_ & (result == LOSS)).sum()),
+                int(open_.sum()), int(deviating.sum()), int(losing.sum()),
+                int(paths[deviating].sum()))
+            for name, value in zip(depth_stats, stats):
+                depth_stats[name].append(value)
+            for index in np.flatnonzero(losing):
+                candidates.append((int(paths[index]), stones, int(keys[index]), int(worst[index])))
+            candidates.sort(key=lambda entry: (-entry[0], entry[1], entry[2]))
+            del candidates[max_lines:]
+
+            block = slice(row, row + count)
+            for name, column in (('key', keys), ('depth', np.full(count, stones)),
+                                 ('result', result), ('distance', values & DISTANCE_MASK),
+                                 ('paths', paths), ('heuristic_options', options),
+                                 ('heuristic_bad', bad), ('heuristic_worst', worst)):
+                columns[name][block] = column
+            row += count
+            paths = next_paths
+
+    for column in columns.values():
+        column.flush()
+    del columns
+
+    lines = []
+    for path_count, stones, key, _ in candidates:
+        keys, values = layers[stones]
+        optimal = int(values[_find(keys, key)]) >> DISTANCE_BITS
+        choices = int(heuristic_options(np.array([key], dtype=np.uint64), stones, rows, cols, k)[0])
+        shift = 0 if stones % 2 == 0 else cells
+        next_keys, next_values = layers[stones + 1]
+        for cell in range(cells):
+            if choices >> cell & 1:
+                child = key | 1 << (cell + shift)
+                if int(next_values[_find(next_keys, child)]) >> DISTANCE_BITS == WIN:
+                    break
+        prefix = _line_to(layers, key, stones, cells)
+        lines.append({
+            'player': 'XO'[stones % 2],
+            'paths': path_count,
+            'optimal': {WIN: 'win', DRAW: 'draw'}[optimal],
+            'moves': prefix + [cell] + _best_line(layers, child, stones + 1, cells),
+            'heuristic_move': len(prefix),
+        })
+
+    audited = sum(depth_stats['audited'])
+    summary = {
+        'board': {'rows': rows, 'cols': cols, 'k': k},
+        'positions': total,
+        'tree_nodes': sum(depth_stats['paths']),
+        'value': {WIN: 'X wins', DRAW: 'draw', LOSS: 'O wins'}[int(layers[0][1][0]) >> DISTANCE_BITS],
+        'audited': audited,
+        'deviations': sum(depth_stats['deviations']),
+        'deviation_rate': sum(depth_stats['deviations']) / audited if audited else 0.0,
+        'losing_deviations': sum(depth_stats['losing_deviations']),
+        'depths': depth_stats,
+        'losing_lines': lines,
+    }
+    with open(os.path.join(out, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Exhaustive game-tree statistics and heuristic audit.")
+    parser.add_argument('rows', type=int, help="number of rows")
+    parser.add_argument('cols', type=int, help="number of columns")
+    parser.add_argument('k', type=int, help="marks in a row needed to win")
+    parser.add_argument('--out', help="output directory (defaults to analytics_<rows>x<cols>k<k>)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    parser.add_argument('--lines', type=int, default=20, help="losing lines to keep")
+    args = parser.parse_args()
+    out_dir = args.out or f"analytics_{args.rows}x{args.cols}k{args.k}"
+    report = analyse(args.rows, args.cols, args.k, out_dir, args.workers, args.lines)
+    print(f"{report['positions']:,} positions, {report['tree_nodes']:,} game-tree nodes; "
+          f"the game is a {report['value']}")
+    depths = report['depths']
+    print("depth   positions        paths   open  deviations  losing")
+    for index, depth in enumerate(depths['depth']):
+        print(f"{depth:>5} {depths['positions'][index]:>11,} {depths['paths'][index]:>12,}"
+              f" {depths['audited'][index]:>6,} {depths['deviations'][index]:>11,}"
+              f" {depths['losing_deviations'][index]:>7,}")
+    print(f"The heuristic deviates from optimal play in {report['deviations']:,} of "
+          f"{report['audited']:,} open positions ({report['deviation_rate']:.1%}), "
+          f"{report['losing_deviations']:,} of them into a loss")
+    for line in report['losing_lines'][:5]:
+        print(f"  {line['player']} to move ({line['paths']:,} paths, {line['optimal']} thrown away):"
+              f" {' '.join(map(str, line['moves']))}, heuristic move #{line['heuristic_move'] + 1}")
+    print(f"Wrote {out_dir}")
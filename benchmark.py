@@ -0,0 +1,320 @@
+"""
+benchmark.py
+
+Benchmarks for the game logic and AI hot paths.
+
+Measures throughput and latency percentiles for TicTacToeGame.winner, is_full
+and get_computer_move, tictac.py's TicTacToe.check_if_win and Quiz answer
+grading. Positions are drawn from a seeded random generator so runs are
+comparable, tkinter is replaced by a stub for the duration of the run so no
+display is needed, and results are written as JSON that can be compared
+against a previous run. Importing the module changes nothing.
+
+Usage:
+    python benchmark.py [--seed N] [--positions N] [--out FILE] [--compare BASELINE]
+
+Functions:
+	tk_stub(): Context manager making tkinter importable without a display.
+	random_positions(count, seed): Seeded random legal non-final positions.
+	percentile(sorted_values, fraction): Nearest-rank percentile of a sorted list.
+	measure(name, func, args_list, repeat, setup): Time func over a list of argument tuples.
+	run_benchmarks(seed, positions): Run every benchmark.
+	compare(results, baseline, threshold, noise_floor): Report benchmarks that got slower.
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import types
+
+from engine import BitBoard, SIZE, X, O
+
+# Slowdown (current / baseline latency) reported as a regression
+REGRESSION_THRESHOLD = 1.10
+# Slowdowns smaller than this many microseconds are timer noise, whatever the ratio
+NOISE_FLOOR_US = 0.05
+# Passes over the positions; each call keeps its fastest time
+REPEAT = 5
+
+
+class _Widget:
+    """Stand-in for every tkinter widget: accepts any call and does nothing."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@contextlib.contextmanager
+def tk_stub():
+    """
+    Replace tkinter with a stub while the block runs, so the GUI modules run headless.
+
+    The GUI modules import tkinter only when they open a window or show a
+    message box; with the stub those calls return immediately. The modules
+    that were installed before are put back when the block exits.
+
+    Yields:
+        types.ModuleType: The stub tkinter module.
+    """
+    stub = types.ModuleType('tkinter')
+    stub.Tk = stub.Frame = stub.Button = stub.Canvas = _Widget
+    stub.DISABLED, stub.ACTIVE, stub.NORMAL = 'disabled', 'active', 'normal'
+    stub.messagebox = types.SimpleNamespace(showinfo=lambda *args, **kwargs: None)
+    names = ('tkinter', 'tkinter.messagebox')
+    saved = {name: sys.modules.get(name) for name in names}
+    sys.modules['tkinter'] = stub
+    sys.modules['tkinter.messagebox'] = stub.messagebox
+    try:
+        yield stub
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def random_positions(count, seed):
+    """
+    Generate positions reached by random play that are not yet won or full.
+
+    Args:
+        count (int): Number of positions.
+        seed (int): Random seed.
+    Returns:
+        list: BitBoard positions with O to move half the time or more.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = BitBoard()
+        player = X
+        for _ in range(rng.randint(1, 8)):
+            board.play(rng.choice(board.empty_cells()), player)
+            player = 1 - player
+            if board.winner() is not None:
+                break
+        if board.winner() is None and not board.is_full():
+            positions.append(board)
+    return positions
+
+
+def percentile(sorted_values, fraction):
+    """
+    Return the value at fraction of a sorted list (nearest rank).
+
+    Args:
+        sorted_values (list): Values in ascending order.
+        fraction (float): Between 0 and 1.
+    Returns:
+        float: The percentile value.
+    """
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(name, func, args_list, repeat=REPEAT, setup=None):
+    """
+    Time func over every argument tuple in args_list.
+
+    Throughput is taken from the best of repeat untimed passes over the
+    whole list. Latency percentiles come from repeat passes timing each
+    call, keeping each call's fastest time, so a scheduler hiccup in one
+    pass does not move the percentiles.
+
+    Args:
+        name (str): Benchmark name.
+        func (callable): Function under test.
+        args_list (list): Argument tuples, one per call.
+        repeat (int, optional): Passes of each kind. Defaults to REPEAT.
+        setup (callable, optional): Called untimed before every pass, e.g. to
+            clear a cache the previous pass filled. Defaults to None.
+    Returns:
+        dict: name, calls, ops_per_sec and p50/p90/p99/max latency in microseconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for args in args_list:
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    clock = time.perf_counter_ns
+    latencies = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        timings = []
+        for args in args_list:
+            start = clock()
+            func(*args)
+            timings.append(clock() - start)
+        latencies = timings if latencies is None else list(map(min, latencies, timings))
+    latencies.sort()
+    return {
+        'name': name,
+        'calls': len(args_list),
+        'ops_per_sec': len(args_list) / best,
+        'p50_us': percentile(latencies, 0.50) / 1000,
+        'p90_us': percentile(latencies, 0.90) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+        'max_us': latencies[-1] / 1000,
+    }
+
+
+def _game_at(position, ai, cls):
+    """
+    Build a TicTacToeGame holding position.
+
+    Args:
+        position (BitBoard): The position.
+        ai (str): Computer strategy.
+        cls (type): TicTacToeGame.
+    Returns:
+        TicTacToeGame: A game with board and engine set.
+    """
+    game = cls(ai=ai, rng=random.Random(0))
+    for cell in range(SIZE * SIZE):
+        symbol = position.symbol_at(cell)
+        if symbol != ' ':
+            game.place(cell // SIZE, cell % SIZE, symbol)
+    return game
+
+
+def run_benchmarks(seed=0, positions=20000):
+    """
+    Run every benchmark on the same seeded positions.
+
+    Args:
+        seed (int, optional): Random seed. Defaults to 0.
+        positions (int, optional): Positions per benchmark. Defaults to 20000.
+    Returns:
+        list: One result dictionary per benchmark, as returned by measure().
+    """
+    with tk_stub():
+        # pylint: disable=import-outside-toplevel
+        from tictactoe import TicTacToeGame
+        import tictac
+        from quiz import Quiz
+        from solver import get_solver
+        from book import load_book
+        from ai import MOVE_CACHE
+
+        # Build shared tables outside the timed regions
+        get_solver()
+        load_book()
+
+        boards = random_positions(positions, seed)
+        games = {ai: [_game_at(board, ai, TicTacToeGame) for board in boards]
+                 for ai in ('heuristic', 'perfect', 'book')}
+        heuristic_games = games['heuristic']
+
+        def check_if_win(state, board):
+            state.engine = board
+            state.check_if_win()
+
+        rng = random.Random(seed)
+        questions = [{'question': f"Q{i}", 'choices': ['a', 'b', 'c', 'd'],
+                      'answer_index': rng.randrange(4)} for i in range(positions)]
+        answers = [(question, str(rng.randint(1, 4))) for question in questions]
+        quiz = Quiz(questions)
+
+        results = [
+            measure('TicTacToeGame.winner', lambda g: g.winner('X') or g.winner('O'),
+                    [(g,) for g in heuristic_games]),
+            measure('TicTacToeGame.is_full', lambda g: g.is_full(),
+                    [(g,) for g in heuristic_games]),
+        ]
+        # Every pass starts from an empty move cache so the AI itself is timed
+        for ai, ai_games in games.items():
+            results.append(measure(f"TicTacToeGame.get_computer_move[{ai}]",
+                                   lambda g: g.get_computer_move(), [(g,) for g in ai_games],
+                                   setup=MOVE_CACHE.clear))
+        results.append(measure('tictac.TicTacToe.check_if_win', check_if_win,
+                               [(tictac.TicTacToe(), board) for board in boards]))
+        results.append(measure('Quiz.check_answer', quiz.check_answer, answers))
+        return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, noise_floor=NOISE_FLOOR_US):
+    """
+    Print each benchmark's p50 latency against a baseline run.
+
+    A benchmark regressed when its p50 grew by more than threshold times
+    and by more than noise_floor microseconds.
+
+    Args:
+        results (list): Current results.
+        baseline (list): Results loaded from an earlier JSON file.
+        threshold (float, optional): Slowdown ratio counted as a regression.
+        noise_floor (float, optional): Smallest slowdown in microseconds
+            counted as a regression. Defaults to NOISE_FLOOR_US.
+    Returns:
+        list: Names of benchmarks that regressed.
+    """
+    previous = {result['name']: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result['name'])
+        if before is None:
+            print(f"{result['name']:<45} new")
+            continue
+        ratio = result['p50_us'] / before['p50_us'] if before['p50_us'] else float('inf')
+        slower = result['p50_us'] - before['p50_us'] > noise_floor
+        flag = 'REGRESSION' if ratio > threshold and slower else ''
+        print(f"{result['name']:<45} p50 {before['p50_us']:8.2f} -> {result['p50_us']:8.2f} us"
+              f" ({ratio:5.2f}x) {flag}")
+        if flag:
+            regressions.append(result['name'])
+    return regressions
+
+
+def _git_commit():
+    """
+    Return the current git commit, if any.
+
+    Returns:
+        str: Commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark game logic and AI hot paths.")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for positions")
+    parser.add_argument('--positions', type=int, default=20000, help="positions per benchmark")
+    parser.add_argument('--out', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'seed': args.seed,
+        'positions': args.positions,
+        'results': run_benchmarks(args.seed, args.positions),
+    }
+    for entry in report['results']:
+        print(f"{entry['name']:<45} {entry['ops_per_sec']:>12,.0f} ops/s"
+              f"  p50 {entry['p50_us']:7.2f}  p99 {entry['p99_us']:7.2f} us")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print()
+            sys.exit(1 if compare(report['results'], json.load(f)['results']) else 0)
@@ -0,0 +1,213 @@
+"""
+book.py
+
+Precomputed Tic Tac Toe move table stored as a memory-mapped binary file.
+
+Every legal position reachable from the empty board (5,478 of them) is solved
+once and written to a flat table indexed by the base-3 code of the position,
+where cell c contributes 3**c times 0 (empty), 1 (X) or 2 (O). Each entry is
+one byte: the game-theoretic value for the player to move in the high nibble
+and the best cell in the low nibble. Lookups read a single byte from the
+mapped file, and processes forked after the book is opened share its pages.
+
+Usage:
+    python book.py [path]    Build the book (defaults to tictactoe.book).
+
+Classes:
+	OpeningBook: Read-only view of a book file.
+
+Functions:
+	position_code(board): Base-3 index of a position.
+	build_book(path): Enumerate, solve and write every legal position.
+	load_book(path): Return the shared book, building the file if missing.
+"""
+
+import mmap
+import os
+import sys
+
+from engine import BitBoard, CELLS, FULL, X, O
+from solver import get_solver
+
+MAGIC = b'TTTBOOK1'
+ENTRIES = 3 ** CELLS
+
+# Values stored in the high nibble; 0 marks an unreachable code
+ILLEGAL = 0
+LOSS = 1
+DRAW = 2
+WIN = 3
+
+# Low nibble value when the position has no move (game over)
+NO_MOVE = 0x0F
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tictactoe.book')
+
+# TERNARY[mask] is the base-3 code of a single player's occupancy mask
+TERNARY = tuple(sum(3 ** cell for cell in range(CELLS) if mask >> cell & 1)
+                for mask in range(FULL + 1))
+
+
+def position_code(board):
+    """
+    Return the base-3 index of a position.
+
+    Args:
+        board (BitBoard): The position.
+    Returns:
+        int: Index into the book, in range(3 ** 9).
+    """
+    return TERNARY[board.bits[X]] + 2 * TERNARY[board.bits[O]]
+
+
+def _enumerate_positions():
+    """
+    Collect every position reachable from the empty board under the game rules.
+
+    Returns:
+        list: (x_bits, o_bits) pairs, one per distinct position.
+    """
+    seen = set()
+    board = BitBoard()
+
+    def visit():
+        key = (board.bits[X], board.bits[O])
+        if key in seen:
+            return
+        seen.add(key)
+        if board.winner() is not None or board.is_full():
+            return
+        player = board.to_move()
+        for cell in board.empty_cells():
+            board.play(cell, player)
+            visit()
+            board.undo(cell, player)
+
+    visit()
+    return sorted(seen)
+
+
+def build_book(path=DEFAULT_PATH):
+    """
+    Solve every legal position and write the packed table to path.
+
+    The file is written to a temporary name and renamed into place, so
+    readers never observe a partial book.
+
+    Args:
+        path (str, optional): Destination file. Defaults to tictactoe.book.
+    Returns:
+        int: Number of positions written.
+    """
+    solver = get_solver()
+    table = bytearray(ENTRIES)
+    positions = _enumerate_positions()
+    for x_bits, o_bits in positions:
+        board = BitBoard(x_bits, o_bits)
+        if board.winner() is not None:
+            # The player to move has already lost
+            value, move = LOSS, NO_MOVE
+        elif board.is_full():
+            value, move = DRAW, NO_MOVE
+        else:
+            score = solver.value(board)
+            value = WIN if score > 0 else LOSS if score < 0 else DRAW
+            move = solver.best_move(board)
+        table[position_code(board)] = value << 4 | move
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(table)
+    os.replace(tmp_path, path)
+    return len(positions)
+
+
+class OpeningBook:
+    """
+    A read-only, memory-mapped move table produced by build_book.
+
+    Attributes:
+        path (str): Location of the book file.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Map the book file into memory.
+
+        Args:
+            path (str, optional): Book file. Defaults to tictactoe.book.
+        Raises:
+            ValueError: If the file is not a book of the expected size.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) != len(MAGIC) + ENTRIES or self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a valid Tic Tac Toe book")
+
+    def entry(self, board):
+        """
+        Return the stored value and move for a position.
+
+        Args:
+            board (BitBoard): The position.
+        Returns:
+            tuple: (value, cell) where value is WIN, DRAW or LOSS and cell is
+            None when there is no move, or None if the position cannot be
+            reached from the empty board and so is not in the book.
+        """
+        packed = self._map[len(MAGIC) + position_code(board)]
+        if packed >> 4 == ILLEGAL:
+            return None
+        move = packed & 0x0F
+        return packed >> 4, None if move == NO_MOVE else move
+
+    def best_move(self, board):
+        """
+        Return the stored optimal move for the player to move.
+
+        Args:
+            board (BitBoard): The position.
+        Returns:
+            int: Cell index of the move, or None if the game is over.
+        Raises:
+            ValueError: If the position cannot be reached from the empty board.
+        """
+        entry = self.entry(board)
+        if entry is None:
+            raise ValueError("position is not reachable under the game rules")
+        return entry[1]
+
+    def close(self):
+        """Unmap the book file."""
+        self._map.close()
+
+
+_BOOK = None
+
+
+def load_book(path=DEFAULT_PATH):
+    """
+    Return the process-wide book, building the file first if it does not exist.
+
+    Open the book before forking worker processes so they share its pages.
+
+    Args:
+        path (str, optional): Book file. Defaults to tictactoe.book.
+    Returns:
+        OpeningBook: The shared book.
+    """
+    global _BOOK  # pylint: disable=global-statement
+    if _BOOK is None or _BOOK.path != path:
+        if not os.path.exists(path):
+            build_book(path)
+        _BOOK = OpeningBook(path)
+    return _BOOK
+
+
+if __name__ == '__main__':
+    out_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    count = build_book(out_path)
+    print(f"Wrote {count} positions to {out_path}")
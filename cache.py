@@ -0,0 +1,138 @@
+"""
+cache.py
+
+Bounded, thread-safe cache from position keys to evaluated moves.
+
+Entries are evicted with the CLOCK algorithm: each slot has a reference bit
+that is set on a hit, and when the cache is full a hand sweeps the slots,
+clearing set bits and evicting the first entry whose bit is already clear.
+This approximates LRU while keeping hits to a dictionary lookup and a flag
+write. Hit and miss counts are kept for monitoring.
+
+Classes:
+	MoveCache: CLOCK cache with hit-rate statistics.
+"""
+
+import threading
+
+
+class MoveCache:
+    """
+    A fixed-capacity CLOCK cache.
+
+    Attributes:
+        capacity (int): Most entries held at once.
+        hits (int): Lookups that found an entry.
+        misses (int): Lookups that did not.
+        evictions (int): Entries dropped to make room.
+    """
+
+    def __init__(self, capacity=65536):
+        """
+        Initialize an empty cache.
+
+        Args:
+            capacity (int, optional): Most entries held. Defaults to 65536.
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index = {}
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._referenced = bytearray(capacity)
+        self._hand = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """int: Number of entries held."""
+        return self._size
+
+    def get(self, key):
+        """
+        Look up a key.
+
+        Args:
+            key: Hashable position key.
+        Returns:
+            The cached value, or None if the key is not cached.
+        """
+        with self._lock:
+            slot = self._index.get(key)
+            if slot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._referenced[slot] = 1
+            return self._values[slot]
+
+    def put(self, key, value):
+        """
+        Store a value, evicting an entry if the cache is full.
+
+        Args:
+            key: Hashable position key.
+            value: Value to cache; None cannot be told apart from a miss.
+        """
+        with self._lock:
+            slot = self._index.get(key)
+            if slot is None:
+                if self._size < self.capacity:
+                    slot = self._size
+                    self._size += 1
+                else:
+                    referenced = self._referenced
+                    while referenced[self._hand]:
+                        referenced[self._hand] = 0
+                        self._hand = (self._hand + 1) % self.capacity
+                    slot = self._hand
+                    self._hand = (self._hand + 1) % self.capacity
+                    del self._index[self._keys[slot]]
+                    self.evictions += 1
+                self._index[key] = slot
+                self._keys[slot] = key
+            self._values[slot] = value
+            self._referenced[slot] = 0
+
+    def hit_rate(self):
+        """
+        Return the fraction of lookups that were hits.
+
+        Returns:
+            float: Between 0 and 1; 0 before any lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Return the cache statistics.
+
+        Returns:
+            dict: size, capacity, hits, misses, evictions and hit_rate.
+        """
+        return {
+            'size': self._size,
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+        }
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._index.clear()
+            self._keys = [None] * self.capacity
+            self._values = [None] * self.capacity
+            self._referenced = bytearray(self.capacity)
+            self._hand = 0
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
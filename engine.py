@@ -0,0 +1,247 @@
+"""
+engine.py
+
+Headless bitboard engine for 3x3 Tic Tac Toe.
+
+The position is stored as two 9-bit integers, one per player, where bit
+``3 * row + col`` is set when that player occupies the cell. Win detection is
+a single table lookup on a player's bits, and moves are applied and undone in
+place, so the AI can explore positions without copying the board.
+
+Classes:
+	BitBoard: Mutable 3x3 position backed by two 9-bit integers.
+"""
+
+# Player indices into BitBoard.bits
+X = 0
+O = 1
+
+# Board symbols used by the GUI scripts, indexed by player
+SYMBOLS = ('X', 'O')
+PLAYERS = {'X': X, 'O': O}
+
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+
+# Cell indices of every row, column and diagonal
+LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6),
+)
+WIN_MASKS = tuple(sum(1 << cell for cell in line) for line in LINES)
+
+CENTER = 4
+CORNERS = (0, 2, 6, 8)
+EDGES = (1, 3, 5, 7)
+
+# Single bit for each cell
+BITS = tuple(1 << cell for cell in range(CELLS))
+
+# WINS[mask] is True when the cells in mask contain a complete line
+WINS = tuple(any(mask & win == win for win in WIN_MASKS) for mask in range(FULL + 1))
+
+# FREE_CELLS[mask] lists the cells that are not set in mask, in ascending order
+FREE_CELLS = tuple(tuple(cell for cell in range(CELLS) if not mask & BITS[cell])
+                   for mask in range(FULL + 1))
+
+# POPCOUNT[mask] is the number of cells set in mask
+POPCOUNT = tuple(bin(mask).count('1') for mask in range(FULL + 1))
+
+
+class BitBoard:
+    """
+    A 3x3 Tic Tac Toe position stored as one 9-bit integer per player.
+
+    The class attributes describe the board shape with the same names as
+    mnk.MNKBoard, so callers can use either engine.
+
+    Attributes:
+        bits (list): Occupancy masks indexed by player (X=0, O=1).
+    """
+    __slots__ = ('bits',)
+
+    rows = SIZE
+    cols = SIZE
+    k = SIZE
+    center = CENTER
+    corners = CORNERS
+    edges = EDGES
+
+    def __init__(self, x_bits=0, o_bits=0):
+        """
+        Initialize the position from two occupancy masks.
+
+        Args:
+            x_bits (int, optional): Cells occupied by X. Defaults to empty.
+            o_bits (int, optional): Cells occupied by O. Defaults to empty.
+        """
+        self.bits = [x_bits, o_bits]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a position from a list of rows holding 'X', 'O' or anything else for empty.
+
+        Args:
+            rows (list): 3x3 nested list such as TicTacToeGame.board.
+        Returns:
+            BitBoard: The equivalent position.
+        """
+        board = cls()
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                if value in PLAYERS:
+                    board.bits[PLAYERS[value]] |= BITS[SIZE * i + j]
+        return board
+
+    def play(self, cell, player):
+        """
+        Place player's mark on cell.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+            player (int): X or O.
+        """
+        self.bits[player] |= BITS[cell]
+
+    def undo(self, cell, player):
+        """
+        Remove player's mark from cell.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+            player (int): X or O.
+        """
+        self.bits[player] &= ~BITS[cell]
+
+    def reset(self):
+        """Clear every cell."""
+        self.bits[X] = 0
+        self.bits[O] = 0
+
+    def occupied(self):
+        """
+        Return the mask of occupied cells.
+
+        Returns:
+            int: Union of both players' masks.
+        """
+        return self.bits[X] | self.bits[O]
+
+    def is_free(self, cell):
+        """
+        Check if cell is empty.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+        Returns:
+            bool: True if no player occupies the cell.
+        """
+        return not (self.bits[X] | self.bits[O]) & BITS[cell]
+
+    def is_full(self):
+        """
+        Check if every cell is occupied.
+
+        Returns:
+            bool: True if the board is full.
+        """
+        return (self.bits[X] | self.bits[O]) == FULL
+
+    def empty_cells(self):
+        """
+        Return the empty cells in ascending order.
+
+        Returns:
+            tuple: Cell indices; a shared precomputed tuple, so no allocation.
+        """
+        return FREE_CELLS[self.bits[X] | self.bits[O]]
+
+    def candidate_moves(self):
+        """
+        Return the cells worth considering; on a 3x3 board that is every empty cell.
+
+        Returns:
+            tuple: Cell indices in ascending order.
+        """
+        return FREE_CELLS[self.bits[X] | self.bits[O]]
+
+    def has_won(self, player):
+        """
+        Check if player has completed a line.
+
+        Args:
+            player (int): X or O.
+        Returns:
+            bool: True if the player has won.
+        """
+        return WINS[self.bits[player]]
+
+    def wins_with(self, cell, player):
+        """
+        Check if playing cell would complete a line for player, without playing it.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+            player (int): X or O.
+        Returns:
+            bool: True if the move wins.
+        """
+        return WINS[self.bits[player] | BITS[cell]]
+
+    def winner(self):
+        """
+        Return the player who has completed a line.
+
+        Returns:
+            int: X or O, or None if nobody has won.
+        """
+        if WINS[self.bits[X]]:
+            return X
+        if WINS[self.bits[O]]:
+            return O
+        return None
+
+    def position_key(self):
+        """
+        Return a key that identifies the position exactly.
+
+        Returns:
+            int: x_bits | (o_bits << 9), the same value as GameState.packed.
+        """
+        return self.bits[X] | (self.bits[O] << CELLS)
+
+    def to_move(self):
+        """
+        Return the player whose turn it is, assuming X moves first.
+
+        Returns:
+            int: X or O.
+        """
+        return X if POPCOUNT[self.bits[X]] == POPCOUNT[self.bits[O]] else O
+
+    def symbol_at(self, cell):
+        """
+        Return the symbol on cell.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+        Returns:
+            str: 'X', 'O' or ' ' for an empty cell.
+        """
+        if self.bits[X] & BITS[cell]:
+            return 'X'
+        if self.bits[O] & BITS[cell]:
+            return 'O'
+        return ' '
+
+    def copy(self):
+        """
+        Return an independent copy of the position.
+
+        Returns:
+            BitBoard: A new board with the same masks.
+        """
+        return BitBoard(self.bits[X], self.bits[O])
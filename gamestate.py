@@ -0,0 +1,258 @@
+"""
+gamestate.py
+
+Compact, GUI-free 3x3 game state for hosting many games in one process.
+
+A GameState packs both players' occupancy masks into one int (X in bits 0-8,
+O in bits 9-17), so a live game costs one slotted object plus one int, under
+100 bytes. Moves update that int in place and snapshots are the int itself,
+which is immutable and therefore free to keep. GameStatePool recycles
+finished states instead of letting them be garbage collected.
+
+The class offers the same interface as engine.BitBoard, so the ai module and
+the solver work on it directly.
+
+Classes:
+	GameState: Slotted game state backed by a single packed int.
+	GameStatePool: Free list of reusable GameState objects.
+"""
+
+from engine import (WINS, FREE_CELLS, POPCOUNT, BITS, CELLS, FULL, SIZE,
+                    CENTER, CORNERS, EDGES, X, O)
+
+# MOVE_BITS[player][cell] is the packed bit for player's mark on cell
+MOVE_BITS = tuple(tuple(bit << (CELLS * player) for bit in BITS) for player in (X, O))
+
+
+class GameState:
+    """
+    A 3x3 position packed into a single int.
+
+    Attributes:
+        packed (int): X's mask in bits 0-8 and O's mask in bits 9-17.
+    """
+    __slots__ = ('packed',)
+
+    rows = SIZE
+    cols = SIZE
+    k = SIZE
+    center = CENTER
+    corners = CORNERS
+    edges = EDGES
+
+    def __init__(self, packed=0):
+        """
+        Initialize the state.
+
+        Args:
+            packed (int, optional): Packed position, e.g. from snapshot(). Defaults to empty.
+        """
+        self.packed = packed
+
+    @property
+    def bits(self):
+        """tuple: (x_bits, o_bits), the layout used by BitBoard."""
+        return self.packed & FULL, self.packed >> CELLS
+
+    def snapshot(self):
+        """
+        Return an immutable copy of the position.
+
+        Returns:
+            int: Value to pass to restore().
+        """
+        return self.packed
+
+    def restore(self, snapshot):
+        """
+        Return to a position saved with snapshot().
+
+        Args:
+            snapshot (int): Saved position.
+        """
+        self.packed = snapshot
+
+    def reset(self):
+        """Clear every cell."""
+        self.packed = 0
+
+    def play(self, cell, player):
+        """
+        Place player's mark on cell.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+            player (int): X or O.
+        """
+        self.packed |= MOVE_BITS[player][cell]
+
+    def undo(self, cell, player):
+        """
+        Remove player's mark from cell.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+            player (int): X or O.
+        """
+        self.packed &= ~MOVE_BITS[player][cell]
+
+    def occupied(self):
+        """
+        Return the mask of occupied cells.
+
+        Returns:
+            int: Union of both players' masks.
+        """
+        return (self.packed | self.packed >> CELLS) & FULL
+
+    def is_free(self, cell):
+        """
+        Check if cell is empty.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+        Returns:
+            bool: True if no player occupies the cell.
+        """
+        return not self.occupied() & BITS[cell]
+
+    def is_full(self):
+        """
+        Check if every cell is occupied.
+
+        Returns:
+            bool: True if the board is full.
+        """
+        return self.occupied() == FULL
+
+    def empty_cells(self):
+        """
+        Return the empty cells in ascending order.
+
+        Returns:
+            tuple: Cell indices; a shared precomputed tuple.
+        """
+        return FREE_CELLS[self.occupied()]
+
+    def candidate_moves(self):
+        """
+        Return the cells worth considering; on a 3x3 board that is every empty cell.
+
+        Returns:
+            tuple: Cell indices in ascending order.
+        """
+        return FREE_CELLS[self.occupied()]
+
+    def has_won(self, player):
+        """
+        Check if player has completed a line.
+
+        Args:
+            player (int): X or O.
+        Returns:
+            bool: True if the player has won.
+        """
+        return WINS[self.packed >> (CELLS * player) & FULL]
+
+    def wins_with(self, cell, player):
+        """
+        Check if playing cell would complete a line for player, without playing it.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+            player (int): X or O.
+        Returns:
+            bool: True if the move wins.
+        """
+        return WINS[(self.packed >> (CELLS * player) & FULL) | BITS[cell]]
+
+    def winner(self):
+        """
+        Return the player who has completed a line.
+
+        Returns:
+            int: X or O, or None if nobody has won.
+        """
+        if WINS[self.packed & FULL]:
+            return X
+        if WINS[self.packed >> CELLS]:
+            return O
+        return None
+
+    def position_key(self):
+        """
+        Return a key that identifies the position exactly.
+
+        Returns:
+            int: The packed position.
+        """
+        return self.packed
+
+    def to_move(self):
+        """
+        Return the player whose turn it is, assuming X moves first.
+
+        Returns:
+            int: X or O.
+        """
+        return X if POPCOUNT[self.packed & FULL] == POPCOUNT[self.packed >> CELLS] else O
+
+    def symbol_at(self, cell):
+        """
+        Return the symbol on cell.
+
+        Args:
+            cell (int): Cell index (3 * row + col).
+        Returns:
+            str: 'X', 'O' or ' ' for an empty cell.
+        """
+        if self.packed & MOVE_BITS[X][cell]:
+            return 'X'
+        if self.packed & MOVE_BITS[O][cell]:
+            return 'O'
+        return ' '
+
+
+class GameStatePool:
+    """
+    A bounded free list of GameState objects.
+
+    Attributes:
+        max_size (int): Most idle states kept for reuse.
+    """
+
+    def __init__(self, max_size=65536):
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_size (int, optional): Most idle states kept. Defaults to 65536.
+        """
+        self.max_size = max_size
+        self._free = []
+
+    def __len__(self):
+        """int: Number of idle states in the pool."""
+        return len(self._free)
+
+    def acquire(self):
+        """
+        Return an empty state, reusing an idle one when available.
+
+        Returns:
+            GameState: A cleared state.
+        """
+        if self._free:
+            return self._free.pop()
+        return GameState()
+
+    def release(self, state):
+        """
+        Return a finished state to the pool.
+
+        Args:
+            state (GameState): State that is no longer used by its game.
+        """
+        if len(self._free) < self.max_size:
+            state.reset()
+            self._free.append(state)
@@ -0,0 +1,332 @@
+"""
+grading.py
+
+Vectorized bulk grading of quiz answers.
+
+Submissions are columnar (user, question_id, choice) rows, where choice is the
+1-based answer number a player would type into Quiz.play. They are read in
+fixed-size chunks from a CSV file or from a directory of .npy columns (read
+through memory maps), so exports larger than RAM stream through. Each chunk
+is scored with NumPy against an answer-key array and folded into running
+per-user scores and per-question statistics.
+
+Users may be identified by any strings or integers. Each user is given a
+dense index when first seen, so the per-user arrays grow with the number of
+users rather than with the largest id. A user who answers a question more
+than once is scored on it once, and it counts as correct if any attempt was
+correct; two bitsets of one bit per user and question remember which
+questions each user has answered and got right. The per-question statistics
+count every attempt.
+
+Usage:
+    python grading.py SUBMISSIONS (--bank BANK_FILE | --key KEY.npy) [--out USERS.csv]
+
+Classes:
+	Grader: Running per-user and per-question totals.
+
+Functions:
+	answer_key_from_questions(questions): Answer-key array from question dictionaries.
+	iter_csv_chunks(path, chunk_rows): Read a CSV export in chunks.
+	iter_npy_chunks(directory, chunk_rows): Read memory-mapped .npy columns in chunks.
+"""
+
+import argparse
+import itertools
+import os
+
+import numpy as np
+
+from questionbank import QuestionBank
+
+COLUMNS = ('user', 'question_id', 'choice')
+
+# Answer-key value for ids that are not questions
+NO_QUESTION = -1
+
+
+def answer_key_from_questions(questions):
+    """
+    Build an answer-key array indexed by question id.
+
+    Questions with an "id" (such as those from a QuestionBank) are keyed by it;
+    others are keyed by their position, matching Quiz.question_index.
+
+    Args:
+        questions (iterable): Question dictionaries.
+    Returns:
+        numpy.ndarray: key[question_id] is the 0-based answer index, or -1.
+    """
+    pairs = [(q.get('id', position), q['answer_index']) for position, q in enumerate(questions)]
+    key = np.full(max((qid for qid, _ in pairs), default=-1) + 1, NO_QUESTION, dtype=np.int64)
+    for qid, answer_index in pairs:
+        key[qid] = answer_index
+    return key
+
+
+def _is_header(line):
+    """
+    Check if a CSV line is a header rather than a submission.
+
+    Args:
+        line (str): First line of the file.
+    Returns:
+        bool: True if the question_id field is not an integer.
+    """
+    fields = line.split(',')
+    return len(fields) < 2 or not fields[1].strip().lstrip('-').isdigit()
+
+
+def iter_csv_chunks(path, chunk_rows=1_000_000):
+    """
+    Read a user,question_id,choice CSV file in chunks; a header line is skipped.
+
+    Args:
+        path (str): CSV file.
+        chunk_rows (int, optional): Rows per chunk. Defaults to 1,000,000.
+    Yields:
+        tuple: (users, question_ids, choices) where users is a string array
+            and the others are int64 arrays.
+    """
+    with open(path, encoding='utf-8') as f:
+        first = f.readline()
+        lines = f if _is_header(first) else itertools.chain([first], f)
+        while True:
+            chunk = list(itertools.islice(lines, chunk_rows))
+            if not chunk:
+                return
+            data = np.loadtxt(chunk, delimiter=',', dtype=str, ndmin=2)
+            yield (np.char.strip(data[:, 0]), data[:, 1].astype(np.int64),
+                   data[:, 2].astype(np.int64))
+
+
+def iter_npy_chunks(directory, chunk_rows=1_000_000):
+    """
+    Read user.npy, question_id.npy and choice.npy from a directory in chunks.
+
+    Args:
+        directory (str): Directory holding one .npy file per column.
+        chunk_rows (int, optional): Rows per chunk. Defaults to 1,000,000.
+    Yields:
+        tuple: (users, question_ids, choices) where users keeps the dtype of
+            user.npy (integers or strings) and the others are int64 arrays.
+    """
+    users, question_ids, choices = (np.load(os.path.join(directory, f"{name}.npy"),
+                                            mmap_mode='r') for name in COLUMNS)
+    for start in range(0, len(users), chunk_rows):
+        end = start + chunk_rows
+        yield (np.asarray(users[start:end]),
+               np.asarray(question_ids[start:end], dtype=np.int64),
+               np.asarray(choices[start:end], dtype=np.int64))
+
+
+class Grader:
+    """
+    Running grading totals over streamed submission chunks.
+
+    Memory does not grow with the number of rows graded. Besides a few
+    arrays per question and per user, the grader keeps two bitsets of
+    users x questions bits for repeated attempts: users * questions / 4
+    bytes, e.g. 250 MB for a million users of a 1,000-question bank, and up
+    to twice that because rows are allocated ahead by doubling.
+
+    Attributes:
+        key (numpy.ndarray): 0-based answer index per question id, -1 for none.
+        max_choices (int): Highest valid choice number.
+        total_questions (int): Number of questions in the exam.
+        attempts (numpy.ndarray): Answers received per question id.
+        correct (numpy.ndarray): Correct answers per question id.
+        choice_counts (numpy.ndarray): (questions, max_choices) counts of each choice.
+        user_ids (list): User key of each dense user index.
+        user_scores (numpy.ndarray): Questions answered correctly per user index.
+        user_attempts (numpy.ndarray): Distinct questions answered per user index.
+        rows (int): Submission rows graded.
+    """
+
+    def __init__(self, answer_key, max_choices=4):
+        """
+        Initialize empty totals.
+
+        Args:
+            answer_key (array-like): 0-based answer index per question id, -1 for none.
+            max_choices (int, optional): Highest valid choice number. Defaults to 4.
+        """
+        self.key = np.asarray(answer_key, dtype=np.int64)
+        self.max_choices = max_choices
+        self.total_questions = int((self.key != NO_QUESTION).sum())
+        questions = len(self.key)
+        self.attempts = np.zeros(questions, dtype=np.int64)
+        self.correct = np.zeros(questions, dtype=np.int64)
+        self.choice_counts = np.zeros((questions, max_choices), dtype=np.int64)
+        self.user_ids = []
+        self.user_scores = np.zeros(0, dtype=np.int64)
+        self.user_attempts = np.zeros(0, dtype=np.int64)
+        self.rows = 0
+        self._user_index = {}
+        # Bit q of row u is set once user u has answered question q, and in
+        # _right once any of those answers was correct; rows grow by doubling
+        row_bytes = (questions + 7) // 8
+        self._answered = np.zeros((0, row_bytes), dtype=np.uint8)
+        self._right = np.zeros((0, row_bytes), dtype=np.uint8)
+
+    def _dense_users(self, users):
+        """
+        Map user keys to dense indices, registering new users.
+
+        Args:
+            users (numpy.ndarray): User keys of one chunk, strings or integers.
+        Returns:
+            numpy.ndarray: int64 user index per row.
+        """
+        keys, inverse = np.unique(users, return_inverse=True)
+        index = self._user_index
+        dense = np.empty(len(keys), dtype=np.int64)
+        for position, user in enumerate(keys.tolist()):
+            found = index.get(user)
+            if found is None:
+                found = index[user] = len(self.user_ids)
+                self.user_ids.append(user)
+            dense[position] = found
+        extra = len(self.user_ids) - len(self.user_scores)
+        if extra:
+            self.user_scores = np.concatenate([self.user_scores, np.zeros(extra, dtype=np.int64)])
+            self.user_attempts = np.concatenate([self.user_attempts, np.zeros(extra, dtype=np.int64)])
+        return dense[inverse.reshape(-1)]
+
+    def add(self, users, question_ids, choices):
+        """
+        Grade one chunk of submissions.
+
+        Rows for unknown questions or out-of-range choices count as wrong
+        answers and are left out of the per-question statistics.
+
+        Args:
+            users (numpy.ndarray): User keys, strings or integers.
+            question_ids (numpy.ndarray): Question ids.
+            choices (numpy.ndarray): 1-based chosen answers.
+        """
+        questions = len(self.key)
+        valid = ((question_ids >= 0) & (question_ids < questions)
+                 & (choices >= 1) & (choices <= self.max_choices))
+        valid[valid] = self.key[question_ids[valid]] != NO_QUESTION
+        qids = question_ids[valid]
+        picks = choices[valid] - 1
+        hits = self.key[qids] == picks
+
+        self.attempts += np.bincount(qids, minlength=questions)
+        self.correct += np.bincount(qids[hits], minlength=questions)
+        self.choice_counts += np.bincount(qids * self.max_choices + picks,
+                                          minlength=questions * self.max_choices
+                                          ).reshape(questions, self.max_choices)
+
+        if len(users):
+            dense = self._dense_users(users)
+            self._add_pairs(dense[valid] * questions + qids, hits)
+        self.rows += len(users)
+
+    def _add_pairs(self, codes, hits):
+        """
+        Fold graded (user, question) pairs into the per-user totals.
+
+        Each pair counts once; it turns correct the first time any attempt is.
+
+        Args:
+            codes (numpy.ndarray): user_index * questions + question_id per valid row.
+            hits (numpy.ndarray): Whether each row is correct.
+        """
+        questions = len(self.key)
+        size = len(self.user_ids)
+        if size > len(self._answered):
+            rows = max(size, 2 * len(self._answered))
+            for name in ('_answered', '_right'):
+                old = getattr(self, name)
+                grown = np.zeros((rows, old.shape[1]), dtype=np.uint8)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+
+        codes, inverse = np.unique(codes, return_inverse=True)
+        correct = np.bincount(inverse.reshape(-1), weights=hits, minlength=len(codes)) > 0
+        users, qids = np.divmod(codes, questions)
+        cells = (users, qids >> 3)
+        bits = np.left_shift(1, qids & 7).astype(np.uint8)
+        new = (self._answered[cells] & bits) == 0
+        turned = correct & ((self._right[cells] & bits) == 0)
+
+        self.user_attempts += np.bincount(users[new], minlength=size)
+        self.user_scores += np.bincount(users[turned], minlength=size)
+        # Several questions of one user can share a byte, so the updates must accumulate
+        np.bitwise_or.at(self._answered, cells, bits)
+        np.bitwise_or.at(self._right, (users[turned], qids[turned] >> 3), bits[turned])
+
+    def grade(self, chunks):
+        """
+        Grade every chunk from an iterator such as iter_csv_chunks().
+
+        Args:
+            chunks (iterable): (users, question_ids, choices) tuples.
+        Returns:
+            Grader: self, for chaining.
+        """
+        for users, question_ids, choices in chunks:
+            self.add(users, question_ids, choices)
+        return self
+
+    def user_results(self):
+        """
+        Return the score and percentage of every user with a submission.
+
+        The percentage is the one question.py's run_quiz prints: correct
+        answers over the number of questions in the exam, times 100.
+
+        Returns:
+            tuple: (user_ids, scores, percentages) where user_ids is a list
+                of user keys.
+        """
+        scores = self.user_scores
+        return list(self.user_ids), scores, scores / max(self.total_questions, 1) * 100
+
+    def question_stats(self):
+        """
+        Return per-question statistics for questions that were answered.
+
+        Returns:
+            dict: question_id, attempts, correct, p_correct (fraction correct)
+            and choice_counts arrays.
+        """
+        answered = np.flatnonzero(self.attempts)
+        attempts = self.attempts[answered]
+        return {
+            'question_id': answered,
+            'attempts': attempts,
+            'correct': self.correct[answered],
+            'p_correct': self.correct[answered] / attempts,
+            'choice_counts': self.choice_counts[answered],
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Grade quiz submissions in bulk.")
+    parser.add_argument('submissions', help="CSV file or directory of .npy columns")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--bank', help="question bank file holding the answer key")
+    source.add_argument('--key', help=".npy answer key indexed by question id")
+    parser.add_argument('--out', help="write user,score,percentage rows to this CSV")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="rows per chunk")
+    args = parser.parse_args()
+
+    answers = np.load(args.key) if args.key else answer_key_from_questions(QuestionBank(args.bank))
+    reader = iter_npy_chunks if os.path.isdir(args.submissions) else iter_csv_chunks
+    grader = Grader(answers).grade(reader(args.submissions, args.chunk_rows))
+
+    user_ids, user_scores, marks = grader.user_results()
+    print(f"Graded {grader.rows} answers from {len(user_ids)} users")
+    if len(marks):
+        print(f"Mean marks obtained: {marks.mean():.1f}")
+    stats = grader.question_stats()
+    for row in range(len(stats['question_id'])):
+        print(f"Question {stats['question_id'][row]}: {stats['p_correct'][row]:.1%} correct"
+              f" of {stats['attempts'][row]}, choices {stats['choice_counts'][row].tolist()}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write('user,score,percentage\n')
+            f.writelines(f"{user},{score},{mark:.1f}\n"
+                         for user, score, mark in zip(user_ids, user_scores.tolist(), marks.tolist()))
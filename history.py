@@ -0,0 +1,284 @@
+"""
+history.py
+
+Move history with undo/redo, and a compact binary format for archived games.
+
+A MoveLog records the cells played on an engine (BitBoard, GameState or
+MNKBoard) together with the position code after every ply. On the 3x3 board
+the code is the base-3 number used by book.py (cell c adds 3**c for X,
+2 * 3**c for O). On m,n,k boards it is the 64-bit Zobrist key kept by
+MNKBoard (see zobrist.py), so every code has a fixed size on any board.
+Undo and redo move a cursor and apply a single engine move, so neither needs
+to copy the board.
+
+Games are archived as fixed-header binary records, appended to one file and
+read back by a streaming generator:
+
+    file    MAGIC, then records back to back
+    record  rows, cols, k, result (one byte each), move count (uint16 LE),
+            then one byte per move (two bytes LE when the board has more
+            than 256 cells)
+
+Classes:
+	MoveLog: Undo/redo move list with per-ply position codes.
+	GameRecord: One archived game.
+	RecordWriter: Appends GameRecords to a file.
+
+Functions:
+	iter_records(path): Stream GameRecords from a file.
+	replay(record): Yield the position after every move of a record.
+"""
+
+import struct
+from collections import namedtuple
+
+from engine import BitBoard
+from mnk import MNKBoard
+from zobrist import zobrist_keys
+
+MAGIC = b'TTTREC1\n'
+HEADER = struct.Struct('<BBBBH')
+
+# Record result byte
+UNFINISHED = 0
+X_WINS = 1
+O_WINS = 2
+DRAW = 3
+
+
+class MoveLog:
+    """
+    Moves played on an engine, with O(1) undo and redo.
+
+    Attributes:
+        engine: BitBoard, GameState or MNKBoard the moves are applied to.
+        moves (list): (cell, player) pairs, including undone moves not yet overwritten.
+        codes (list): Position code after each ply; codes[0] is the starting position.
+            Base-3 book codes on 3x3, Zobrist keys on other boards.
+        cursor (int): Number of moves currently applied.
+    """
+
+    def __init__(self, engine):
+        """
+        Start an empty log for an engine in its starting position.
+
+        Args:
+            engine: BitBoard, GameState or MNKBoard, normally empty.
+        """
+        self.engine = engine
+        self.moves = []
+        self.codes = [0]
+        self.cursor = 0
+        # None on 3x3, where codes are base-3 book codes
+        cells = engine.rows * engine.cols
+        self._zobrist = None if (engine.rows, engine.cols) == (3, 3) else zobrist_keys(cells)
+
+    def __len__(self):
+        """int: Number of moves currently applied."""
+        return self.cursor
+
+    @property
+    def code(self):
+        """int: Position code of the current position."""
+        return self.codes[self.cursor]
+
+    def play(self, cell, player=None):
+        """
+        Play a move and record it, discarding any undone moves.
+
+        Args:
+            cell (int): Cell index.
+            player (int, optional): X or O. Defaults to the player to move.
+        """
+        if player is None:
+            player = self.engine.to_move()
+        if self.cursor < len(self.moves):
+            del self.moves[self.cursor:]
+            del self.codes[self.cursor + 1:]
+        self.engine.play(cell, player)
+        self.moves.append((cell, player))
+        if self._zobrist is None:
+            self.codes.append(self.codes[-1] + (player + 1) * 3 ** cell)
+        else:
+            self.codes.append(self.codes[-1] ^ self._zobrist[player][cell])
+        self.cursor += 1
+
+    def can_undo(self):
+        """
+        Check if there is a move to undo.
+
+        Returns:
+            bool: True if at least one move is applied.
+        """
+        return self.cursor > 0
+
+    def can_redo(self):
+        """
+        Check if there is an undone move to replay.
+
+        Returns:
+            bool: True if redo() would apply a move.
+        """
+        return self.cursor < len(self.moves)
+
+    def undo(self):
+        """
+        Take back the last applied move.
+
+        Returns:
+            tuple: The (cell, player) taken back, or None if there is nothing to undo.
+        """
+        if not self.cursor:
+            return None
+        self.cursor -= 1
+        cell, player = self.moves[self.cursor]
+        self.engine.undo(cell, player)
+        return cell, player
+
+    def redo(self):
+        """
+        Replay the most recently undone move.
+
+        Returns:
+            tuple: The (cell, player) replayed, or None if there is nothing to redo.
+        """
+        if self.cursor == len(self.moves):
+            return None
+        cell, player = self.moves[self.cursor]
+        self.engine.play(cell, player)
+        self.cursor += 1
+        return cell, player
+
+    def result(self):
+        """
+        Return the result byte for the current position.
+
+        Returns:
+            int: X_WINS, O_WINS, DRAW or UNFINISHED.
+        """
+        winner = self.engine.winner()
+        if winner is not None:
+            return X_WINS + winner
+        if self.engine.is_full():
+            return DRAW
+        return UNFINISHED
+
+    def to_record(self):
+        """
+        Return the applied moves as a GameRecord.
+
+        Returns:
+            GameRecord: The game so far.
+        """
+        engine = self.engine
+        return GameRecord(engine.rows, engine.cols, engine.k, self.result(),
+                          tuple(cell for cell, _ in self.moves[:self.cursor]))
+
+
+GameRecord = namedtuple('GameRecord', ['rows', 'cols', 'k', 'result', 'moves'])
+GameRecord.__doc__ = """One archived game: board shape, result byte and the cells played in order."""
+
+
+def _move_format(rows, cols):
+    """
+    Return the struct format character for one move on a board.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+    Returns:
+        str: 'B' for boards of up to 256 cells, 'H' otherwise.
+    """
+    return 'B' if rows * cols <= 256 else 'H'
+
+
+class RecordWriter:
+    """
+    Appends GameRecords to a binary archive file.
+
+    Attributes:
+        path (str): Archive file.
+    """
+
+    def __init__(self, path):
+        """
+        Open the archive for appending, writing the header if the file is new.
+
+        Args:
+            path (str): Archive file.
+        """
+        self.path = path
+        self._file = open(path, 'ab')  # pylint: disable=consider-using-with
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(self, record):
+        """
+        Append one game.
+
+        Args:
+            record (GameRecord): The game, e.g. from MoveLog.to_record().
+        """
+        fmt = _move_format(record.rows, record.cols)
+        self._file.write(HEADER.pack(record.rows, record.cols, record.k,
+                                     record.result, len(record.moves)))
+        self._file.write(struct.pack(f'<{len(record.moves)}{fmt}', *record.moves))
+
+    def close(self):
+        """Flush and close the archive."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_records(path):
+    """
+    Stream the games stored in an archive file.
+
+    Args:
+        path (str): Archive file written by RecordWriter.
+    Yields:
+        GameRecord: The next game.
+    Raises:
+        ValueError: If the file is not an archive or ends mid-record.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a game record archive")
+        while True:
+            header = f.read(HEADER.size)
+            if not header:
+                return
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} ends inside a record header")
+            rows, cols, k, result, count = HEADER.unpack(header)
+            fmt = _move_format(rows, cols)
+            size = struct.calcsize(f'<{count}{fmt}')
+            data = f.read(size)
+            if len(data) < size:
+                raise ValueError(f"{path} ends inside a record")
+            yield GameRecord(rows, cols, k, result, struct.unpack(f'<{count}{fmt}', data))
+
+
+def replay(record):
+    """
+    Replay a record, yielding the position after every move.
+
+    The same engine object is yielded each time, updated in place.
+
+    Args:
+        record (GameRecord): The game to replay.
+    Yields:
+        tuple: (ply, engine) with ply counting from 1.
+    """
+    if (record.rows, record.cols, record.k) == (3, 3, 3):
+        engine = BitBoard()
+    else:
+        engine = MNKBoard(record.rows, record.cols, record.k)
+    for ply, cell in enumerate(record.moves, 1):
+        engine.play(cell, engine.to_move())
+        yield ply, engine
@@ -0,0 +1,324 @@
+"""
+instrumentation.py
+
+Opt-in timing and counters for the game loop.
+
+Move handlers ask the shared METRICS object for a PhaseTimer at the start of
+each call. While instrumentation is disabled, or when the call is not
+sampled, they get None back and skip every measurement with a single truth
+test, so the disabled cost is one method call per move. Enabled timers record
+the time spent in each phase (board mutation, win checks, AI, GUI updates)
+into fixed-bucket histograms that can be exported in the Prometheus text
+format, over a local HTTP endpoint, or appended to a JSONL file.
+
+Environment (read by configure_from_env):
+    TICTACTOE_METRICS         Sample rate between 0 and 1; enables instrumentation.
+                              Without it SIGUSR1 still turns it on at runtime.
+    TICTACTOE_METRICS_PORT    Serve Prometheus text on this localhost port.
+    TICTACTOE_METRICS_JSONL   File that write_jsonl() appends snapshots to.
+
+Classes:
+	Histogram: Cumulative-bucket latency histogram.
+	PhaseTimer: Lap timer handed to one instrumented call.
+	Metrics: Registry of histograms and counters with export helpers.
+
+Functions:
+	configure_from_env(metrics): Apply the TICTACTOE_METRICS* environment variables.
+"""
+
+import bisect
+import json
+import os
+import random
+import signal
+import threading
+import time
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0)
+
+
+class Histogram:
+    """
+    A latency histogram with fixed bucket bounds.
+
+    Attributes:
+        bounds (tuple): Upper bound of each bucket, in seconds.
+        counts (list): Observations per bucket, plus one overflow bucket.
+        total (float): Sum of all observations.
+        count (int): Number of observations.
+    """
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            bounds (tuple, optional): Bucket upper bounds. Defaults to DEFAULT_BUCKETS.
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        """
+        Record one observation.
+
+        Args:
+            seconds (float): Observed duration.
+        """
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Return (bound, observations at or below bound) pairs, ending with '+Inf'.
+
+        Returns:
+            list: Cumulative bucket counts in Prometheus order.
+        """
+        pairs = []
+        running = 0
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class PhaseTimer:
+    """
+    Lap timer for one instrumented call.
+
+    Attributes:
+        metrics (Metrics): Registry the laps are recorded in.
+        start (float): perf_counter() when the timer was created.
+        last (float): perf_counter() at the previous lap.
+    """
+    __slots__ = ('metrics', 'start', 'last')
+
+    def __init__(self, metrics):
+        """
+        Start timing.
+
+        Args:
+            metrics (Metrics): Registry the laps are recorded in.
+        """
+        self.metrics = metrics
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        """
+        Record the time since the previous lap as phase.
+
+        Args:
+            phase (str): Phase name, e.g. 'board', 'win_check', 'ai' or 'gui'.
+        """
+        now = time.perf_counter()
+        self.metrics.observe(phase, now - self.last)
+        self.last = now
+
+    def done(self, operation):
+        """
+        Record the whole call's duration as operation and count it.
+
+        Args:
+            operation (str): Name of the instrumented call.
+        """
+        self.metrics.observe(operation, time.perf_counter() - self.start)
+        self.metrics.count(operation)
+
+
+class Metrics:
+    """
+    Registry of phase histograms and event counters.
+
+    Attributes:
+        enabled (bool): Whether timer() hands out timers.
+        sample_rate (float): Fraction of calls that are timed while enabled.
+        histograms (dict): Phase name -> Histogram.
+        counters (dict): Event name -> count.
+        jsonl_path (str): File write_jsonl() appends to by default.
+    """
+
+    def __init__(self):
+        """Initialize a disabled, empty registry."""
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.histograms = {}
+        self.counters = {}
+        self.jsonl_path = None
+        self._lock = threading.Lock()
+
+    def enable(self, sample_rate=1.0):
+        """
+        Start timing calls.
+
+        Args:
+            sample_rate (float, optional): Fraction of calls to time. Defaults to 1.0.
+        """
+        self.sample_rate = sample_rate
+        self.enabled = sample_rate > 0
+
+    def disable(self):
+        """Stop timing calls; recorded data is kept."""
+        self.enabled = False
+
+    def toggle(self, *_args):
+        """Flip enabled; usable directly as a signal handler."""
+        self.enabled = not self.enabled
+
+    def timer(self):
+        """
+        Return a timer for this call, or None if it should not be measured.
+
+        Returns:
+            PhaseTimer: A running timer, or None when disabled or not sampled.
+        """
+        if not self.enabled:
+            return None
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        return PhaseTimer(self)
+
+    def observe(self, phase, seconds):
+        """
+        Record a duration for phase.
+
+        Args:
+            phase (str): Phase name.
+            seconds (float): Duration.
+        """
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, event, amount=1):
+        """
+        Increment an event counter.
+
+        Args:
+            event (str): Counter name.
+            amount (int, optional): Increment. Defaults to 1.
+        """
+        with self._lock:
+            self.counters[event] = self.counters.get(event, 0) + amount
+
+    def reset(self):
+        """Discard every recorded observation and count."""
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def snapshot(self):
+        """
+        Return the recorded data as plain dictionaries.
+
+        Returns:
+            dict: time, counters and per-phase histogram data.
+        """
+        with self._lock:
+            return {
+                'time': time.time(),
+                'counters': dict(self.counters),
+                'phases': {
+                    phase: {'count': h.count, 'sum': h.total,
+                            'buckets': [[str(bound), n] for bound, n in h.cumulative()]}
+                    for phase, h in self.histograms.items()
+                },
+            }
+
+    def prometheus_text(self):
+        """
+        Render the recorded data in the Prometheus text exposition format.
+
+        Returns:
+            str: Metric families for phase latencies and event counts.
+        """
+        lines = ['# TYPE tictactoe_phase_seconds histogram']
+        with self._lock:
+            for phase, histogram in sorted(self.histograms.items()):
+                for bound, count in histogram.cumulative():
+                    lines.append(f'tictactoe_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {count}')
+                lines.append(f'tictactoe_phase_seconds_sum{{phase="{phase}"}} {histogram.total}')
+                lines.append(f'tictactoe_phase_seconds_count{{phase="{phase}"}} {histogram.count}')
+            lines.append('# TYPE tictactoe_events_total counter')
+            for event, count in sorted(self.counters.items()):
+                lines.append(f'tictactoe_events_total{{event="{event}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_jsonl(self, path=None):
+        """
+        Append a snapshot as one JSON line.
+
+        Args:
+            path (str, optional): Destination file. Defaults to jsonl_path.
+        """
+        path = path or self.jsonl_path
+        if path:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.snapshot()) + '\n')
+
+    def serve_prometheus(self, port, host='127.0.0.1'):
+        """
+        Serve prometheus_text() over HTTP from a daemon thread.
+
+        Args:
+            port (int): TCP port.
+            host (str, optional): Interface to bind. Defaults to localhost.
+        Returns:
+            ThreadingHTTPServer: The running server; call shutdown() to stop it.
+        """
+        # Imported on demand so the game modules do not load the HTTP stack
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # pylint: disable=import-outside-toplevel
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answer every GET with the current metrics."""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Send the metrics page."""
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                """Keep request logs off the console."""
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Shared registry used by the game modules
+METRICS = Metrics()
+
+
+def configure_from_env(metrics=METRICS):
+    """
+    Apply the TICTACTOE_METRICS* environment variables.
+
+    Instrumentation stays off unless TICTACTOE_METRICS is set, but SIGUSR1
+    (where available) toggles it at runtime either way, so a process started
+    without metrics can be measured without a restart.
+
+    Args:
+        metrics (Metrics, optional): Registry to configure. Defaults to METRICS.
+    """
+    rate = os.environ.get('TICTACTOE_METRICS')
+    if rate:
+        metrics.enable(float(rate))
+    metrics.jsonl_path = os.environ.get('TICTACTOE_METRICS_JSONL')
+    port = os.environ.get('TICTACTOE_METRICS_PORT')
+    if port:
+        metrics.serve_prometheus(int(port))
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, metrics.toggle)
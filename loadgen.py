@@ -0,0 +1,391 @@
+"""
+loadgen.py
+
+Headless load generator and replay harness for the game-handling logic.
+
+Each simulated player owns a TicTacToeGame without a window and drives it
+through handle_singleplayer_move or handle_multiplayer_move, the same entry
+points the GUI calls on a click. Clicks are either synthetic (random free
+cells from a per-player seeded RNG) or replayed from a JSONL recording. Any
+run can be recorded and replayed later.
+
+Between clicks a player thinks for a time drawn from a distribution. Think
+time runs on a virtual clock: players wait on a heap ordered by their next
+click, so hours of simulated think time cost no real time. The same seed
+always interleaves the players the same way. Think time sets how many games
+are open at once, and so how much memory the run holds.
+
+Every handler call is timed on its own. Memory is sampled every
+--sample-every clicks, as the process RSS or, with --trace-memory, the
+Python heap seen by tracemalloc. With tracing, the reported growth leaves
+out the harness's own bookkeeping, and the source lines whose allocations
+grew most since the first sample are listed; that is where a leak shows up.
+
+Recording format, one game per line:
+    {"player": 0, "mode": "single", "clicks": [[1, 1], [0, 2], ...]}
+
+Usage:
+    python loadgen.py [--players N] [--games N] [--mode single|multi|mixed]
+                      [--think SPEC] [--ai STRATEGY] [--seed N]
+                      [--record FILE | --replay FILE] [--trace-memory] [--out FILE]
+
+Think time SPEC: 'none', 'const:S', 'uniform:A:B', 'exp:MEAN' or
+'lognormal:MU:SIGMA', in seconds.
+
+Classes:
+	Player: One simulated player and the game it is playing.
+
+Functions:
+	think_time(spec): Parse a think-time distribution.
+	load_recording(path): Read recorded games grouped by player.
+	run(players, games, mode, think, ai, seed, recording, record, sample_every, trace_memory): Drive the handlers and report.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import time
+import tracemalloc
+from array import array
+
+from benchmark import percentile
+from tictactoe import TicTacToeGame
+
+MODES = ('single', 'multi', 'mixed')
+
+# Handler each mode's clicks go to
+HANDLERS = {
+    'single': TicTacToeGame.handle_singleplayer_move,
+    'multi': TicTacToeGame.handle_multiplayer_move,
+}
+
+
+def think_time(spec):
+    """
+    Parse a think-time distribution.
+
+    Args:
+        spec (str): 'none', 'const:S', 'uniform:A:B', 'exp:MEAN' or
+            'lognormal:MU:SIGMA', in seconds.
+    Returns:
+        callable: Draws one think time in seconds from a random.Random.
+    Raises:
+        ValueError: If spec is malformed.
+    """
+    name, *params = spec.split(':')
+    try:
+        values = [float(param) for param in params]
+    except ValueError:
+        raise ValueError(f"bad think time {spec!r}") from None
+    shapes = {
+        'none': (0, lambda rng: 0.0),
+        'const': (1, lambda rng: values[0]),
+        'uniform': (2, lambda rng: rng.uniform(values[0], values[1])),
+        'exp': (1, lambda rng: rng.expovariate(1 / values[0])),
+        'lognormal': (2, lambda rng: rng.lognormvariate(values[0], values[1])),
+    }
+    if name not in shapes or len(values) != shapes[name][0]:
+        raise ValueError(f"bad think time {spec!r}; use none, const:S, uniform:A:B, "
+                         "exp:MEAN or lognormal:MU:SIGMA")
+    if name == 'exp' and values[0] <= 0:
+        raise ValueError("exp think time needs a positive mean")
+    return shapes[name][1]
+
+
+def load_recording(path):
+    """
+    Read a recording written by run(record=...).
+
+    Args:
+        path (str): JSONL file, one game per line.
+    Returns:
+        dict: Player number -> list of (mode, clicks) games in recorded order.
+    """
+    games = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                game = json.loads(line)
+                games.setdefault(game['player'], []).append(
+                    (game['mode'], [tuple(click) for click in game['clicks']]))
+    return games
+
+
+class Player:
+    """
+    One simulated player.
+
+    Attributes:
+        number (int): Player number, also used in recordings.
+        game (TicTacToeGame): Headless game the player clicks on.
+        rng (random.Random): Source of synthetic clicks and think times.
+        choice (str): 'single', 'multi' or 'mixed', the modes synthetic games use.
+        script (list): Recorded (mode, clicks) games to replay, or None for synthetic play.
+        games_left (int): Games still to start after the current one.
+        mode (str): 'single' or 'multi', the mode of the current game.
+        clicks (list): Clicks made in the current game so far.
+    """
+    __slots__ = ('number', 'game', 'rng', 'choice', 'script', 'games_left', 'mode', 'clicks',
+                 '_replay')
+
+    def __init__(self, number, game, rng, choice='single', games=1, script=None):
+        """
+        Initialize a player and start its first game.
+
+        Args:
+            number (int): Player number.
+            game (TicTacToeGame): Headless game to play on.
+            rng (random.Random): Random source of this player.
+            choice (str, optional): 'single', 'multi' or 'mixed'. Defaults to 'single'.
+            games (int, optional): Synthetic games to play. Defaults to 1.
+            script (list, optional): Recorded (mode, clicks) games to replay
+                instead; games is then ignored.
+        """
+        self.number = number
+        self.game = game
+        self.rng = rng
+        self.choice = choice
+        self.script = script
+        self.games_left = len(script) if script is not None else games
+        self.mode = None
+        self.clicks = []
+        self._replay = None
+        self.next_game()
+
+    def next_game(self):
+        """
+        Start the player's next game.
+
+        Returns:
+            bool: False if the player has no games left.
+        """
+        if self.games_left <= 0:
+            return False
+        self.games_left -= 1
+        self.game.new_game()
+        self.clicks = []
+        if self.script is not None:
+            self.mode, clicks = self.script[len(self.script) - self.games_left - 1]
+            self._replay = iter(clicks)
+        elif self.choice == 'mixed':
+            self.mode = self.rng.choice(('single', 'multi'))
+        else:
+            self.mode = self.choice
+        return True
+
+    def next_click(self):
+        """
+        Return the player's next click in the current game.
+
+        Returns:
+            tuple: (row, col), or None once the game is over or its recording ends.
+        """
+        game = self.game
+        if game.stop_game or game.is_full():
+            return None
+        if self._replay is not None:
+            return next(self._replay, None)
+        free = [(i, j) for i in range(game.rows) for j in range(game.cols)
+                if game.board[i][j] == ' ']
+        return free[self.rng.randrange(len(free))]
+
+
+def _memory_bytes(tracing):
+    """
+    Return the memory currently used by the process.
+
+    Args:
+        tracing (bool): Report tracemalloc's traced Python heap instead of RSS.
+    Returns:
+        int: Bytes in use, or None if the platform offers no measure.
+    """
+    if tracing:
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open('/proc/self/statm', encoding='ascii') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    # Peak rather than current RSS, in kilobytes on Linux and bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _latency_summary(latencies):
+    """
+    Summarize per-call latencies.
+
+    Args:
+        latencies (array): Call durations in nanoseconds.
+    Returns:
+        dict: calls and p50/p99/p999/max latency in microseconds.
+    """
+    latencies = sorted(latencies)
+    return {
+        'calls': len(latencies),
+        'p50_us': percentile(latencies, 0.50) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+        'p999_us': percentile(latencies, 0.999) / 1000,
+        'max_us': latencies[-1] / 1000,
+    }
+
+
+def run(players=1000, games=10, mode='single', think='exp:2', ai='heuristic', seed=0,
+        recording=None, record=None, sample_every=10000, trace_memory=False):
+    """
+    Drive the game handlers with simulated players and report the load.
+
+    Args:
+        players (int, optional): Simulated players for synthetic play. Defaults to 1000.
+        games (int, optional): Games per synthetic player. Defaults to 10.
+        mode (str, optional): 'single', 'multi' or 'mixed'. Defaults to 'single'.
+        think (str, optional): Think-time spec, see think_time(). Defaults to 'exp:2'.
+        ai (str, optional): Computer strategy for single-player games. Defaults to 'heuristic'.
+        seed (int, optional): Seed for clicks, think times and the AI. Defaults to 0.
+        recording (dict, optional): Games from load_recording() to replay
+            instead of synthetic play; players, games and mode are then ignored.
+        record (str, optional): JSONL file to write every finished game to.
+        sample_every (int, optional): Clicks between memory samples. Defaults to 10000.
+        trace_memory (bool, optional): Measure the Python heap with tracemalloc
+            and list the lines whose allocations grew. Defaults to False.
+    Returns:
+        dict: Throughput, per-handler latency percentiles and memory samples.
+    Raises:
+        ValueError: If mode or think is not valid.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    draw_think = think_time(think)
+    root_rng = random.Random(seed)
+    numbers = sorted(recording) if recording is not None else range(players)
+    roster = {}
+    for number in numbers:
+        game = TicTacToeGame(ai=ai, rng=random.Random(root_rng.getrandbits(64)))
+        player_rng = random.Random(root_rng.getrandbits(64))
+        script = recording[number] if recording is not None else None
+        roster[number] = Player(number, game, player_rng, mode, games, script)
+    heap = [(draw_think(player.rng), number) for number, player in roster.items()]
+    heapq.heapify(heap)
+
+    if trace_memory:
+        tracemalloc.start()
+    record_file = open(record, 'w', encoding='utf-8') if record else None
+    # Compact arrays keep the harness's own growth small next to the games'
+    latencies = {name: array('q') for name in HANDLERS}
+    samples = []
+    baseline = None
+    clicks = finished = 0
+    now = 0.0
+    clock = time.perf_counter_ns
+    started = time.perf_counter()
+    try:
+        while heap:
+            now, number = heapq.heappop(heap)
+            player = roster[number]
+            click = player.next_click()
+            if click is None:
+                finished += 1
+                if record_file is not None:
+                    record_file.write(json.dumps({'player': number, 'mode': player.mode,
+                                                  'clicks': player.clicks}) + '\n')
+                if not player.next_game():
+                    # Retired players drop their game, so only leaked memory stays behind
+                    del roster[number]
+                    continue
+            else:
+                start = clock()
+                HANDLERS[player.mode](player.game, *click)
+                latencies[player.mode].append(clock() - start)
+                player.clicks.append(click)
+                clicks += 1
+                if clicks % sample_every == 0:
+                    samples.append((clicks, len(roster), _memory_bytes(trace_memory)))
+                    if baseline is None and trace_memory:
+                        baseline = tracemalloc.take_snapshot()
+            heapq.heappush(heap, (now + draw_think(player.rng), number))
+        elapsed = time.perf_counter() - started
+
+        samples.append((clicks, len(roster), _memory_bytes(trace_memory)))
+        growth_bytes = None
+        top_growth = []
+        if baseline is not None:
+            # Leave out the harness's own latency arrays and samples
+            harness = [tracemalloc.Filter(False, __file__)]
+            growth = tracemalloc.take_snapshot().filter_traces(harness).compare_to(
+                baseline.filter_traces(harness), 'lineno')
+            growth_bytes = sum(stat.size_diff for stat in growth)
+            top_growth = [str(stat) for stat in growth[:5] if stat.size_diff > 0]
+        elif samples[0][2] is not None and samples[-1][2] is not None:
+            growth_bytes = samples[-1][2] - samples[0][2]
+    finally:
+        if record_file is not None:
+            record_file.close()
+        if trace_memory:
+            tracemalloc.stop()
+
+    handler_ns = sum(sum(calls) for calls in latencies.values())
+    return {
+        'players': len(numbers),
+        'games': finished,
+        'clicks': clicks,
+        'wall_seconds': elapsed,
+        'simulated_seconds': now,
+        'clicks_per_sec': clicks / elapsed if elapsed else 0.0,
+        'handler_clicks_per_sec': clicks / (handler_ns / 1e9) if handler_ns else 0.0,
+        'games_per_sec': finished / elapsed if elapsed else 0.0,
+        'latency': {name: _latency_summary(calls) for name, calls in latencies.items() if calls},
+        'memory': {
+            'source': 'tracemalloc' if trace_memory else 'rss',
+            'samples': samples,
+            'growth_bytes': growth_bytes,
+            'top_growth': top_growth,
+        },
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay or generate load on the game handlers.")
+    parser.add_argument('--players', type=int, default=1000, help="simulated players")
+    parser.add_argument('--games', type=int, default=10, help="games per player")
+    parser.add_argument('--mode', default='single', choices=MODES, help="game mode")
+    parser.add_argument('--think', default='exp:2', help="think-time distribution")
+    parser.add_argument('--ai', default='heuristic', help="computer strategy")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--record', help="write the games played to this JSONL file")
+    source.add_argument('--replay', help="replay the games in this JSONL file")
+    parser.add_argument('--sample-every', type=int, default=10000,
+                        help="clicks between memory samples")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="measure the Python heap with tracemalloc")
+    parser.add_argument('--out', help="write the report as JSON to this file")
+    args = parser.parse_args()
+    try:
+        think_time(args.think)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = run(args.players, args.games, args.mode, args.think, args.ai, args.seed,
+                 load_recording(args.replay) if args.replay else None, args.record,
+                 args.sample_every, args.trace_memory)
+    print(f"{report['players']} players, {report['games']} games, {report['clicks']} clicks"
+          f" in {report['wall_seconds']:.2f} s ({report['simulated_seconds']:.0f} s simulated)")
+    print(f"throughput {report['clicks_per_sec']:,.0f} clicks/s, "
+          f"{report['games_per_sec']:,.0f} games/s")
+    for name, stats in report['latency'].items():
+        print(f"{name:<7} p50 {stats['p50_us']:8.1f}  p99 {stats['p99_us']:8.1f}"
+              f"  p999 {stats['p999_us']:8.1f}  max {stats['max_us']:9.1f} us")
+    memory = report['memory']
+    if memory['growth_bytes'] is not None:
+        print(f"memory ({memory['source']}) grew {memory['growth_bytes'] / 1024:,.1f} KiB "
+              f"from the first to the last sample")
+    for line in memory['top_growth']:
+        print(f"  {line}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
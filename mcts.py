@@ -0,0 +1,318 @@
+"""
+mcts.py
+
+Monte Carlo Tree Search opponent for 3x3 and m,n,k boards.
+
+The search grows a UCT tree from the current position. Each iteration walks
+down the tree by the UCB1 rule, expands one untried move, plays the game out
+with random candidate moves and backs the result up the path. Moves are
+applied to the engine in place and undone afterwards, so an iteration
+allocates only the new tree node.
+
+Every search runs under an iteration budget, a wall-clock budget or both,
+which caps the latency of a move. With more than one worker the search is
+root-parallel: each worker process grows an independent tree from the same
+position with its own seed, and the root visit counts are summed before the
+most visited move is chosen. Worker seeds are drawn from the caller's RNG, so
+iteration-budgeted searches are reproducible.
+
+Classes:
+	MCTSPlayer: Budgeted, optionally multi-process MCTS move picker.
+
+Functions:
+	search(engine, player, iterations, time_limit, rng, exploration): Grow one tree and return root statistics.
+	get_player(): Return the shared MCTSPlayer used by the ai module.
+"""
+
+import math
+import os
+import random
+import time
+
+from engine import BitBoard, X, O
+from mnk import MNKBoard
+
+DEFAULT_TIME_LIMIT = 1.0
+DEFAULT_EXPLORATION = math.sqrt(2)
+# Root-parallel workers of the shared player
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Playout reward for the player who made the move into a node
+WIN = 1.0
+DRAW = 0.5
+
+
+class _Node:
+    """
+    One position in the search tree.
+
+    Attributes:
+        move (int): Cell played to reach this node, None at the root.
+        player (int): X or O, the player who played move.
+        parent (_Node): Node this one was expanded from.
+        children (list): Expanded child nodes.
+        untried (list): Candidate cells not yet expanded.
+        visits (int): Playouts through this node.
+        reward (float): Sum of playout rewards for player.
+    """
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'visits', 'reward')
+
+    def __init__(self, move, player, parent, untried):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.reward = 0.0
+
+    def select(self, exploration):
+        """
+        Return the child with the highest UCB1 score.
+
+        Args:
+            exploration (float): Weight of the exploration term.
+        Returns:
+            _Node: The selected child.
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.reward / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+
+def _outcome(engine, player):
+    """
+    Return the playout reward for player if the game is over.
+
+    Args:
+        engine: BitBoard or MNKBoard, just after player moved.
+        player (int): X or O, the player who just moved.
+    Returns:
+        float: WIN or DRAW if the game is over, otherwise None.
+    """
+    if engine.has_won(player):
+        return WIN
+    if engine.is_full():
+        return DRAW
+    return None
+
+
+def search(engine, player, iterations=None, time_limit=None, rng=random,
+           exploration=DEFAULT_EXPLORATION):
+    """
+    Grow one search tree from the engine's position.
+
+    The engine is used as a scratch board and is back in its original
+    position when the function returns.
+
+    Args:
+        engine: BitBoard or MNKBoard holding the position.
+        player (int): X or O, the player to move.
+        iterations (int, optional): Most playouts to run. Defaults to no limit.
+        time_limit (float, optional): Most seconds to search. Defaults to no limit.
+        rng (random.Random, optional): Random source for expansion and playouts.
+            Defaults to the global random module.
+        exploration (float, optional): UCB1 exploration weight. Defaults to sqrt(2).
+    Returns:
+        dict: Root move -> (visits, reward) for every expanded move.
+    Raises:
+        ValueError: If neither iterations nor time_limit is given.
+    """
+    if iterations is None and time_limit is None:
+        raise ValueError("search needs an iteration or time budget")
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    root = _Node(None, 1 - player, None, list(engine.candidate_moves()))
+    done = 0
+    path = []
+    while iterations is None or done < iterations:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        done += 1
+        node = root
+        result = None
+
+        # Selection: descend through fully expanded nodes
+        while not node.untried and node.children:
+            node = node.select(exploration)
+            engine.play(node.move, node.player)
+            path.append(node)
+
+        # Expansion: add one untried move unless the game is already over
+        if node.untried:
+            untried = node.untried
+            index = rng.randrange(len(untried))
+            untried[index], untried[-1] = untried[-1], untried[index]
+            cell = untried.pop()
+            mover = 1 - node.player
+            engine.play(cell, mover)
+            result = _outcome(engine, mover)
+            child = _Node(cell, mover, node,
+                          [] if result is not None else list(engine.candidate_moves()))
+            node.children.append(child)
+            node = child
+            path.append(node)
+        elif node is not root:
+            result = _outcome(engine, node.player)
+
+        # Playout: random candidate moves until the game ends
+        rollout = []
+        mover = node.player
+        while result is None:
+            moves = engine.candidate_moves()
+            if not moves:
+                result = DRAW
+                break
+            mover = 1 - mover
+            cell = moves[rng.randrange(len(moves))]
+            engine.play(cell, mover)
+            rollout.append((cell, mover))
+            result = _outcome(engine, mover)
+        for cell, mover_ in reversed(rollout):
+            engine.undo(cell, mover_)
+
+        # Backpropagation: losses add nothing to a node's reward
+        winner = mover if result == WIN else None
+        root.visits += 1
+        for step in reversed(path):
+            step.visits += 1
+            if winner is None:
+                step.reward += DRAW
+            elif step.player == winner:
+                step.reward += WIN
+            engine.undo(step.move, step.player)
+        path.clear()
+
+    return {child.move: (child.visits, child.reward) for child in root.children}
+
+
+def _search_position(rows, cols, k, stones, player, iterations, time_limit, seed, exploration):
+    """
+    Rebuild a position and search it in a worker process.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        stones (list): (cell, player) pairs of the occupied cells.
+        player (int): X or O, the player to move.
+        iterations (int): Most playouts, or None.
+        time_limit (float): Most seconds, or None.
+        seed (int): Seed of the worker's random source.
+        exploration (float): UCB1 exploration weight.
+    Returns:
+        dict: Root statistics as returned by search().
+    """
+    if (rows, cols, k) == (3, 3, 3):
+        engine = BitBoard()
+    else:
+        engine = MNKBoard(rows, cols, k)
+    for cell, owner in stones:
+        engine.play(cell, owner)
+    return search(engine, player, iterations, time_limit, random.Random(seed), exploration)
+
+
+class MCTSPlayer:
+    """
+    Picks moves by Monte Carlo Tree Search under a per-move budget.
+
+    Attributes:
+        iterations (int): Playouts per move and worker, or None for no limit.
+        time_limit (float): Seconds per move, or None for no limit.
+        workers (int): Trees grown in parallel; 1 searches in the calling process.
+        exploration (float): UCB1 exploration weight.
+    """
+
+    def __init__(self, iterations=None, time_limit=DEFAULT_TIME_LIMIT, workers=1,
+                 exploration=DEFAULT_EXPLORATION):
+        """
+        Initialize the player; worker processes are started on first use.
+
+        Args:
+            iterations (int, optional): Playouts per move and worker. Defaults to no limit.
+            time_limit (float, optional): Seconds per move. Defaults to DEFAULT_TIME_LIMIT.
+            workers (int, optional): Trees grown in parallel. Defaults to 1.
+            exploration (float, optional): UCB1 exploration weight. Defaults to sqrt(2).
+        Raises:
+            ValueError: If there is no budget or workers is not positive.
+        """
+        if iterations is None and time_limit is None:
+            raise ValueError("MCTSPlayer needs an iteration or time budget")
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.workers = workers
+        self.exploration = exploration
+        self._executor = None
+
+    def best_move(self, engine, player, rng=random):
+        """
+        Search the position and return the most visited move.
+
+        Args:
+            engine: BitBoard or MNKBoard holding the position; it is not changed.
+            player (int): X or O, the player to move.
+            rng (random.Random, optional): Source of the search seeds.
+                Defaults to the global random module.
+        Returns:
+            int: Cell index of the move, or None if the game is over.
+        """
+        if engine.winner() is not None:
+            return None
+        moves = engine.candidate_moves()
+        if len(moves) <= 1:
+            return moves[0] if moves else None
+
+        seeds = [rng.getrandbits(64) for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [search(engine, player, self.iterations, self.time_limit,
+                              random.Random(seeds[0]), self.exploration)]
+        else:
+            if self._executor is None:
+                # Imported on first parallel search; it pulls in multiprocessing
+                from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+                self._executor = ProcessPoolExecutor(self.workers)
+            stones = [(cell, X if engine.symbol_at(cell) == 'X' else O)
+                      for cell in range(engine.rows * engine.cols)
+                      if engine.symbol_at(cell) != ' ']
+            futures = [self._executor.submit(_search_position, engine.rows, engine.cols,
+                                             engine.k, stones, player, self.iterations,
+                                             self.time_limit, seed, self.exploration)
+                       for seed in seeds]
+            results = [future.result() for future in futures]
+
+        visits = {}
+        for result in results:
+            for move, (count, _) in result.items():
+                visits[move] = visits.get(move, 0) + count
+        # Ties go to the lowest cell so merged results do not depend on worker order
+        return min(visits, key=lambda move: (-visits[move], move))
+
+    def close(self):
+        """Shut down the worker processes, if any were started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_PLAYER = None
+
+
+def get_player():
+    """
+    Return the shared player, creating it on first use.
+
+    Returns:
+        MCTSPlayer: Root-parallel player with DEFAULT_WORKERS workers and
+            a DEFAULT_TIME_LIMIT second budget per move.
+    """
+    global _PLAYER  # pylint: disable=global-statement
+    if _PLAYER is None:
+        _PLAYER = MCTSPlayer(time_limit=DEFAULT_TIME_LIMIT, workers=DEFAULT_WORKERS)
+    return _PLAYER
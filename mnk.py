@@ -0,0 +1,352 @@
+"""
+mnk.py
+
+Engine for m,n,k games: an m x n board where k in a row wins (Gomoku is 15,15,5).
+
+Cells are stored in a flat bytearray. Every k-cell window (a segment of a row,
+column or diagonal that could hold a winning line) keeps a count of each
+player's marks, and each cell keeps a count of the windows it would complete
+for each player. A move only touches the windows through it, at most 4k of
+them, so wins are detected, and winning or blocking cells are known, without
+scanning the board. The move count doubles as the empty-cell count for tie
+detection. The board also keeps a frontier of empty cells within a small
+radius of any stone, so move generation on large boards does not need to scan
+the whole grid, and a Zobrist key of the position updated with one XOR per move.
+
+The class mirrors the BitBoard interface from engine.py, so TicTacToeGame and
+the AI can use either one.
+
+Classes:
+	MNKBoard: Mutable m x n position with incremental line counters and a move frontier.
+"""
+
+from engine import X, O, PLAYERS
+from zobrist import zobrist_keys
+
+# Row/column steps of the four line directions
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class MNKBoard:
+    """
+    An m x n board where a player needs k in a row to win.
+
+    Attributes:
+        rows (int): Number of rows (m).
+        cols (int): Number of columns (n).
+        k (int): Marks in a row needed to win.
+        radius (int): Distance from a stone within which empty cells are candidates.
+        cells (bytearray): 0 for empty, player + 1 for an occupied cell.
+        moves (list): Cells played so far, in order.
+        frontier (set): Empty cells within radius of at least one stone.
+        key (int): Zobrist key of the position.
+        center (int): Cell nearest the middle of the board.
+        corners (tuple): The four corner cells.
+        edges (tuple): Border cells that are not corners.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3, radius=1):
+        """
+        Initialize an empty board.
+
+        Args:
+            rows (int, optional): Number of rows. Defaults to 3.
+            cols (int, optional): Number of columns. Defaults to 3.
+            k (int, optional): Marks in a row needed to win. Defaults to 3.
+            radius (int, optional): Distance from a stone within which empty
+                cells are move candidates. Defaults to 1.
+        Raises:
+            ValueError: If k cannot fit on the board.
+        """
+        if k < 1 or k > max(rows, cols):
+            raise ValueError(f"k={k} does not fit on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.radius = radius
+        self.cells = bytearray(rows * cols)
+        self.moves = []
+        self.frontier = set()
+        self.key = 0
+        self._zobrist = zobrist_keys(rows * cols)
+        # Number of stones within radius of each cell
+        self._near = [0] * (rows * cols)
+        # Ply at which a line was first completed, or None
+        self._win_ply = None
+
+        # Cells of every k-cell window, and the windows through each cell
+        self._windows = []
+        cell_windows = [[] for _ in range(rows * cols)]
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in DIRECTIONS:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        window = tuple(cols * (i + di * t) + j + dj * t for t in range(k))
+                        for cell in window:
+                            cell_windows[cell].append(len(self._windows))
+                        self._windows.append(window)
+        self._cell_windows = [tuple(windows) for windows in cell_windows]
+        # Marks of each player per window
+        self._counts = ([0] * len(self._windows), [0] * len(self._windows))
+        # Windows each empty cell would complete, per player
+        initial = [len(windows) if k == 1 else 0 for windows in self._cell_windows]
+        self._threats = (initial, list(initial))
+
+        self.center = cols * (rows // 2) + cols // 2
+        last_row = cols * (rows - 1)
+        self.corners = tuple(sorted({0, cols - 1, last_row, last_row + cols - 1}))
+        self.edges = tuple(cell for cell in range(rows * cols)
+                           if cell not in self.corners
+                           and (cell < cols or cell >= last_row
+                                or cell % cols in (0, cols - 1)))
+
+        self._neighbours = []
+        for cell in range(rows * cols):
+            i, j = divmod(cell, cols)
+            self._neighbours.append(tuple(
+                cols * r + c
+                for r in range(max(0, i - radius), min(rows, i + radius + 1))
+                for c in range(max(0, j - radius), min(cols, j + radius + 1))
+                if (r, c) != (i, j)))
+
+    @classmethod
+    def from_rows(cls, rows, k=3):
+        """
+        Build a position from a list of rows holding 'X', 'O' or anything else for empty.
+
+        Marks are placed X first then O, alternating while both have marks left,
+        so to_move() matches a game played under the normal rules.
+
+        Args:
+            rows (list): Nested list such as TicTacToeGame.board.
+            k (int, optional): Marks in a row needed to win. Defaults to 3.
+        Returns:
+            MNKBoard: The equivalent position.
+        """
+        board = cls(len(rows), len(rows[0]), k)
+        marks = ([], [])
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                if value in PLAYERS:
+                    marks[PLAYERS[value]].append(board.cols * i + j)
+        for ply in range(len(marks[X]) + len(marks[O])):
+            player = X if (ply % 2 == 0 and marks[X]) or not marks[O] else O
+            board.play(marks[player].pop(), player)
+        return board
+
+    def _other_empty(self, window, cell):
+        """
+        Return the empty cell of window other than cell.
+
+        Args:
+            window (int): Window index.
+            cell (int): Cell to skip.
+        Returns:
+            int: The other empty cell.
+        """
+        for other in self._windows[window]:
+            if other != cell and not self.cells[other]:
+                return other
+        raise AssertionError("window has no other empty cell")
+
+    def play(self, cell, player):
+        """
+        Place player's mark on cell.
+
+        Args:
+            cell (int): Cell index (cols * row + col).
+            player (int): X or O.
+        """
+        self.cells[cell] = player + 1
+        self.moves.append(cell)
+        self.key ^= self._zobrist[player][cell]
+        k = self.k
+        own, opp = self._counts[player], self._counts[1 - player]
+        own_threats, opp_threats = self._threats[player], self._threats[1 - player]
+        for window in self._cell_windows[cell]:
+            if not opp[window]:
+                if own[window] == k - 1:
+                    # cell was the last gap in this window
+                    own_threats[cell] -= 1
+                elif own[window] == k - 2:
+                    own_threats[self._other_empty(window, cell)] += 1
+            if not own[window] and opp[window] == k - 1:
+                opp_threats[cell] -= 1
+            own[window] += 1
+            if own[window] == k and self._win_ply is None:
+                self._win_ply = len(self.moves)
+        self.frontier.discard(cell)
+        near = self._near
+        for other in self._neighbours[cell]:
+            near[other] += 1
+            if near[other] == 1 and not self.cells[other]:
+                self.frontier.add(other)
+
+    def undo(self, cell, player):  # pylint: disable=unused-argument
+        """
+        Remove the last mark, which must be on cell.
+
+        Args:
+            cell (int): Cell index (cols * row + col).
+            player (int): X or O; accepted for BitBoard compatibility, the
+                mark on cell is what gets removed.
+        """
+        if self._win_ply == len(self.moves):
+            self._win_ply = None
+        player = self.cells[cell] - 1
+        self.key ^= self._zobrist[player][cell]
+        self.moves.pop()
+        self.cells[cell] = 0
+        k = self.k
+        own, opp = self._counts[player], self._counts[1 - player]
+        own_threats, opp_threats = self._threats[player], self._threats[1 - player]
+        for window in self._cell_windows[cell]:
+            own[window] -= 1
+            if not opp[window]:
+                if own[window] == k - 1:
+                    own_threats[cell] += 1
+                elif own[window] == k - 2:
+                    own_threats[self._other_empty(window, cell)] -= 1
+            if not own[window] and opp[window] == k - 1:
+                opp_threats[cell] += 1
+        near = self._near
+        for other in self._neighbours[cell]:
+            near[other] -= 1
+            if not near[other]:
+                self.frontier.discard(other)
+        if near[cell]:
+            self.frontier.add(cell)
+
+    def reset(self):
+        """Clear every cell."""
+        while self.moves:
+            cell = self.moves[-1]
+            self.undo(cell, self.cells[cell] - 1)
+
+    def is_free(self, cell):
+        """
+        Check if cell is empty.
+
+        Args:
+            cell (int): Cell index (cols * row + col).
+        Returns:
+            bool: True if no player occupies the cell.
+        """
+        return not self.cells[cell]
+
+    def is_full(self):
+        """
+        Check if every cell is occupied.
+
+        Returns:
+            bool: True if the board is full.
+        """
+        return len(self.moves) == len(self.cells)
+
+    def empty_cells(self):
+        """
+        Return every empty cell in ascending order.
+
+        Returns:
+            list: Cell indices.
+        """
+        return [cell for cell, value in enumerate(self.cells) if not value]
+
+    def candidate_moves(self):
+        """
+        Return the empty cells worth considering: the frontier, or the center on an empty board.
+
+        Returns:
+            list: Cell indices in ascending order.
+        """
+        if not self.moves:
+            return [self.center]
+        return sorted(self.frontier)
+
+    def neighbours(self, cell):
+        """
+        Return the cells within the frontier radius of a cell.
+
+        Args:
+            cell (int): Cell index (cols * row + col).
+        Returns:
+            tuple: Cell indices in ascending order, excluding cell itself.
+        """
+        return self._neighbours[cell]
+
+    def has_won(self, player):
+        """
+        Check if player has completed a line.
+
+        Args:
+            player (int): X or O.
+        Returns:
+            bool: True if the player has won.
+        """
+        return (self._win_ply is not None
+                and self.cells[self.moves[self._win_ply - 1]] == player + 1)
+
+    def wins_with(self, cell, player):
+        """
+        Check if playing cell would complete a line for player, without playing it.
+
+        Args:
+            cell (int): Empty cell index (cols * row + col).
+            player (int): X or O.
+        Returns:
+            bool: True if the move wins.
+        """
+        return self._threats[player][cell] > 0
+
+    def winner(self):
+        """
+        Return the player who first completed a line.
+
+        Returns:
+            int: X or O, or None if nobody has won.
+        """
+        if self._win_ply is None:
+            return None
+        return self.cells[self.moves[self._win_ply - 1]] - 1
+
+    def position_key(self):
+        """
+        Return the Zobrist key of the position.
+
+        Returns:
+            int: 64-bit key; equal positions on equal-sized boards share it.
+        """
+        return self.key
+
+    def to_move(self):
+        """
+        Return the player whose turn it is, assuming X moves first.
+
+        Returns:
+            int: X or O.
+        """
+        return X if len(self.moves) % 2 == 0 else O
+
+    def symbol_at(self, cell):
+        """
+        Return the symbol on cell.
+
+        Args:
+            cell (int): Cell index (cols * row + col).
+        Returns:
+            str: 'X', 'O' or ' ' for an empty cell.
+        """
+        return ' XO'[self.cells[cell]]
+
+    def copy(self):
+        """
+        Return an independent copy of the position.
+
+        Returns:
+            MNKBoard: A new board with the same moves played in the same order.
+        """
+        board = MNKBoard(self.rows, self.cols, self.k, self.radius)
+        for cell in self.moves:
+            board.play(cell, self.cells[cell] - 1)
+        return board
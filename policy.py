@@ -0,0 +1,557 @@
+"""
+policy.py
+
+Learned move policy for m,n,k boards: a small NumPy network trained by self-play.
+
+The network reads a board from the mover's side, as one plane of the
+mover's stones and one of the opponent's. A ReLU hidden layer (or none, for
+a linear model) feeds two heads. The policy head gives one logit per cell,
+and the value head gives the expected result for the mover in [-1, 1].
+Inference is batched: policy() scores any number of boards with one matrix
+product per layer, so choosing moves for a thousand games costs about the
+same as for one.
+
+Training plays batches of self-play games with moves sampled from the
+current policy, and updates the network with REINFORCE. The advantage is
+the game result minus the value head's prediction. A small entropy bonus
+keeps exploring, and the value head is fitted to the results. Strength is
+tuned through the hidden size, the number of training games and the
+sampling temperature at play time.
+
+BatchEvaluator gathers move requests from many coroutines and answers all
+of them with one policy() call per tick, for servers hosting many games.
+
+Usage:
+    python policy.py ROWS COLS K [--games N] [--hidden H] [--out PATH] [--seed SEED]
+
+Classes:
+	PolicyNet: Policy/value network with batched inference and self-play training.
+	BatchEvaluator: Asyncio front end that batches move requests across games.
+
+Functions:
+	board_array(engines): Stack engines into an (N, cells) board array.
+	default_path(rows, cols, k): File name used for a board shape.
+	load_policy(rows, cols, k): Return the shared network, training it if no file exists.
+"""
+
+import argparse
+import asyncio
+import os
+
+import numpy as np
+
+from simulate import EMPTY, MARKS
+from tablebase import win_masks
+
+# Defaults for on-demand training by load_policy()
+DEFAULT_HIDDEN = 64
+DEFAULT_GAMES = 200_000
+# Largest board trained on demand by load_policy(), which blocks its caller
+# until the file is written: on one CPU DEFAULT_GAMES games take about 5 s on
+# 3x3 and 4x4 k=3 and 11 s on 4x4 k=4; larger boards need python policy.py
+MAX_AUTO_CELLS = 16
+
+# Adam optimizer settings
+BETAS = (0.9, 0.999)
+EPSILON = 1e-8
+
+
+def board_array(engines):
+    """
+    Stack engines of one board shape into a board array.
+
+    Args:
+        engines (list): BitBoard, GameState or MNKBoard objects of equal shape.
+    Returns:
+        numpy.ndarray: (N, cells) int8 array, 0 for empty and MARKS[player] for stones.
+    """
+    cells = engines[0].rows * engines[0].cols
+    boards = np.zeros((len(engines), cells), dtype=np.int8)
+    for row, engine in zip(boards, engines):
+        for cell in range(cells):
+            symbol = engine.symbol_at(cell)
+            if symbol != ' ':
+                row[cell] = MARKS[symbol == 'O']
+    return boards
+
+
+class PolicyNet:
+    """
+    A policy/value network for one board shape.
+
+    Attributes:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        hidden (int): Hidden units; 0 for a linear model.
+        params (dict): Weight arrays by name.
+    """
+
+    def __init__(self, rows, cols, k, hidden=DEFAULT_HIDDEN, seed=None):
+        """
+        Initialize a network with small random weights.
+
+        Args:
+            rows (int): Number of rows.
+            cols (int): Number of columns.
+            k (int): Marks in a row needed to win.
+            hidden (int, optional): Hidden units, 0 for linear. Defaults to DEFAULT_HIDDEN.
+            seed (int, optional): Seed for the initial weights. Defaults to None.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.hidden = hidden
+        cells = rows * cols
+        rng = np.random.default_rng(seed)
+        width = hidden or 2 * cells
+        self.params = {
+            'policy_w': rng.normal(0, 0.1, (width, cells)),
+            'policy_b': np.zeros(cells),
+            'value_w': rng.normal(0, 0.1, width),
+            'value_b': np.zeros(1),
+        }
+        if hidden:
+            self.params['hidden_w'] = rng.normal(0, np.sqrt(2 / (2 * cells)), (2 * cells, hidden))
+            self.params['hidden_b'] = np.zeros(hidden)
+        masks = win_masks(rows, cols, k)
+        # Cell indices of every winning line, for vectorized win checks
+        self._lines = np.array([[cell for cell in range(cells) if mask >> cell & 1]
+                                for mask in masks])
+
+    def features(self, boards, player):
+        """
+        Encode boards from the mover's side.
+
+        Args:
+            boards (numpy.ndarray): (N, cells) board array.
+            player (int): X or O, the player to move.
+        Returns:
+            numpy.ndarray: (N, 2 * cells) float array of own then opponent stones.
+        """
+        return np.concatenate([boards == MARKS[player], boards == MARKS[1 - player]],
+                              axis=1).astype(np.float64)
+
+    def forward(self, features):
+        """
+        Run the network.
+
+        Args:
+            features (numpy.ndarray): (N, 2 * cells) output of features().
+        Returns:
+            tuple: (hidden activations, policy logits (N, cells), values (N,)).
+        """
+        params = self.params
+        if self.hidden:
+            activations = np.maximum(features @ params['hidden_w'] + params['hidden_b'], 0)
+        else:
+            activations = features
+        logits = activations @ params['policy_w'] + params['policy_b']
+        values = np.tanh(activations @ params['value_w'] + params['value_b'])
+        return activations, logits, values
+
+    def probabilities(self, boards, player, temperature=1.0):
+        """
+        Return move probabilities over the empty cells.
+
+        Args:
+            boards (numpy.ndarray): (N, cells) board array; every board needs an empty cell.
+            player (int): X or O, the player to move.
+            temperature (float, optional): Softmax temperature. Defaults to 1.0.
+        Returns:
+            numpy.ndarray: (N, cells) rows summing to 1, zero on occupied cells.
+        """
+        _, logits, _ = self.forward(self.features(boards, player))
+        return _masked_softmax(logits / temperature, boards == EMPTY)
+
+    def policy(self, boards, player, rng=None, temperature=0.0):
+        """
+        Choose a move on every board.
+
+        Matches the simulate.py policy signature, so a network can play in
+        simulate() and tournament runs.
+
+        Args:
+            boards (numpy.ndarray): (N, cells) board array; every board needs an empty cell.
+            player (int): X or O, the player to move.
+            rng (numpy.random.Generator, optional): Random source for sampling.
+            temperature (float, optional): 0 plays the highest-scoring cell,
+                higher values sample more widely. Defaults to 0.
+        Returns:
+            numpy.ndarray: (N,) cell indices.
+        """
+        if temperature <= 0:
+            _, logits, _ = self.forward(self.features(boards, player))
+            logits[boards != EMPTY] = -np.inf
+            return logits.argmax(axis=1)
+        if rng is None:
+            rng = np.random.default_rng()
+        return _sample(self.probabilities(boards, player, temperature), rng)
+
+    def value(self, boards, player):
+        """
+        Predict the result for the player to move.
+
+        Args:
+            boards (numpy.ndarray): (N, cells) board array.
+            player (int): X or O, the player to move.
+        Returns:
+            numpy.ndarray: (N,) values in [-1, 1].
+        """
+        return self.forward(self.features(boards, player))[2]
+
+    def best_move(self, engine, player, temperature=0.0, rng=None):
+        """
+        Choose a move for a single engine.
+
+        Args:
+            engine: BitBoard, GameState or MNKBoard of the network's shape.
+            player (int): X or O, the player to move.
+            temperature (float, optional): Sampling temperature. Defaults to 0.
+            rng (numpy.random.Generator, optional): Random source for sampling.
+        Returns:
+            int: Cell index of the move, or None if the board is full.
+        """
+        boards = board_array([engine])
+        if not (boards == EMPTY).any():
+            return None
+        return int(self.policy(boards, player, rng, temperature)[0])
+
+    def _won(self, boards, player):
+        """
+        Check every board for a completed line of player's marks.
+
+        Args:
+            boards (numpy.ndarray): (N, cells) board array.
+            player (int): X or O.
+        Returns:
+            numpy.ndarray: (N,) boolean array.
+        """
+        return (boards[:, self._lines] == MARKS[player]).all(axis=2).any(axis=1)
+
+    def self_play(self, games, rng, temperature=1.0):
+        """
+        Play a batch of games against itself, sampling every move.
+
+        Args:
+            games (int): Number of games played at once.
+            rng (numpy.random.Generator): Random source.
+            temperature (float, optional): Sampling temperature. Defaults to 1.0.
+        Returns:
+            tuple: (plies, results) where plies is a list of (features, legal,
+                moves, game indices, player) per ply and results is X's
+                result per game (1, 0 or -1).
+        """
+        cells = self.rows * self.cols
+        boards = np.zeros((games, cells), dtype=np.int8)
+        results = np.zeros(games)
+        active = np.arange(games)
+        plies = []
+        for ply in range(cells):
+            if not len(active):
+                break
+            player = ply % 2
+            live = boards[active]
+            features = self.features(live, player)
+            _, logits, _ = self.forward(features)
+            legal = live == EMPTY
+            moves = _sample(_masked_softmax(logits / temperature, legal), rng)
+            plies.append((features, legal, moves, active, player))
+            live[np.arange(len(active)), moves] = MARKS[player]
+            boards[active] = live
+            won = self._won(live, player)
+            results[active[won]] = 1 if player == 0 else -1
+            active = active[~(won | ~(live == EMPTY).any(axis=1))]
+        return plies, results
+
+    def train(self, games, batch_size=256, learning_rate=0.003, entropy=0.1,
+              seed=None, progress=None):
+        """
+        Improve the network by self-play.
+
+        Args:
+            games (int): Total training games.
+            batch_size (int, optional): Games per update. Defaults to 256.
+            learning_rate (float, optional): Adam step size. Defaults to 0.003.
+            entropy (float, optional): Weight of the entropy bonus. Defaults to 0.1.
+            seed (int, optional): Seed for reproducible training. Defaults to None.
+            progress (callable, optional): Called with (games played, mean value
+                loss) after every update.
+        """
+        rng = np.random.default_rng(seed)
+        moments = {name: (np.zeros_like(p), np.zeros_like(p)) for name, p in self.params.items()}
+        step = 0
+        for start in range(0, games, batch_size):
+            plies, results = self.self_play(min(batch_size, games - start), rng)
+            features = np.concatenate([p[0] for p in plies])
+            legal = np.concatenate([p[1] for p in plies])
+            moves = np.concatenate([p[2] for p in plies])
+            # Result of each game from the side of the player who moved
+            targets = np.concatenate([results[p[3]] * (1 if p[4] == 0 else -1) for p in plies])
+
+            grads, value_loss = self._gradients(features, legal, moves, targets, entropy)
+            step += 1
+            for name, grad in grads.items():
+                first, second = moments[name]
+                first *= BETAS[0]
+                first += (1 - BETAS[0]) * grad
+                second *= BETAS[1]
+                second += (1 - BETAS[1]) * grad * grad
+                corrected = first / (1 - BETAS[0] ** step)
+                scale = np.sqrt(second / (1 - BETAS[1] ** step)) + EPSILON
+                self.params[name] -= learning_rate * corrected / scale
+            if progress is not None:
+                progress(start + len(results), value_loss)
+
+    def _gradients(self, features, legal, moves, targets, entropy):
+        """
+        Compute the loss gradients for one batch of self-play moves.
+
+        Args:
+            features (numpy.ndarray): (M, 2 * cells) inputs.
+            legal (numpy.ndarray): (M, cells) empty-cell masks.
+            moves (numpy.ndarray): (M,) cells played.
+            targets (numpy.ndarray): (M,) results for the mover.
+            entropy (float): Weight of the entropy bonus.
+        Returns:
+            tuple: (gradients by parameter name, mean squared value error).
+        """
+        params = self.params
+        count = len(moves)
+        activations, logits, values = self.forward(features)
+        probabilities = _masked_softmax(logits, legal)
+        advantage = targets - values
+
+        # Policy gradient: d(-A log p[move]) / d logits = A * (p - onehot)
+        d_logits = probabilities * advantage[:, None]
+        d_logits[np.arange(count), moves] -= advantage
+        # Entropy bonus: d(-H) / d logits = p * (log p + H)
+        log_p = np.log(np.where(legal, probabilities, 1.0))
+        neg_entropy = (probabilities * log_p).sum(axis=1, keepdims=True)
+        d_logits += entropy * probabilities * (log_p - neg_entropy)
+        d_logits /= count
+        # Value head: d(0.5 * (v - z)^2) / d pre-activation
+        d_value = (values - targets) * (1 - values * values) / count
+
+        grads = {
+            'policy_w': activations.T @ d_logits,
+            'policy_b': d_logits.sum(axis=0),
+            'value_w': activations.T @ d_value,
+            'value_b': np.array([d_value.sum()]),
+        }
+        if self.hidden:
+            d_hidden = d_logits @ params['policy_w'].T + np.outer(d_value, params['value_w'])
+            d_hidden *= activations > 0
+            grads['hidden_w'] = features.T @ d_hidden
+            grads['hidden_b'] = d_hidden.sum(axis=0)
+        return grads, float(np.mean((values - targets) ** 2))
+
+    def save(self, path):
+        """
+        Write the network to an .npz file.
+
+        Args:
+            path (str): Destination file.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, shape=np.array([self.rows, self.cols, self.k, self.hidden]),
+                 **self.params)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a network written by save().
+
+        Args:
+            path (str): .npz file.
+        Returns:
+            PolicyNet: The stored network.
+        """
+        with np.load(path) as data:
+            rows, cols, k, hidden = (int(value) for value in data['shape'])
+            net = cls(rows, cols, k, hidden)
+            net.params = {name: data[name] for name in net.params}
+        return net
+
+
+def _masked_softmax(logits, legal):
+    """
+    Softmax over the legal entries of each row.
+
+    Args:
+        logits (numpy.ndarray): (N, cells) scores.
+        legal (numpy.ndarray): (N, cells) boolean mask; every row needs a True.
+    Returns:
+        numpy.ndarray: (N, cells) probabilities, zero where not legal.
+    """
+    logits = np.where(legal, logits, -np.inf)
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _sample(probabilities, rng):
+    """
+    Draw one index per row from a probability table.
+
+    Args:
+        probabilities (numpy.ndarray): (N, cells) rows summing to 1.
+        rng (numpy.random.Generator): Random source.
+    Returns:
+        numpy.ndarray: (N,) sampled indices.
+    """
+    cumulative = probabilities.cumsum(axis=1)
+    draws = rng.random((len(probabilities), 1)) * cumulative[:, -1:]
+    return np.minimum((cumulative < draws).sum(axis=1), probabilities.shape[1] - 1)
+
+
+class BatchEvaluator:
+    """
+    Answers move requests from many coroutines with batched inference.
+
+    Requests that arrive within one tick are scored together with a single
+    policy() call per player to move.
+
+    Attributes:
+        net (PolicyNet): Network used for every move.
+        max_batch (int): Requests that trigger an immediate evaluation.
+        tick (float): Seconds a request waits for others to join its batch.
+        batches (int): Evaluations run so far.
+        requests (int): Moves answered so far.
+    """
+
+    def __init__(self, net, max_batch=1024, tick=0.001):
+        """
+        Initialize an idle evaluator.
+
+        Args:
+            net (PolicyNet): Network used for every move.
+            max_batch (int, optional): Batch size that is evaluated at once. Defaults to 1024.
+            tick (float, optional): Longest wait for a batch to fill, in seconds.
+                Defaults to 0.001.
+        """
+        self.net = net
+        self.max_batch = max_batch
+        self.tick = tick
+        self.batches = 0
+        self.requests = 0
+        self._pending = []
+        self._timer = None
+
+    async def choose(self, engine, player):
+        """
+        Return the network's move for a position.
+
+        The engine is read when the batch is evaluated, so it must not
+        change until this coroutine returns.
+
+        Args:
+            engine: BitBoard, GameState or MNKBoard of the network's shape.
+            player (int): X or O, the player to move.
+        Returns:
+            int: Cell index of the move.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((engine, player, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.tick, self.flush)
+        return await future
+
+    def flush(self):
+        """Evaluate every pending request now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.requests += len(pending)
+        boards = board_array([engine for engine, _, _ in pending])
+        players = np.array([player for _, player, _ in pending])
+        moves = np.empty(len(pending), dtype=np.int64)
+        for player in (0, 1):
+            rows = players == player
+            if rows.any():
+                moves[rows] = self.net.policy(boards[rows], player)
+        for (_, _, future), move in zip(pending, moves):
+            if not future.done():
+                future.set_result(int(move))
+
+
+def default_path(rows, cols, k):
+    """
+    Return the default network file for a board shape, next to this module.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        str: Path such as policy_3x3k3.npz.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        f'policy_{rows}x{cols}k{k}.npz')
+
+
+_NETS = {}
+
+
+def load_policy(rows, cols, k):
+    """
+    Return the process-wide network for a board shape.
+
+    If default_path() does not exist, a network with DEFAULT_HIDDEN units is
+    trained for DEFAULT_GAMES games and saved there first, which is only done
+    for boards of up to MAX_AUTO_CELLS cells.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        PolicyNet: The shared network.
+    Raises:
+        ValueError: If the file is missing and the board is too large to train on demand.
+    """
+    net = _NETS.get((rows, cols, k))
+    if net is None:
+        path = default_path(rows, cols, k)
+        if os.path.exists(path):
+            net = PolicyNet.load(path)
+        elif rows * cols > MAX_AUTO_CELLS:
+            raise ValueError(f"no policy network for {rows}x{cols} k={k}; "
+                             f"train it with: python policy.py {rows} {cols} {k}")
+        else:
+            net = PolicyNet(rows, cols, k, seed=0)
+            net.train(DEFAULT_GAMES, seed=0)
+            net.save(path)
+        _NETS[rows, cols, k] = net
+    return net
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train a move policy by self-play.")
+    parser.add_argument('rows', type=int, help="number of rows")
+    parser.add_argument('cols', type=int, help="number of columns")
+    parser.add_argument('k', type=int, help="marks in a row needed to win")
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help="training games")
+    parser.add_argument('--hidden', type=int, default=DEFAULT_HIDDEN,
+                        help="hidden units (0 for a linear model)")
+    parser.add_argument('--out', help="output file (defaults to policy_<rows>x<cols>k<k>.npz)")
+    parser.add_argument('--seed', type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    def report(played, loss):
+        """Print training progress every 10,000 games."""
+        if played % 10_000 < 256:
+            print(f"{played:>10} games  value loss {loss:.3f}")
+
+    model = PolicyNet(args.rows, args.cols, args.k, args.hidden, args.seed)
+    model.train(args.games, seed=args.seed, progress=report)
+    out_path = args.out or default_path(args.rows, args.cols, args.k)
+    model.save(out_path)
+    print(f"Wrote {out_path}")
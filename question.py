@@ -12,8 +12,6 @@ related to programming and Python learning resources.
 Usage:
     Run the script and follow the prompts in the terminal.
 """
-print('Welcome to AskPython Quiz')
-answer = input('Are you ready to play the Quiz? (yes/no): ')
 
 TOTAL_QUESTIONS = 3
 
@@ -46,7 +44,15 @@ def run_quiz():
     mark = (score / TOTAL_QUESTIONS) * 100
     print(f'Marks obtained: {mark:.1f}')
 
-if answer.lower() == 'yes':
-    run_quiz()
-else:
-    print('Goodbye!')
+def main():
+    """Greet the user and run the quiz if they are ready."""
+    print('Welcome to AskPython Quiz')
+    answer = input('Are you ready to play the Quiz? (yes/no): ')
+    if answer.lower() == 'yes':
+        run_quiz()
+    else:
+        print('Goodbye!')
+
+
+if __name__ == '__main__':
+    main()
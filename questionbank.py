@@ -0,0 +1,218 @@
+"""
+questionbank.py
+
+SQLite-backed question bank for the quiz game.
+
+Questions are stored in one table indexed on category and difficulty, and
+read back lazily: iterating a bank fetches rows in small batches through a
+generator, so a Quiz over hundreds of thousands of questions never holds
+more than one batch in memory.
+
+Usage:
+    python questionbank.py BANK_FILE QUESTIONS_JSONL    Import questions into a bank.
+
+Each JSON line holds the keys used by quiz.py ("question", "choices",
+"answer_index") and optionally "category" and "difficulty".
+
+Classes:
+	QuestionBank: Indexed, lazily loaded store of quiz questions.
+"""
+
+import json
+import sqlite3
+import sys
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    choices TEXT NOT NULL,
+    answer_index INTEGER NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    difficulty INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_questions_category ON questions (category, difficulty);
+CREATE INDEX IF NOT EXISTS idx_questions_difficulty ON questions (difficulty);
+"""
+
+COLUMNS = "id, question, choices, answer_index, category, difficulty"
+
+
+def _row_to_question(row):
+    """
+    Convert a database row to the question dictionary used by Quiz.
+
+    Args:
+        row (tuple): Values in COLUMNS order.
+    Returns:
+        dict: Question with id, question, choices, answer_index, category and difficulty.
+    """
+    return {
+        "id": row[0],
+        "question": row[1],
+        "choices": json.loads(row[2]),
+        "answer_index": row[3],
+        "category": row[4],
+        "difficulty": row[5],
+    }
+
+
+class QuestionBank:
+    """
+    A store of quiz questions in an SQLite database.
+
+    Attributes:
+        path (str): Database file, or ':memory:'.
+        batch_size (int): Rows fetched per round trip while iterating.
+    """
+
+    def __init__(self, path=':memory:', batch_size=256):
+        """
+        Open (and create if needed) a question bank.
+
+        Args:
+            path (str, optional): Database file. Defaults to an in-memory bank.
+            batch_size (int, optional): Rows fetched at a time. Defaults to 256.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def add(self, question):
+        """
+        Add one question.
+
+        Args:
+            question (dict): Question with question, choices, answer_index and
+                optional category and difficulty.
+        Returns:
+            int: The new question's id.
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO questions (question, choices, answer_index, category, difficulty)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (question["question"], json.dumps(question["choices"]),
+                 question["answer_index"], question.get("category", ""),
+                 question.get("difficulty", 0)))
+        return cursor.lastrowid
+
+    def add_many(self, questions):
+        """
+        Add many questions in one transaction.
+
+        Args:
+            questions (iterable): Question dictionaries; may be a generator.
+        """
+        rows = ((q["question"], json.dumps(q["choices"]), q["answer_index"],
+                 q.get("category", ""), q.get("difficulty", 0)) for q in questions)
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO questions (question, choices, answer_index, category, difficulty)"
+                " VALUES (?, ?, ?, ?, ?)", rows)
+
+    @staticmethod
+    def _where(category, difficulty):
+        """
+        Build the WHERE clause for the optional filters.
+
+        Args:
+            category (str): Category to match, or None.
+            difficulty (int): Difficulty to match, or None.
+        Returns:
+            tuple: (sql, parameters)
+        """
+        clauses = []
+        params = []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if difficulty is not None:
+            clauses.append("difficulty = ?")
+            params.append(difficulty)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, category=None, difficulty=None):
+        """
+        Count the questions matching the filters.
+
+        Args:
+            category (str, optional): Category to match. Defaults to any.
+            difficulty (int, optional): Difficulty to match. Defaults to any.
+        Returns:
+            int: Number of matching questions.
+        """
+        where, params = self._where(category, difficulty)
+        return self._conn.execute("SELECT COUNT(*) FROM questions" + where, params).fetchone()[0]
+
+    def get(self, question_id):
+        """
+        Fetch one question by id.
+
+        Args:
+            question_id (int): The question's id.
+        Returns:
+            dict: The question, or None if there is no such id.
+        """
+        row = self._conn.execute(f"SELECT {COLUMNS} FROM questions WHERE id = ?",
+                                 (question_id,)).fetchone()
+        return None if row is None else _row_to_question(row)
+
+    def ids(self, category=None, difficulty=None):
+        """
+        Return the ids of the questions matching the filters, without loading the questions.
+
+        Args:
+            category (str, optional): Category to match. Defaults to any.
+            difficulty (int, optional): Difficulty to match. Defaults to any.
+        Returns:
+            list: Question ids in ascending order.
+        """
+        where, params = self._where(category, difficulty)
+        return [row[0] for row in self._conn.execute(
+            f"SELECT id FROM questions{where} ORDER BY id", params)]
+
+    def iter_questions(self, category=None, difficulty=None):
+        """
+        Yield the questions matching the filters in id order, one batch at a time.
+
+        Args:
+            category (str, optional): Category to match. Defaults to any.
+            difficulty (int, optional): Difficulty to match. Defaults to any.
+        Yields:
+            dict: The next question.
+        """
+        where, params = self._where(category, difficulty)
+        cursor = self._conn.execute(f"SELECT {COLUMNS} FROM questions{where} ORDER BY id", params)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield _row_to_question(row)
+        finally:
+            cursor.close()
+
+    def __iter__(self):
+        """Iterate over every question lazily."""
+        return self.iter_questions()
+
+    def __len__(self):
+        """int: Number of questions in the bank."""
+        return self.count()
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python questionbank.py BANK_FILE QUESTIONS_JSONL")
+    bank = QuestionBank(sys.argv[1])
+    with open(sys.argv[2], encoding='utf-8') as f:
+        bank.add_many(json.loads(line) for line in f if line.strip())
+    print(f"{sys.argv[1]} now holds {len(bank)} questions")
+    bank.close()
@@ -8,25 +8,40 @@ An interactive multiple-choice quiz game implemented with a Quiz class.
 - Tracks and displays the user's score at the end.
 
 Usage:
-    Run the script and follow the prompts in the terminal.
+    Run the script and follow the prompts in the terminal. Pass the path of a
+    question bank (see questionbank.py) to play its questions instead of the
+    examples below.
 """
+import sys
+
+# Stands for a next question that has not been read from the source yet
+_UNREAD = object()
+
+
 class Quiz:
     """
     A class to represent a multiple-choice quiz game.
 
+    Questions are consumed one at a time from an iterator, so the source can
+    be a list, a generator or a QuestionBank that loads rows lazily. The
+    current question is read once and kept until it is answered.
+
     Attributes:
-        questions (list): List of question dictionaries.
+        questions (iterable): Source of question dictionaries.
         score (int): The user's current score.
         question_index (int): The index of the current question.
     """
     def __init__(self, question_data):
         """
-        Initialize the Quiz with a list of questions.
+        Initialize the Quiz with a source of questions.
 
         Args:
-            question_data (list): List of question dictionaries.
+            question_data (iterable): Question dictionaries, e.g. a list,
+                a generator or a QuestionBank.
         """
         self.questions = question_data
+        self._pending = iter(question_data)
+        self._head = _UNREAD
         self.score = 0
         self.question_index = 0
 
@@ -34,27 +49,56 @@ class Quiz:
         """
         Retrieve the next question in the quiz.
 
+        Calling it again before check_answer() returns the same question.
+
+        Returns:
+            dict: The next question dictionary, or None when there are no more.
+        """
+        if self._head is _UNREAD:
+            self._head = self._next_question()
+        return self._head
+
+    def _next_question(self):
+        """
+        Read the question that follows the one last answered.
+
         Returns:
-            dict: The next question dictionary.
+            dict: The question dictionary, or None when there are no more.
+        """
+        return next(self._pending, None)
+
+    def check_answer(self, question, answer):
         """
-        return self.questions[self.question_index]
+        Score an answer to question and move on to the next one.
+
+        Args:
+            question (dict): The question being answered.
+            answer (str or int): The 1-based number of the chosen answer.
+        Returns:
+            bool: True if the answer is correct.
+        """
+        correct = int(answer) - 1 == question['answer_index']
+        if correct:
+            self.score += 1
+        self.question_index += 1
+        self._head = _UNREAD
+        return correct
 
     def play(self):
         """
         Start the quiz game, prompt the user for answers, and display the final score.
         """
-        while self.question_index < len(self.questions):
-            current_question = self.get_next_question()
+        current_question = self.get_next_question()
+        while current_question is not None:
             print(f"Q{self.question_index + 1}: {current_question['question']}")
             for i, choice in enumerate(current_question['choices']):
                 print(f"{i + 1}: {choice}")
             answer = input("Your answer (1-4): ")
-            if int(answer) - 1 == current_question['answer_index']:
+            if self.check_answer(current_question, answer):
                 print("Correct!")
-                self.score += 1
             else:
                 print("Wrong!")
-            self.question_index += 1
+            current_question = self.get_next_question()
         print(f"Game Over! Your final score is: {self.score}")
 
 # Example questions
@@ -72,6 +116,11 @@ questions = [
     # Add more questions as needed
 ]
 
-# Start the quiz
-quiz = Quiz(questions)
-quiz.play()
+# Start the quiz, from a question bank file if one is given
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        from questionbank import QuestionBank  # pylint: disable=import-outside-toplevel
+        quiz = Quiz(QuestionBank(sys.argv[1]))
+    else:
+        quiz = Quiz(questions)
+    quiz.play()
@@ -0,0 +1,137 @@
+"""
+quiz_server.py
+
+Asyncio TCP service running many concurrent quiz sessions in one process.
+
+Every connection gets its own Quiz object for score and progress, while the
+questions themselves are loaded once into a shared read-only tuple. Answers
+are scored with Quiz.check_answer, which never blocks, so one event loop
+serves thousands of players.
+
+Protocol (one JSON object per line):
+    Server: {"question_index": 0, "question": "...", "choices": [...]}
+    Client: the 1-based number of the chosen answer, e.g. 3
+    Server: {"correct": true, "score": 1} followed by the next question, or
+            {"done": true, "score": 2, "total": 2} after the last one.
+    Invalid input gets {"error": "..."} and the question is asked again.
+
+Usage:
+    python quiz_server.py [BANK_FILE] [--host HOST] [--port PORT]
+
+Classes:
+	QuizService: Accepts connections and runs one Quiz per client.
+"""
+
+import argparse
+import asyncio
+import json
+
+from quiz import Quiz, questions as EXAMPLE_QUESTIONS
+from questionbank import QuestionBank
+
+# Longest answer line accepted from a client
+LINE_LIMIT = 64
+
+
+class QuizService:
+    """
+    Asyncio TCP server running one Quiz per connection over a shared question cache.
+
+    Attributes:
+        questions (tuple): Question dictionaries shared by every session.
+        idle_timeout (float): Seconds of silence before a client is dropped.
+        active (int): Number of connected sessions.
+        completed (int): Number of quizzes played to the end.
+    """
+
+    def __init__(self, question_data, idle_timeout=300.0):
+        """
+        Load the questions once for all sessions.
+
+        Args:
+            question_data (iterable): Question dictionaries, e.g. a list or a QuestionBank.
+            idle_timeout (float, optional): Idle seconds before disconnect. Defaults to 300.
+        """
+        self.questions = tuple(question_data)
+        self.idle_timeout = idle_timeout
+        self.active = 0
+        self.completed = 0
+
+    @staticmethod
+    def _send(writer, message):
+        """
+        Queue one JSON message for a client.
+
+        Args:
+            writer (asyncio.StreamWriter): Client output.
+            message (dict): Message to send.
+        """
+        writer.write(json.dumps(message).encode('utf-8') + b'\n')
+
+    async def handle_client(self, reader, writer):
+        """
+        Run a quiz for one client until it finishes, goes idle or disconnects.
+
+        Args:
+            reader (asyncio.StreamReader): Client input.
+            writer (asyncio.StreamWriter): Client output.
+        """
+        quiz = Quiz(self.questions)
+        self.active += 1
+        try:
+            question = quiz.get_next_question()
+            while question is not None:
+                self._send(writer, {"question_index": quiz.question_index,
+                                    "question": question['question'],
+                                    "choices": question['choices']})
+                await writer.drain()
+                try:
+                    raw = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except (asyncio.TimeoutError, ValueError):
+                    return
+                if not raw:
+                    return
+                answer = raw.strip()
+                if not answer.isdigit() or not 1 <= int(answer) <= len(question['choices']):
+                    self._send(writer, {"error": f"answer with 1-{len(question['choices'])}"})
+                    continue
+                correct = quiz.check_answer(question, int(answer))
+                self._send(writer, {"correct": correct, "score": quiz.score})
+                question = quiz.get_next_question()
+            self.completed += 1
+            self._send(writer, {"done": True, "score": quiz.score, "total": quiz.question_index})
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8766):
+        """
+        Accept connections forever.
+
+        Args:
+            host (str, optional): Interface to bind. Defaults to localhost.
+            port (int, optional): TCP port. Defaults to 8766.
+        """
+        server = await asyncio.start_server(self.handle_client, host, port,
+                                            limit=LINE_LIMIT, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve quizzes to many players over TCP.")
+    parser.add_argument('bank', nargs='?', help="question bank file (defaults to the examples)")
+    parser.add_argument('--host', default='127.0.0.1', help="interface to bind")
+    parser.add_argument('--port', type=int, default=8766, help="TCP port")
+    parser.add_argument('--idle-timeout', type=float, default=300.0,
+                        help="seconds before an idle client is dropped")
+    args = parser.parse_args()
+    service = QuizService(QuestionBank(args.bank) if args.bank else EXAMPLE_QUESTIONS,
+                          args.idle_timeout)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
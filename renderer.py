@@ -0,0 +1,143 @@
+"""
+renderer.py
+
+Tic Tac Toe board drawn on a single tkinter Canvas.
+
+The grid, one text item per cell and the two turn labels are created once.
+render() compares the board with what is on screen and reconfigures only
+the cells that changed, and set_turn() recolours the labels only when the
+turn changes, so a move costs a couple of Tk calls whatever the board size.
+A new game reuses the same items instead of building new widgets.
+
+Classes:
+	BoardCanvas: Canvas board with dirty-cell redraw and click-to-cell mapping.
+"""
+
+# Pixel size of a cell and height of the turn label band above the grid
+CELL_SIZE = 80
+HEADER = 30
+
+# Label colours for the player to move and the one waiting
+ACTIVE_COLOR = 'black'
+WAITING_COLOR = 'grey'
+
+
+class BoardCanvas:
+    """
+    A rows x cols board and two turn labels on one Canvas.
+
+    Attributes:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        cell_size (int): Pixel size of a cell.
+        on_click (callable): Called with (row, col) when a cell is clicked.
+        canvas (tkinter.Canvas): The widget everything is drawn on.
+    """
+
+    def __init__(self, master, rows, cols, on_click, cell_size=CELL_SIZE):
+        """
+        Create the canvas and draw the empty board.
+
+        Args:
+            master: Parent widget.
+            rows (int): Number of rows.
+            cols (int): Number of columns.
+            on_click (callable): Called with (row, col) when a cell is clicked.
+            cell_size (int, optional): Pixel size of a cell. Defaults to CELL_SIZE.
+        """
+        from tkinter import Canvas  # pylint: disable=import-outside-toplevel
+
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.on_click = on_click
+        width = cols * cell_size
+        height = HEADER + rows * cell_size
+        self.canvas = Canvas(master, width=width, height=height, bg='white',
+                             highlightthickness=0)
+
+        for i in range(1, rows):
+            y = HEADER + i * cell_size
+            self.canvas.create_line(0, y, width, y)
+        for j in range(1, cols):
+            x = j * cell_size
+            self.canvas.create_line(x, HEADER, x, height)
+
+        font = ('Helvetica', max(8, cell_size // 3))
+        self._items = [self.canvas.create_text(j * cell_size + cell_size // 2,
+                                               HEADER + i * cell_size + cell_size // 2,
+                                               text='', font=font)
+                       for i in range(rows) for j in range(cols)]
+        # Symbol currently drawn in each cell
+        self._shown = [' '] * (rows * cols)
+        self._labels = (self.canvas.create_text(width // 4, HEADER // 2, text=''),
+                        self.canvas.create_text(3 * width // 4, HEADER // 2, text=''))
+        self._turn = None
+        self.canvas.bind('<Button-1>', self._clicked)
+
+    def show(self):
+        """Pack the canvas into its parent."""
+        self.canvas.pack()
+
+    def hide(self):
+        """Remove the canvas from its parent's layout without destroying it."""
+        self.canvas.pack_forget()
+
+    def set_labels(self, x_label, o_label):
+        """
+        Set the turn label texts.
+
+        Args:
+            x_label (str): Label for X, e.g. "Player : X".
+            o_label (str): Label for O, e.g. "Computer : O".
+        """
+        self.canvas.itemconfigure(self._labels[0], text=x_label)
+        self.canvas.itemconfigure(self._labels[1], text=o_label)
+
+    def set_turn(self, player):
+        """
+        Highlight the label of the player to move.
+
+        Args:
+            player (int): X or O.
+        """
+        if player == self._turn:
+            return
+        self._turn = player
+        for index, item in enumerate(self._labels):
+            self.canvas.itemconfigure(item, fill=ACTIVE_COLOR if index == player else WAITING_COLOR)
+
+    def render(self, board):
+        """
+        Redraw the cells whose symbol differs from what is on screen.
+
+        Args:
+            board (list): rows x cols lists of 'X', 'O' or ' '.
+        Returns:
+            int: Number of cells redrawn.
+        """
+        shown = self._shown
+        redrawn = 0
+        cell = 0
+        for row in board:
+            for symbol in row:
+                if shown[cell] != symbol:
+                    self.canvas.itemconfigure(self._items[cell], text=symbol)
+                    shown[cell] = symbol
+                    redrawn += 1
+                cell += 1
+        return redrawn
+
+    def _clicked(self, event):
+        """
+        Translate a mouse click into a cell and report it.
+
+        Args:
+            event: tkinter event with x and y canvas coordinates.
+        """
+        if event.y < HEADER:
+            return
+        i = (event.y - HEADER) // self.cell_size
+        j = event.x // self.cell_size
+        if i < self.rows and j < self.cols:
+            self.on_click(i, j)
@@ -0,0 +1,371 @@
+"""
+server.py
+
+Asyncio TCP server hosting many concurrent Tic Tac Toe games against the computer.
+
+Each connection owns one small Session object holding a packed GameState
+drawn from a shared pool, so a single process can keep thousands of games
+open. Moves, win/tie detection and the computer opponent are the same engine
+and ai code used by the tkinter game.
+
+Replies from the 'policy' strategy are batched: every session waiting for a
+policy move within the same tick is answered by one forward pass of the
+network (see policy.BatchEvaluator), so the per-move cost falls as more
+games are played at once. Replies from 'mcts' and 'tablebase' search or
+probe for longer, so they run in the default executor and never hold up
+the event loop, and with it every other client. The solver and the
+opening book are built before the server starts accepting connections;
+the MCTS workers, the tablebase and the network are built on first use,
+off the event loop.
+
+Protocol (one ASCII line per request):
+    NEW [<strategy>]   Start a new game; the client plays X and moves first.
+                       strategy is heuristic, perfect, book, mcts,
+                       tablebase or policy.
+    MOVE <cell>        Play cell 0-8 (3 * row + col).
+    BOARD              Show the current position.
+    QUIT               Close the connection.
+
+Replies:
+    OK <board> <status> [<computer cell>]
+    ERR <message>
+
+board is 9 characters of 'X', 'O' and '.'; status is one of 'play',
+'x_wins', 'o_wins' or 'draw'.
+
+Usage:
+    python server.py [--host HOST] [--port PORT] [--ai STRATEGY]
+
+Classes:
+	Session: State and request handling for one game.
+	GameServer: Accepts connections and runs one Session per client.
+"""
+
+import argparse
+import asyncio
+import random
+
+from engine import CELLS, X, O
+from gamestate import GameState, GameStatePool
+from ai import computer_move, STRATEGIES
+from solver import get_solver
+from book import load_book
+
+# Longest request line accepted from a client
+LINE_LIMIT = 64
+
+# Strategies cheap enough to answer on the event loop
+INLINE_STRATEGIES = ('heuristic', 'perfect', 'book')
+
+
+class Session:
+    """
+    One game between a client (X) and the computer (O).
+
+    Attributes:
+        engine (GameState): The current position.
+        ai (str): Computer strategy.
+        status (str): 'play', 'x_wins', 'o_wins' or 'draw'.
+    """
+    __slots__ = ('engine', 'ai', 'status')
+
+    def __init__(self, ai='heuristic', state=None):
+        """
+        Initialize a new game.
+
+        Args:
+            ai (str, optional): Computer strategy. Defaults to 'heuristic'.
+            state (GameState, optional): Cleared state to use, e.g. from a pool.
+                Defaults to a new one.
+        """
+        self.engine = state if state is not None else GameState()
+        self.ai = ai
+        self.status = 'play'
+
+    def new_game(self, ai=None):
+        """
+        Reset the board, optionally switching strategy.
+
+        Args:
+            ai (str, optional): Computer strategy. Defaults to the current one.
+        """
+        self.engine.reset()
+        if ai is not None:
+            self.ai = ai
+        self.status = 'play'
+
+    def _update_status(self):
+        """Set status from the current position."""
+        if self.engine.has_won(X):
+            self.status = 'x_wins'
+        elif self.engine.has_won(O):
+            self.status = 'o_wins'
+        elif self.engine.is_full():
+            self.status = 'draw'
+
+    def play(self, cell):
+        """
+        Play the client's move.
+
+        Args:
+            cell (int): Cell index for X.
+        Returns:
+            bool: True if the game goes on and the computer must reply.
+        Raises:
+            ValueError: If the game is over or the cell is off the board or taken.
+        """
+        if self.status != 'play':
+            raise ValueError("game is over")
+        if not 0 <= cell < self.engine.rows * self.engine.cols:
+            raise ValueError(f"cell {cell} out of range")
+        if not self.engine.is_free(cell):
+            raise ValueError(f"cell {cell} is not free")
+        self.engine.play(cell, X)
+        self._update_status()
+        return self.status == 'play'
+
+    def reply(self, cell):
+        """
+        Play the computer's move.
+
+        Args:
+            cell (int): Cell index for O.
+        """
+        self.engine.play(cell, O)
+        self._update_status()
+
+    def move(self, cell, rng=random):
+        """
+        Play the client's move and the computer's reply.
+
+        Args:
+            cell (int): Cell index for X.
+            rng (random.Random, optional): Random source for the heuristic.
+        Returns:
+            int: The computer's cell, or None if the game ended first.
+        Raises:
+            ValueError: If the game is over or the cell is off the board or taken.
+        """
+        if not self.play(cell):
+            return None
+        reply = computer_move(self.engine, O, self.ai, rng)
+        self.reply(reply)
+        return reply
+
+    def render(self):
+        """
+        Return the board as 9 characters, '.' for empty cells.
+
+        Returns:
+            str: Row-major board.
+        """
+        return ''.join(self.engine.symbol_at(cell) for cell in range(CELLS)).replace(' ', '.')
+
+    def report(self, reply=None):
+        """
+        Return the OK line for the current position.
+
+        Args:
+            reply (int, optional): The computer's last cell, if it moved.
+        Returns:
+            str: "OK <board> <status> [<reply>]".
+        """
+        if reply is None:
+            return f"OK {self.render()} {self.status}"
+        return f"OK {self.render()} {self.status} {reply}"
+
+    def handle(self, line, rng=random):
+        """
+        Execute one protocol request.
+
+        Args:
+            line (str): The request without its line ending.
+            rng (random.Random, optional): Random source for the heuristic.
+        Returns:
+            str: The reply line, or None if the client asked to quit.
+        """
+        parts = line.split()
+        if not parts:
+            return "ERR empty request"
+        command = parts[0].upper()
+        if command == 'QUIT':
+            return None
+        if command == 'NEW':
+            ai = parts[1] if len(parts) > 1 else None
+            if ai is not None and ai not in STRATEGIES:
+                return f"ERR unknown ai {ai}"
+            self.new_game(ai)
+            return self.report()
+        if command == 'BOARD':
+            return self.report()
+        if command == 'MOVE':
+            if len(parts) != 2 or not parts[1].isdigit():
+                return "ERR usage: MOVE <cell>"
+            try:
+                reply = self.move(int(parts[1]), rng)
+            except ValueError as e:
+                return f"ERR {e}"
+            return self.report(reply)
+        return f"ERR unknown command {command}"
+
+
+def _build_evaluator():
+    """
+    Load the 3x3 policy network and wrap it in a batch evaluator.
+
+    Returns:
+        BatchEvaluator: Evaluator over the shared network.
+    """
+    # Imported on first use so servers without 'policy' load without NumPy
+    from policy import BatchEvaluator, load_policy  # pylint: disable=import-outside-toplevel
+    return BatchEvaluator(load_policy(3, 3, 3))
+
+
+class GameServer:
+    """
+    Asyncio TCP server running one Session per connection.
+
+    Attributes:
+        ai (str): Default computer strategy for new sessions.
+        idle_timeout (float): Seconds of silence before a client is dropped.
+        active (int): Number of connected sessions.
+        rng (random.Random): Random source shared by all sessions.
+        pool (GameStatePool): Recycled game states for new sessions.
+        evaluator (BatchEvaluator): Batches 'policy' moves across sessions,
+            created on first use.
+    """
+
+    def __init__(self, ai='heuristic', idle_timeout=300.0, seed=None):
+        """
+        Initialize the server.
+
+        Args:
+            ai (str, optional): Default computer strategy. Defaults to 'heuristic'.
+            idle_timeout (float, optional): Idle seconds before disconnect. Defaults to 300.
+            seed (int, optional): Seed for the shared random source. Defaults to None.
+        """
+        self.ai = ai
+        self.idle_timeout = idle_timeout
+        self.active = 0
+        self.rng = random.Random(seed)
+        self.pool = GameStatePool()
+        self.evaluator = None
+        self._building = None
+
+    async def get_evaluator(self):
+        """
+        Return the server's policy batch evaluator, creating it on first use.
+
+        The network is loaded, or trained if its file is missing, in the
+        default executor; requests that arrive meanwhile wait for the same build.
+
+        Returns:
+            BatchEvaluator: Evaluator over the shared 3x3 policy network.
+        """
+        if self.evaluator is None:
+            if self._building is None:
+                self._building = asyncio.get_running_loop().run_in_executor(None, _build_evaluator)
+            self.evaluator = await self._building
+        return self.evaluator
+
+    async def respond(self, session, line):
+        """
+        Execute one protocol request off the event loop where the reply is slow.
+
+        'policy' replies are batched across sessions and 'mcts' and
+        'tablebase' replies run in the default executor.
+
+        Args:
+            session (Session): The client's game.
+            line (str): The request without its line ending.
+        Returns:
+            str: The reply line, or None if the client asked to quit.
+        """
+        parts = line.split()
+        if (session.ai in INLINE_STRATEGIES or len(parts) != 2 or parts[0].upper() != 'MOVE'
+                or not parts[1].isdigit()):
+            return session.handle(line, self.rng)
+        try:
+            if not session.play(int(parts[1])):
+                return session.report()
+        except ValueError as e:
+            return f"ERR {e}"
+        if session.ai == 'policy':
+            reply = await (await self.get_evaluator()).choose(session.engine, O)
+        else:
+            # The session sends nothing else until this reply, so its engine is not shared
+            reply = await asyncio.get_running_loop().run_in_executor(
+                None, computer_move, session.engine, O, session.ai, self.rng)
+        session.reply(reply)
+        return session.report(reply)
+
+    async def handle_client(self, reader, writer):
+        """
+        Serve one client until it quits, goes idle or disconnects.
+
+        Args:
+            reader (asyncio.StreamReader): Client input.
+            writer (asyncio.StreamWriter): Client output.
+        """
+        session = Session(self.ai, self.pool.acquire())
+        self.active += 1
+        try:
+            while True:
+                try:
+                    raw = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except (asyncio.TimeoutError, ValueError):
+                    break
+                if not raw:
+                    break
+                reply = await self.respond(session, raw.decode('ascii', 'replace').strip())
+                if reply is None:
+                    break
+                writer.write(reply.encode('ascii') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.active -= 1
+            self.pool.release(session.engine)
+            writer.close()
+
+    def preload(self):
+        """
+        Build the solver and the opening book before accepting connections.
+
+        Their strategies answer on the event loop, so building them there
+        would stall every client. The MCTS player, the tablebase and the
+        policy network are built on first use off the event loop instead,
+        so a server whose clients never pick them does not pay for them.
+        """
+        get_solver()
+        load_book()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """
+        Accept connections forever.
+
+        Args:
+            host (str, optional): Interface to bind. Defaults to localhost.
+            port (int, optional): TCP port. Defaults to 8765.
+        """
+        self.preload()
+        server = await asyncio.start_server(self.handle_client, host, port,
+                                            limit=LINE_LIMIT, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Host Tic Tac Toe games over TCP.")
+    parser.add_argument('--host', default='127.0.0.1', help="interface to bind")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port")
+    parser.add_argument('--ai', default='heuristic', choices=STRATEGIES,
+                        help="default computer strategy")
+    parser.add_argument('--idle-timeout', type=float, default=300.0,
+                        help="seconds before an idle client is dropped")
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer(args.ai, args.idle_timeout).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,257 @@
+"""
+simulate.py
+
+Headless, vectorized Tic Tac Toe simulator for playing games in bulk.
+
+N games are played at once with the boards held in an (N, 9) NumPy array
+(0 empty, 1 X, 2 O). After every ply all boards are checked for a win with
+one matrix product against the 8 line masks. Move selection is pluggable:
+a policy receives the boards still in play and returns one cell per board.
+
+Usage:
+    python simulate.py GAMES [--x POLICY] [--o POLICY] [--seed SEED]
+
+Functions:
+	random_policy(boards, player, rng): Play a uniformly random empty cell.
+	heuristic_policy(boards, player, rng): Vectorized get_computer_move rules.
+	solver_policy(boards, player, rng): Perfect play from the opening book.
+	learned_policy(boards, player, rng): Batched moves from the self-play policy network.
+	simulate(games, policy_x, policy_o, seed, batch_size): Play games and tally results.
+"""
+
+import argparse
+
+import numpy as np
+
+from engine import LINES, CELLS, CENTER, CORNERS, EDGES, X, O
+from book import load_book, MAGIC, ENTRIES
+
+EMPTY = 0
+# Marks stored in the board array, indexed by player
+MARKS = (X + 1, O + 1)
+
+# LINE_MATRIX[c, l] is 1 when cell c lies on line l
+LINE_MATRIX = np.zeros((CELLS, len(LINES)), dtype=np.int8)
+for _line, _cells in enumerate(LINES):
+    LINE_MATRIX[list(_cells), _line] = 1
+
+# Base-3 place value of each cell, matching book.position_code
+POWERS = 3 ** np.arange(CELLS, dtype=np.int32)
+
+CORNER_MASK = np.isin(np.arange(CELLS), CORNERS)
+EDGE_MASK = np.isin(np.arange(CELLS), EDGES)
+
+
+def line_counts(boards, player):
+    """
+    Count player's marks on every line of every board.
+
+    Args:
+        boards (numpy.ndarray): (N, 9) board array.
+        player (int): X or O.
+    Returns:
+        numpy.ndarray: (N, 8) counts.
+    """
+    return (boards == MARKS[player]).astype(np.int8) @ LINE_MATRIX
+
+
+def has_won(boards, player):
+    """
+    Check every board for a completed line of player's marks.
+
+    Args:
+        boards (numpy.ndarray): (N, 9) board array.
+        player (int): X or O.
+    Returns:
+        numpy.ndarray: (N,) boolean array.
+    """
+    return (line_counts(boards, player) == 3).any(axis=1)
+
+
+def _random_choice(allowed, rng):
+    """
+    Pick one allowed cell per row uniformly at random.
+
+    Args:
+        allowed (numpy.ndarray): (N, 9) boolean array; every row needs a True.
+        rng (numpy.random.Generator): Random source.
+    Returns:
+        numpy.ndarray: (N,) cell indices.
+    """
+    scores = rng.random(allowed.shape)
+    scores[~allowed] = -1.0
+    return scores.argmax(axis=1)
+
+
+def random_policy(boards, player, rng):  # pylint: disable=unused-argument
+    """
+    Play a uniformly random empty cell on every board.
+
+    Args:
+        boards (numpy.ndarray): (N, 9) boards still in play.
+        player (int): X or O, the player to move.
+        rng (numpy.random.Generator): Random source.
+    Returns:
+        numpy.ndarray: (N,) cell indices.
+    """
+    return _random_choice(boards == EMPTY, rng)
+
+
+def _completing_cells(boards, player):
+    """
+    Find the empty cells that would complete a line for player.
+
+    Args:
+        boards (numpy.ndarray): (N, 9) board array.
+        player (int): X or O.
+    Returns:
+        numpy.ndarray: (N, 9) boolean array.
+    """
+    empty = boards == EMPTY
+    open_lines = ((line_counts(boards, player) == 2)
+                  & (empty.astype(np.int8) @ LINE_MATRIX == 1))
+    return empty & (open_lines.astype(np.int8) @ LINE_MATRIX.T > 0)
+
+
+def heuristic_policy(boards, player, rng):
+    """
+    Apply the TicTacToeGame.get_computer_move rules to every board at once.
+
+    Win if possible, else block, else take the center, else a random corner,
+    else a random edge. As in get_computer_move, the first winning or
+    blocking cell in board order is chosen.
+
+    Args:
+        boards (numpy.ndarray): (N, 9) boards still in play.
+        player (int): X or O, the player to move.
+        rng (numpy.random.Generator): Random source.
+    Returns:
+        numpy.ndarray: (N,) cell indices.
+    """
+    empty = boards == EMPTY
+    win = _completing_cells(boards, player)
+    block = _completing_cells(boards, 1 - player)
+    corners = empty & CORNER_MASK
+    edges = empty & EDGE_MASK
+
+    moves = _random_choice(np.where(corners.any(axis=1, keepdims=True), corners, edges), rng)
+    moves[empty[:, CENTER]] = CENTER
+    has_block = block.any(axis=1)
+    moves[has_block] = block[has_block].argmax(axis=1)
+    has_win = win.any(axis=1)
+    moves[has_win] = win[has_win].argmax(axis=1)
+    return moves
+
+
+_BOOK_TABLE = None
+
+
+def solver_policy(boards, player, rng):  # pylint: disable=unused-argument
+    """
+    Play the opening book's optimal move on every board.
+
+    Args:
+        boards (numpy.ndarray): (N, 9) boards still in play.
+        player (int): X or O, the player to move.
+        rng (numpy.random.Generator): Random source.
+    Returns:
+        numpy.ndarray: (N,) cell indices.
+    """
+    global _BOOK_TABLE  # pylint: disable=global-statement
+    if _BOOK_TABLE is None:
+        _BOOK_TABLE = np.memmap(load_book().path, dtype=np.uint8, mode='r',
+                                offset=len(MAGIC), shape=(ENTRIES,))
+    codes = boards.astype(np.int32) @ POWERS
+    return _BOOK_TABLE[codes] & 0x0F
+
+
+def learned_policy(boards, player, rng):  # pylint: disable=unused-argument
+    """
+    Play the 3x3 policy network's top move on every board in one forward pass.
+
+    Args:
+        boards (numpy.ndarray): (N, 9) boards still in play.
+        player (int): X or O, the player to move.
+        rng (numpy.random.Generator): Random source.
+    Returns:
+        numpy.ndarray: (N,) cell indices.
+    """
+    # Imported on first use; policy.py builds on this module
+    from policy import load_policy  # pylint: disable=import-outside-toplevel
+    return load_policy(3, 3, 3).policy(boards, player)
+
+
+POLICIES = {
+    'random': random_policy,
+    'heuristic': heuristic_policy,
+    'solver': solver_policy,
+    'policy': learned_policy,
+}
+
+
+def play_batch(games, policy_x, policy_o, rng):
+    """
+    Play one batch of games to completion.
+
+    Args:
+        games (int): Number of games in the batch.
+        policy_x (callable): Policy for X, who moves first.
+        policy_o (callable): Policy for O.
+        rng (numpy.random.Generator): Random source passed to the policies.
+    Returns:
+        tuple: (x_wins, o_wins, draws)
+    """
+    boards = np.zeros((games, CELLS), dtype=np.int8)
+    active = np.arange(games)
+    wins = [0, 0]
+    policies = (policy_x, policy_o)
+    for ply in range(CELLS):
+        if not len(active):
+            break
+        player = ply % 2
+        live = boards[active]
+        moves = policies[player](live, player, rng)
+        live[np.arange(len(active)), moves] = MARKS[player]
+        boards[active] = live
+        won = has_won(live, player)
+        wins[player] += int(won.sum())
+        active = active[~won]
+    return wins[X], wins[O], games - wins[X] - wins[O]
+
+
+def simulate(games, policy_x='random', policy_o='random', seed=None, batch_size=1_000_000):
+    """
+    Play games between two policies and tally the results.
+
+    Args:
+        games (int): Total number of games.
+        policy_x (str or callable, optional): Policy for X. Defaults to 'random'.
+        policy_o (str or callable, optional): Policy for O. Defaults to 'random'.
+        seed (int, optional): Seed for a reproducible run. Defaults to None.
+        batch_size (int, optional): Games held in memory at once. Defaults to 1,000,000.
+    Returns:
+        dict: Counts under 'X', 'O' and 'draw'.
+    """
+    policy_x = POLICIES.get(policy_x, policy_x)
+    policy_o = POLICIES.get(policy_o, policy_o)
+    rng = np.random.default_rng(seed)
+    totals = {'X': 0, 'O': 0, 'draw': 0}
+    for start in range(0, games, batch_size):
+        x_wins, o_wins, draws = play_batch(min(batch_size, games - start),
+                                           policy_x, policy_o, rng)
+        totals['X'] += x_wins
+        totals['O'] += o_wins
+        totals['draw'] += draws
+    return totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulate Tic Tac Toe games in bulk.")
+    parser.add_argument('games', type=int, help="number of games to play")
+    parser.add_argument('--x', default='random', choices=sorted(POLICIES), help="policy for X")
+    parser.add_argument('--o', default='heuristic', choices=sorted(POLICIES), help="policy for O")
+    parser.add_argument('--seed', type=int, default=None, help="random seed")
+    args = parser.parse_args()
+    results = simulate(args.games, args.x, args.o, args.seed)
+    for outcome, count in results.items():
+        print(f"{outcome}: {count} ({count / args.games:.2%})")
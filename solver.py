@@ -0,0 +1,225 @@
+"""
+solver.py
+
+Perfect-play Tic Tac Toe solver.
+
+Positions are searched with negamax and alpha-beta pruning on the bitboard
+engine. Results go into a transposition table keyed on the canonical form of
+the position under the 8 symmetries of the board, so each of the 765
+essentially different positions is searched at most once per process and
+later queries are answered from the table.
+
+Classes:
+	Solver: Negamax solver with a symmetry-reduced transposition table.
+
+Functions:
+	canonical_key(x_bits, o_bits): Smallest encoding of a position over all symmetries.
+	get_solver(): Return the process-wide shared solver.
+"""
+
+from engine import BitBoard, WINS, FREE_CELLS, CELLS, FULL, SIZE, X, O
+
+# Transposition table flags
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+INFINITY = CELLS + 2
+
+
+def _symmetries():
+    """
+    Build the 8 symmetries of the board as cell permutations.
+
+    Returns:
+        list: Tuples where entry c is the cell that cell c maps to.
+    """
+    def rotate(i, j):
+        return j, SIZE - 1 - i
+
+    def mirror(i, j):
+        return i, SIZE - 1 - j
+
+    perms = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = []
+            for cell in range(CELLS):
+                i, j = divmod(cell, SIZE)
+                if flip:
+                    i, j = mirror(i, j)
+                for _ in range(turns):
+                    i, j = rotate(i, j)
+                perm.append(SIZE * i + j)
+            perms.append(tuple(perm))
+    return perms
+
+
+SYMMETRIES = _symmetries()
+
+# TRANSFORMS[s][mask] is mask with every cell moved by symmetry s
+TRANSFORMS = tuple(
+    tuple(sum(1 << perm[cell] for cell in range(CELLS) if mask >> cell & 1)
+          for mask in range(FULL + 1))
+    for perm in SYMMETRIES
+)
+
+
+def canonical_key(x_bits, o_bits):
+    """
+    Return the smallest encoding of a position over all 8 board symmetries.
+
+    Args:
+        x_bits (int): Cells occupied by X.
+        o_bits (int): Cells occupied by O.
+    Returns:
+        int: (x << 9) | o of the canonical representative.
+    """
+    return min((table[x_bits] << CELLS) | table[o_bits] for table in TRANSFORMS)
+
+
+class Solver:
+    """
+    Negamax solver with alpha-beta pruning and a shared transposition table.
+
+    Scores are from the point of view of the player to move: a win is worth
+    1 plus the number of empty cells left after it, so faster wins and slower
+    losses are preferred; a draw is 0.
+
+    Attributes:
+        table (dict): Canonical position key -> (flag, score).
+    """
+
+    def __init__(self):
+        """Initialize an empty transposition table."""
+        self.table = {}
+
+    def _negamax(self, board, player, alpha, beta):
+        """
+        Score the position for player, who is to move.
+
+        Args:
+            board (BitBoard): Position to search; restored before returning.
+            player (int): X or O.
+            alpha (int): Lower search bound.
+            beta (int): Upper search bound.
+        Returns:
+            int: Score from player's point of view.
+        """
+        bits = board.bits
+        free = FREE_CELLS[bits[X] | bits[O]]
+        if WINS[bits[1 - player]]:
+            return -(len(free) + 1)
+        if not free:
+            return 0
+
+        key = canonical_key(bits[X], bits[O])
+        entry = self.table.get(key)
+        if entry is not None:
+            flag, score = entry
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        alpha_orig = alpha
+        best = -INFINITY
+        for cell in free:
+            board.play(cell, player)
+            score = -self._negamax(board, 1 - player, -beta, -alpha)
+            board.undo(cell, player)
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (flag, best)
+        return best
+
+    def value(self, board):
+        """
+        Return the exact game-theoretic score of a position.
+
+        Args:
+            board (BitBoard): Position to evaluate; left unchanged.
+        Returns:
+            int: Score for the player to move (positive wins, 0 draws, negative loses).
+        """
+        return self._negamax(board, board.to_move(), -INFINITY, INFINITY)
+
+    def best_move(self, board):
+        """
+        Return an optimal move for the player to move.
+
+        Args:
+            board (BitBoard): Position to play from; left unchanged.
+        Returns:
+            int: Cell index of the move, or None if the game is over.
+        """
+        if board.winner() is not None:
+            return None
+        player = board.to_move()
+        best_cell = None
+        best = -INFINITY
+        for cell in board.empty_cells():
+            board.play(cell, player)
+            score = -self.value(board)
+            board.undo(cell, player)
+            if score > best:
+                best = score
+                best_cell = cell
+        return best_cell
+
+    def warm(self):
+        """
+        Solve every position reachable from the empty board.
+
+        After this call every later value() and best_move() is a table lookup.
+        """
+        seen = set()
+        board = BitBoard()
+
+        def visit():
+            key = canonical_key(board.bits[X], board.bits[O])
+            if key in seen:
+                return
+            seen.add(key)
+            self.value(board)
+            if board.winner() is not None:
+                return
+            player = board.to_move()
+            for cell in board.empty_cells():
+                board.play(cell, player)
+                visit()
+                board.undo(cell, player)
+
+        visit()
+
+
+_SOLVER = None
+
+
+def get_solver():
+    """
+    Return the process-wide solver, creating and warming it on first use.
+
+    Returns:
+        Solver: The shared solver.
+    """
+    global _SOLVER  # pylint: disable=global-statement
+    if _SOLVER is None:
+        _SOLVER = Solver()
+        _SOLVER.warm()
+    return _SOLVER
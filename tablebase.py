@@ -0,0 +1,592 @@
+"""
+tablebase.py
+
+Endgame tablebases for small m,n,k boards, built by retrograde analysis.
+
+Generation works one piece count (ply) at a time. A forward pass collects
+every position reachable from the empty board, layer by layer, and stops at
+positions that are won or full. The backward pass then starts at the
+deepest layer and labels each layer from the one below it. Terminal
+positions are labelled directly; every other position takes the best value
+over its children. In both passes the positions of a layer are split into
+chunks that worker processes handle in parallel with vectorized NumPy code:
+forward, each worker returns the distinct children of its chunk; backward,
+it labels its chunk, reading the finished layer below from memory-mapped
+scratch files.
+
+Values are stored for the player to move as one byte: the result (LOSS,
+DRAW or WIN, the codes used by book.py) in the top two bits and the number
+of plies to the end of the game under best play in the low six. Wins take
+the fastest route, losses the slowest, and draws the shortest.
+
+File format (little endian):
+
+    MAGIC, then rows, cols, k and the layer count (one byte each)
+    index   per layer: position count (uint64), then the compressed sizes of
+            its key block and value block (uint32 each)
+    blocks  per layer: zlib-compressed delta-encoded sorted keys (uint64),
+            then zlib-compressed value bytes in the same order
+
+A key packs X's cells in the low rows * cols bits and O's above them. A
+lookup decompresses one layer on first use and then binary-searches it.
+
+Usage:
+    python tablebase.py ROWS COLS K [--out PATH] [--workers N]
+
+Classes:
+	Tablebase: Read-only view of a tablebase file with value and move lookups.
+
+Functions:
+	win_masks(rows, cols, k): Bit masks of every winning line.
+	split_keys(keys, cells): Unpack position keys into X and O masks.
+	terminal_mask(keys, stones, cells, masks): Flag the positions of a layer where the game is over.
+	generate(rows, cols, k, workers): Label every reachable position, layer by layer.
+	build_tablebase(rows, cols, k, path, workers): Generate and write a tablebase file.
+	default_path(rows, cols, k): File name used for a board shape.
+	load_tablebase(rows, cols, k): Return the shared tablebase, building the file if missing.
+"""
+
+import argparse
+import os
+import struct
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from book import LOSS, DRAW, WIN
+from mnk import DIRECTIONS
+
+MAGIC = b'TTTBASE1'
+HEADER = struct.Struct('<BBBB')
+LAYER = struct.Struct('<QII')
+
+# Keys hold both players' masks in one uint64, and distances fit in six bits
+MAX_CELLS = 32
+# Largest board generated on demand by load_tablebase(), which blocks its
+# caller until the file is written: on one CPU a 4x4 board takes about 5 s
+# for k=3 and 8 s for k=4, and every extra cell multiplies the work by about three
+MAX_AUTO_CELLS = 16
+
+# Positions expanded or labelled per worker task
+CHUNK_SIZE = 1 << 18
+# zlib level of the layer blocks; level 9 makes 4x4 files 13% smaller but
+# takes 15 s to compress them instead of about 1 s
+COMPRESSION_LEVEL = 6
+
+DISTANCE_BITS = 6
+DISTANCE_MASK = (1 << DISTANCE_BITS) - 1
+# Larger than any distance, for masked minimums
+_FAR = 1 << DISTANCE_BITS
+
+
+def win_masks(rows, cols, k):
+    """
+    Return the bit mask of every k-cell line on the board.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        list: One int per line, with bit cols * row + col set for its cells.
+    """
+    masks = []
+    for i in range(rows):
+        for j in range(cols):
+            for di, dj in DIRECTIONS:
+                end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                if 0 <= end_i < rows and 0 <= end_j < cols:
+                    masks.append(sum(1 << (cols * (i + di * t) + j + dj * t) for t in range(k)))
+    return masks
+
+
+def _has_line(bits, masks):
+    """
+    Check many masks for a completed line at once.
+
+    Args:
+        bits (numpy.ndarray): uint64 occupancy masks of one player.
+        masks (numpy.ndarray): uint64 line masks.
+    Returns:
+        numpy.ndarray: bool per entry of bits.
+    """
+    won = np.zeros(len(bits), dtype=bool)
+    for mask in masks:
+        won |= (bits & mask) == mask
+    return won
+
+
+def split_keys(keys, cells):
+    """
+    Unpack keys into X and O masks.
+
+    Args:
+        keys (numpy.ndarray): uint64 keys.
+        cells (int): Number of cells on the board.
+    Returns:
+        tuple: (x_bits, o_bits) uint64 arrays.
+    """
+    shift = np.uint64(cells)
+    return keys & np.uint64((1 << cells) - 1), keys >> shift
+
+
+def terminal_mask(keys, stones, cells, masks):
+    """
+    Find the positions of a layer where the game is already over.
+
+    Args:
+        keys (numpy.ndarray): uint64 keys with the same number of stones.
+        stones (int): Stones on the board in every position.
+        cells (int): Number of cells on the board.
+        masks (numpy.ndarray): uint64 line masks.
+    Returns:
+        tuple: (won, full) bool arrays; won means the last mover completed a line.
+    """
+    if stones == 0:
+        return np.zeros(len(keys), dtype=bool), np.zeros(len(keys), dtype=bool)
+    x_bits, o_bits = split_keys(keys, cells)
+    won = _has_line(x_bits if stones % 2 else o_bits, masks)
+    full = np.full(len(keys), stones == cells)
+    return won, full
+
+
+def _children(keys, stones, cells):
+    """
+    Yield the child keys of every position, one cell at a time.
+
+    Args:
+        keys (numpy.ndarray): uint64 keys of non-terminal positions.
+        stones (int): Stones on the board in every position.
+        cells (int): Number of cells on the board.
+    Yields:
+        tuple: (cell, free, child_keys) where free marks the positions in
+            which cell is empty and child_keys holds their children, sorted
+            when keys is.
+    """
+    x_bits, o_bits = split_keys(keys, cells)
+    occupied = x_bits | o_bits
+    shift = 0 if stones % 2 == 0 else cells
+    for cell in range(cells):
+        bit = np.uint64(1 << cell)
+        free = (occupied & bit) == 0
+        yield cell, free, keys[free] | np.uint64(1 << (cell + shift))
+
+
+def _merge_unique(parts):
+    """
+    Merge sorted uint64 arrays into one sorted array without duplicates.
+
+    A stable sort finds the sorted runs of the concatenation and merges
+    them, which is much cheaper than sorting it from scratch.
+
+    Args:
+        parts (list): Sorted uint64 arrays.
+    Returns:
+        numpy.ndarray: Their sorted union.
+    """
+    merged = np.sort(np.concatenate(parts), kind='stable')
+    keep = np.empty(len(merged), dtype=bool)
+    keep[:1] = True
+    np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+    return merged[keep]
+
+
+def _label_chunk(keys, stones, rows, cols, k, next_keys_path, next_values_path):
+    """
+    Label a chunk of one layer from the finished layer below it.
+
+    Runs in a worker process; the lower layer is memory-mapped from scratch files.
+
+    Args:
+        keys (numpy.ndarray): uint64 keys of the chunk, all with stones stones.
+        stones (int): Stones on the board in every position.
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        next_keys_path (str): .npy file of the sorted keys with stones + 1 stones.
+        next_values_path (str): .npy file of their values.
+    Returns:
+        numpy.ndarray: uint8 value of every position in the chunk.
+    """
+    cells = rows * cols
+    masks = np.array(win_masks(rows, cols, k), dtype=np.uint64)
+    won, full = terminal_mask(keys, stones, cells, masks)
+    values = np.zeros(len(keys), dtype=np.uint8)
+    values[won] = LOSS << DISTANCE_BITS
+    values[full & ~won] = DRAW << DISTANCE_BITS
+
+    open_ = ~(won | full)
+    if open_.any():
+        open_keys = keys[open_]
+        next_keys = np.load(next_keys_path, mmap_mode='r')
+        next_values = np.load(next_values_path, mmap_mode='r')
+        win_distance = np.full(len(open_keys), _FAR, dtype=np.int16)
+        draw_distance = np.full(len(open_keys), _FAR, dtype=np.int16)
+        loss_distance = np.zeros(len(open_keys), dtype=np.int16)
+        for _, free, child_keys in _children(open_keys, stones, cells):
+            child = next_values[np.searchsorted(next_keys, child_keys)].astype(np.int16)
+            result = child >> DISTANCE_BITS
+            distance = child & DISTANCE_MASK
+            # A child lost for the opponent is a win for the player to move
+            win_distance[free] = np.minimum(win_distance[free],
+                                            np.where(result == LOSS, distance, _FAR))
+            draw_distance[free] = np.minimum(draw_distance[free],
+                                             np.where(result == DRAW, distance, _FAR))
+            loss_distance[free] = np.maximum(loss_distance[free],
+                                             np.where(result == WIN, distance, 0))
+        labelled = np.where(
+            win_distance < _FAR, (WIN << DISTANCE_BITS) | (win_distance + 1),
+            np.where(draw_distance < _FAR, (DRAW << DISTANCE_BITS) | (draw_distance + 1),
+                     (LOSS << DISTANCE_BITS) | (loss_distance + 1)))
+        values[open_] = labelled.astype(np.uint8)
+    return values
+
+
+def _expand_chunk(keys, stones, rows, cols, k):
+    """
+    Return the distinct children of the positions of a chunk where play goes on.
+
+    Runs in a worker process during the forward pass.
+
+    Args:
+        keys (numpy.ndarray): Sorted uint64 keys of the chunk, all with stones stones.
+        stones (int): Stones on the board in every position.
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        numpy.ndarray: Sorted uint64 keys with stones + 1 stones.
+    """
+    cells = rows * cols
+    masks = np.array(win_masks(rows, cols, k), dtype=np.uint64)
+    won, full = terminal_mask(keys, stones, cells, masks)
+    keys = keys[~(won | full)]
+    # Setting one cell's bit keeps sorted keys sorted, so each cell's children form a run
+    children = [child_keys for _, _, child_keys in _children(keys, stones, cells)]
+    return _merge_unique(children) if children else np.zeros(0, dtype=np.uint64)
+
+
+def _forward_layers(rows, cols, k, executor):
+    """
+    Collect the reachable positions of every piece count.
+
+    Each layer is split into chunks that the workers expand in parallel;
+    their children are merged into the next layer.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        executor (concurrent.futures.Executor): Pool the chunks run on.
+    Returns:
+        list: Sorted uint64 key arrays; entry n holds the positions with n stones.
+    """
+    layers = [np.zeros(1, dtype=np.uint64)]
+    for stones in range(rows * cols):
+        keys = layers[-1]
+        futures = [executor.submit(_expand_chunk, keys[start:start + CHUNK_SIZE], stones,
+                                   rows, cols, k)
+                   for start in range(0, len(keys), CHUNK_SIZE)]
+        parts = [future.result() for future in futures]
+        layer = parts[0] if len(parts) == 1 else _merge_unique(parts)
+        if not len(layer):
+            break
+        layers.append(layer)
+    return layers
+
+
+def generate(rows, cols, k, workers=None):
+    """
+    Label every position reachable from the empty board.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        workers (int, optional): Worker processes. Defaults to the CPU count.
+    Returns:
+        list: (keys, values) per piece count, keys sorted uint64 and values uint8.
+    Raises:
+        ValueError: If the board has more than MAX_CELLS cells or k does not fit.
+    """
+    cells = rows * cols
+    if cells > MAX_CELLS:
+        raise ValueError(f"a {rows}x{cols} board is too large for a tablebase")
+    if k < 1 or k > max(rows, cols):
+        raise ValueError(f"k={k} does not fit on a {rows}x{cols} board")
+
+    with tempfile.TemporaryDirectory() as scratch, \
+            ProcessPoolExecutor(workers) as executor:
+        layers = _forward_layers(rows, cols, k, executor)
+        values = [None] * len(layers)
+        next_paths = (os.path.join(scratch, 'none.npy'),) * 2
+        for stones in range(len(layers) - 1, -1, -1):
+            keys = layers[stones]
+            futures = [executor.submit(_label_chunk, keys[start:start + CHUNK_SIZE], stones,
+                                       rows, cols, k, *next_paths)
+                       for start in range(0, len(keys), CHUNK_SIZE)]
+            values[stones] = np.concatenate([future.result() for future in futures])
+            next_paths = (os.path.join(scratch, f'keys{stones}.npy'),
+                          os.path.join(scratch, f'values{stones}.npy'))
+            np.save(next_paths[0], keys)
+            np.save(next_paths[1], values[stones])
+    return list(zip(layers, values))
+
+
+def default_path(rows, cols, k):
+    """
+    Return the default file for a board shape, next to this module.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        str: Path such as tablebase_4x4k3.tb.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        f'tablebase_{rows}x{cols}k{k}.tb')
+
+
+def build_tablebase(rows, cols, k, path=None, workers=None):
+    """
+    Generate a tablebase and write it to path.
+
+    The file is written to a temporary name and renamed into place, so
+    readers never observe a partial tablebase.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        path (str, optional): Destination file. Defaults to default_path().
+        workers (int, optional): Worker processes. Defaults to the CPU count.
+    Returns:
+        int: Number of positions written.
+    """
+    path = path or default_path(rows, cols, k)
+    layers = generate(rows, cols, k, workers)
+    blocks = []
+    for keys, values in layers:
+        deltas = np.diff(keys, prepend=np.uint64(0)).astype('<u8')
+        blocks.append((len(keys), zlib.compress(deltas.tobytes(), COMPRESSION_LEVEL),
+                       zlib.compress(values.tobytes(), COMPRESSION_LEVEL)))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(rows, cols, k, len(blocks)))
+        for count, key_block, value_block in blocks:
+            f.write(LAYER.pack(count, len(key_block), len(value_block)))
+        for _, key_block, value_block in blocks:
+            f.write(key_block)
+            f.write(value_block)
+    os.replace(tmp_path, path)
+    return sum(count for count, _, _ in blocks)
+
+
+class Tablebase:
+    """
+    A read-only tablebase file produced by build_tablebase.
+
+    Attributes:
+        path (str): Location of the file.
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+        counts (tuple): Positions stored per piece count.
+    """
+
+    def __init__(self, path):
+        """
+        Read the header and index; layers are loaded on first use.
+
+        Args:
+            path (str): Tablebase file.
+        Raises:
+            ValueError: If the file is not a tablebase.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a tablebase")
+            self.rows, self.cols, self.k, layer_count = HEADER.unpack(f.read(HEADER.size))
+            index = [LAYER.unpack(f.read(LAYER.size)) for _ in range(layer_count)]
+        self.counts = tuple(count for count, _, _ in index)
+        self._blocks = []
+        offset = len(MAGIC) + HEADER.size + LAYER.size * layer_count
+        for _, key_size, value_size in index:
+            self._blocks.append((offset, key_size, value_size))
+            offset += key_size + value_size
+        self._layers = {}
+
+    def __len__(self):
+        """int: Number of positions stored."""
+        return sum(self.counts)
+
+    def _layer(self, stones):
+        """
+        Return the keys and values of one piece count, loading them if needed.
+
+        Args:
+            stones (int): Piece count.
+        Returns:
+            tuple: (keys, values) numpy arrays, or None if the count is out of range.
+        """
+        layer = self._layers.get(stones)
+        if layer is None:
+            if stones >= len(self._blocks):
+                return None
+            offset, key_size, value_size = self._blocks[stones]
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                deltas = np.frombuffer(zlib.decompress(f.read(key_size)), dtype='<u8')
+                values = np.frombuffer(zlib.decompress(f.read(value_size)), dtype=np.uint8)
+            layer = self._layers[stones] = (np.cumsum(deltas, dtype=np.uint64), values)
+        return layer
+
+    def probe(self, x_bits, o_bits):
+        """
+        Look up the raw value byte of a position.
+
+        Args:
+            x_bits (int): Cells held by X, bit cols * row + col.
+            o_bits (int): Cells held by O.
+        Returns:
+            int: Value byte, or None if the position is not reachable.
+        """
+        layer = self._layer(bin(x_bits).count('1') + bin(o_bits).count('1'))
+        if layer is None:
+            return None
+        keys, values = layer
+        key = x_bits | o_bits << (self.rows * self.cols)
+        index = int(np.searchsorted(keys, np.uint64(key)))
+        if index == len(keys) or keys[index] != key:
+            return None
+        return int(values[index])
+
+    def _bits(self, engine):
+        """
+        Read the X and O masks off an engine of the tablebase's shape.
+
+        Args:
+            engine: BitBoard, GameState or MNKBoard.
+        Returns:
+            tuple: (x_bits, o_bits).
+        Raises:
+            ValueError: If the engine's board shape does not match.
+        """
+        if (engine.rows, engine.cols, engine.k) != (self.rows, self.cols, self.k):
+            raise ValueError(f"tablebase is for {self.rows}x{self.cols} k={self.k}, "
+                             f"not {engine.rows}x{engine.cols} k={engine.k}")
+        x_bits = o_bits = 0
+        for cell in range(self.rows * self.cols):
+            symbol = engine.symbol_at(cell)
+            if symbol == 'X':
+                x_bits |= 1 << cell
+            elif symbol == 'O':
+                o_bits |= 1 << cell
+        return x_bits, o_bits
+
+    def value(self, engine):
+        """
+        Return the game-theoretic value of a position for the player to move.
+
+        Args:
+            engine: BitBoard, GameState or MNKBoard of the tablebase's shape.
+        Returns:
+            tuple: (result, distance) with result WIN, DRAW or LOSS and distance
+                the plies to the end of the game, or None if unreachable.
+        """
+        packed = self.probe(*self._bits(engine))
+        if packed is None:
+            return None
+        return packed >> DISTANCE_BITS, packed & DISTANCE_MASK
+
+    def best_move(self, engine):
+        """
+        Return an optimal move: the fastest win, else a draw, else the slowest loss.
+
+        Ties go to the lowest cell.
+
+        Args:
+            engine: BitBoard, GameState or MNKBoard of the tablebase's shape.
+        Returns:
+            int: Cell index of the move, or None if the game is over or the
+                position is not in the tablebase.
+        """
+        x_bits, o_bits = self._bits(engine)
+        packed = self.probe(x_bits, o_bits)
+        if packed is None or packed & DISTANCE_MASK == 0:
+            return None
+        x_to_move = bin(x_bits).count('1') == bin(o_bits).count('1')
+        best = None
+        best_rank = None
+        for cell in range(self.rows * self.cols):
+            bit = 1 << cell
+            if (x_bits | o_bits) & bit:
+                continue
+            if x_to_move:
+                child = self.probe(x_bits | bit, o_bits)
+            else:
+                child = self.probe(x_bits, o_bits | bit)
+            result, distance = child >> DISTANCE_BITS, child & DISTANCE_MASK
+            # Lower is better: opponent loses soonest, then draws, then wins latest
+            if result == LOSS:
+                rank = (0, distance)
+            elif result == DRAW:
+                rank = (1, distance)
+            else:
+                rank = (2, -distance)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = cell, rank
+        return best
+
+
+_TABLEBASES = {}
+
+
+def load_tablebase(rows, cols, k):
+    """
+    Return the process-wide tablebase for a board shape.
+
+    The file at default_path() is generated first if it does not exist,
+    which is only done for boards of up to MAX_AUTO_CELLS cells.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        Tablebase: The shared tablebase.
+    Raises:
+        ValueError: If the file is missing and the board is too large to generate.
+    """
+    tablebase = _TABLEBASES.get((rows, cols, k))
+    if tablebase is None:
+        path = default_path(rows, cols, k)
+        if not os.path.exists(path):
+            if rows * cols > MAX_AUTO_CELLS:
+                raise ValueError(f"no tablebase for {rows}x{cols} k={k}; "
+                                 f"generate it with: python tablebase.py {rows} {cols} {k}")
+            build_tablebase(rows, cols, k, path)
+        tablebase = _TABLEBASES[rows, cols, k] = Tablebase(path)
+    return tablebase
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate an m,n,k endgame tablebase.")
+    parser.add_argument('rows', type=int, help="number of rows")
+    parser.add_argument('cols', type=int, help="number of columns")
+    parser.add_argument('k', type=int, help="marks in a row needed to win")
+    parser.add_argument('--out', help="output file (defaults to tablebase_<rows>x<cols>k<k>.tb)")
+    parser.add_argument('--workers', type=int, help="worker processes (defaults to the CPU count)")
+    args = parser.parse_args()
+    out_path = args.out or default_path(args.rows, args.cols, args.k)
+    count = build_tablebase(args.rows, args.cols, args.k, out_path, args.workers)
+    start = Tablebase(out_path).probe(0, 0)
+    names = {LOSS: 'loss', DRAW: 'draw', WIN: 'win'}
+    print(f"Wrote {count} positions to {out_path}; the first player's result is "
+          f"{names[start >> DISTANCE_BITS]} in {start & DISTANCE_MASK} plies")
@@ -0,0 +1,134 @@
+"""
+brute_force.py
+
+Reference game logic for the tests: plain minimax over tuples of cells,
+sharing no code with the engines, solvers or tables under test.
+
+Cells hold 0 for empty, 1 for X and 2 for O.
+"""
+
+from functools import lru_cache
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def windows(rows, cols, k):
+    """
+    Return every k-cell line of a board.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        list: Tuples of cell indices.
+    """
+    found = []
+    for i in range(rows):
+        for j in range(cols):
+            for di, dj in DIRECTIONS:
+                cells = [(i + di * t, j + dj * t) for t in range(k)]
+                if all(0 <= r < rows and 0 <= c < cols for r, c in cells):
+                    found.append(tuple(cols * r + c for r, c in cells))
+    return found
+
+
+def winner(cells, lines):
+    """
+    Return 0 if X has a line, 1 if O has one, otherwise None.
+
+    Args:
+        cells (tuple): Board cells.
+        lines (list): Windows from windows().
+    Returns:
+        int: The winning player, or None.
+    """
+    for line in lines:
+        first = cells[line[0]]
+        if first and all(cells[cell] == first for cell in line):
+            return first - 1
+    return None
+
+
+def to_move(cells):
+    """int: 0 when X is to move, 1 when O is."""
+    return 0 if cells.count(1) == cells.count(2) else 1
+
+
+def solve(rows, cols, k):
+    """
+    Return a memoized minimax value function for a board shape.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        callable: value(cells) giving 1, 0 or -1 for the player to move.
+    """
+    lines = windows(rows, cols, k)
+
+    @lru_cache(maxsize=None)
+    def value(cells):
+        if winner(cells, lines) is not None:
+            return -1
+        if all(cells):
+            return 0
+        mark = to_move(cells) + 1
+        return max(-value(cells[:cell] + (mark,) + cells[cell + 1:])
+                   for cell in range(len(cells)) if not cells[cell])
+
+    return value
+
+
+def reachable(rows, cols, k):
+    """
+    Return every position reachable from the empty board.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        k (int): Marks in a row needed to win.
+    Returns:
+        set: Positions as cell tuples.
+    """
+    lines = windows(rows, cols, k)
+    seen = set()
+    stack = [(0,) * (rows * cols)]
+    while stack:
+        cells = stack.pop()
+        if cells in seen:
+            continue
+        seen.add(cells)
+        if winner(cells, lines) is None and not all(cells):
+            mark = to_move(cells) + 1
+            stack.extend(cells[:cell] + (mark,) + cells[cell + 1:]
+                         for cell in range(len(cells)) if not cells[cell])
+    return seen
+
+
+def masks(cells):
+    """
+    Return the (x_bits, o_bits) occupancy masks of a position.
+
+    Args:
+        cells (tuple): Board cells.
+    Returns:
+        tuple: Two ints with bit c set for each mark on cell c.
+    """
+    x_bits = sum(1 << cell for cell, mark in enumerate(cells) if mark == 1)
+    o_bits = sum(1 << cell for cell, mark in enumerate(cells) if mark == 2)
+    return x_bits, o_bits
+
+
+def after(cells, cell):
+    """
+    Return the position after the player to move plays cell.
+
+    Args:
+        cells (tuple): Board cells.
+        cell (int): Empty cell.
+    Returns:
+        tuple: The new position.
+    """
+    return cells[:cell] + (to_move(cells) + 1,) + cells[cell + 1:]
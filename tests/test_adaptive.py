@@ -0,0 +1,85 @@
+"""Check the 2PL model, the bucketed item pool and the adaptive quiz's stopping rules."""
+
+import math
+
+from adaptive import AdaptiveQuiz, ItemPool, probability
+
+
+def _questions(count):
+    return [{"id": n, "question": f"Q{n}", "choices": ["a", "b"], "answer_index": 0}
+            for n in range(count)]
+
+
+def _spread_pool(count):
+    """A pool calibrated so the items run from easy to hard, at most one per bucket."""
+    pool = ItemPool(range(count))
+    pool.calibrate(range(count), [1000] * count,
+                   [round(950 - 900 * n / (count - 1)) for n in range(count)])
+    return pool
+
+
+def test_probability_is_the_2pl_curve():
+    """p is 1/2 at theta = b, symmetric, steeper with discrimination and stable far out."""
+    assert probability(1.0, 1.0, 2.0) == 0.5
+    assert math.isclose(probability(1.0, 0.0, 1.0) + probability(-1.0, 0.0, 1.0), 1.0)
+    assert probability(1.0, 0.0, 2.0) > probability(1.0, 0.0, 1.0)
+    assert probability(-1000, 0, 1) == 0.0 and probability(1000, 0, 1) == 1.0
+
+
+def test_select_picks_the_informative_unasked_item():
+    """Selection returns the item nearest theta, then its neighbours once it is asked."""
+    pool = _spread_pool(13)
+    ranked = sorted(range(13), key=lambda position: -pool.information(position, 1.0))
+    assert pool.select(1.0) == ranked[0]
+    assert pool.select(1.0, {ranked[0]}) == ranked[1]
+    assert abs(ranked[1] - ranked[0]) == 1
+    assert pool.select(1.0, set(range(13))) is None
+
+
+def test_calibrate_and_update_move_the_estimates():
+    """Hard items calibrate above zero; a surprise answer shifts difficulty its way."""
+    pool = ItemPool([10, 11, 12])
+    pool.calibrate([10, 11, 99], [100, 100, 5], [90, 10, 5])
+    assert pool.difficulty[0] < 0 < pool.difficulty[1]
+    assert pool.responses == [100, 100, 0] and pool.difficulty[2] == 0.0
+
+    before = pool.difficulty[2]
+    pool.update(2, -2.0, True)
+    assert pool.difficulty[2] < before and pool.responses[2] == 1
+    assert pool.select(-10.0) == 0
+
+
+def test_quiz_stops_between_min_and_max_questions():
+    """Correct answers raise theta; the quiz stops at max_questions or the target error."""
+    pool = _spread_pool(41)
+    quiz = AdaptiveQuiz(_questions(41), pool=pool, max_questions=8, min_questions=3,
+                        target_error=0.01)
+    thetas = []
+    while (question := quiz.get_next_question()) is not None:
+        assert quiz.get_next_question() is question
+        quiz.check_answer(question, 1)
+        thetas.append(quiz.theta)
+    assert len(thetas) == 8 and thetas == sorted(thetas) and thetas[0] > 0
+    assert quiz.score == 8 and quiz.standard_error < 1
+
+    early = AdaptiveQuiz(_questions(41), pool=_spread_pool(41), max_questions=8,
+                         min_questions=3, target_error=2.0)
+    asked = 0
+    while (question := early.get_next_question()) is not None:
+        early.check_answer(question, 2)
+        asked += 1
+    assert asked == 3 and early.theta < 0
+
+
+def test_finish_feeds_answers_back_once():
+    """Ending the quiz updates the asked items; learn=False leaves the pool alone."""
+    for learn in (True, False):
+        pool = _spread_pool(13)
+        seeded = sum(pool.responses)
+        quiz = AdaptiveQuiz(_questions(13), pool=pool, max_questions=2, min_questions=2,
+                            learn=learn)
+        while (question := quiz.get_next_question()) is not None:
+            quiz.check_answer(question, 1)
+        assert sum(pool.responses) - seeded == (2 if learn else 0)
+        quiz.finish()
+        assert sum(pool.responses) - seeded == (2 if learn else 0)
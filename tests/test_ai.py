@@ -0,0 +1,55 @@
+"""Check the shared move cache keys against positions that used to collide."""
+
+import random
+
+from ai import computer_move
+from brute_force import after, solve
+from cache import MoveCache
+from engine import BitBoard, O, X
+from gamestate import GameState
+
+VALUE = solve(3, 3, 3)
+
+
+def _cells(engine):
+    return tuple(1 if engine.symbol_at(cell) == 'X' else 2 if engine.symbol_at(cell) == 'O' else 0
+                 for cell in range(9))
+
+
+def test_position_key_layout_matches_gamestate():
+    """BitBoard and GameState give the same key for the same position."""
+    rng = random.Random(0)
+    for _ in range(200):
+        board, state = BitBoard(), GameState()
+        for ply in range(rng.randint(0, 9)):
+            cell = rng.choice(board.empty_cells())
+            board.play(cell, ply % 2)
+            state.play(cell, ply % 2)
+        assert board.position_key() == state.packed
+
+
+def test_cached_perfect_moves_stay_optimal_across_engines():
+    """A cached move for one position is never served for a mirrored one."""
+    cache = MoveCache()
+    board = BitBoard()
+    board.play(0, X)
+    board.play(2, O)
+    state = GameState()
+    state.play(2, X)
+    state.play(0, O)
+    for engine in (board, state):
+        cells = _cells(engine)
+        move = computer_move(engine, X, 'perfect', cache=cache)
+        assert -VALUE(after(cells, move)) == VALUE(cells) == 1
+
+
+def test_heuristic_cache_keys_include_the_player():
+    """The same position cached for X is evaluated afresh for O."""
+    cache = MoveCache()
+    board = BitBoard()
+    for cell in (0, 1):
+        board.play(cell, X)
+    for cell in (3, 4):
+        board.play(cell, O)
+    assert computer_move(board, X, 'heuristic', cache=cache) == 2
+    assert computer_move(board, O, 'heuristic', cache=cache) == 5
@@ -0,0 +1,81 @@
+"""Check the game-tree analytics and the vectorized heuristic against brute force."""
+
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+import ai
+from analytics import analyse, heuristic_options
+from book import DRAW, LOSS, WIN
+from brute_force import after, masks, reachable, solve, to_move, windows, winner
+from mnk import MNKBoard
+
+RESULT = {1: WIN, 0: DRAW, -1: LOSS}
+
+
+def _open_positions(rows, cols, k):
+    lines = windows(rows, cols, k)
+    return [cells for cells in reachable(rows, cols, k)
+            if winner(cells, lines) is None and not all(cells)]
+
+
+@pytest.mark.parametrize('rows, cols, k', [(3, 3, 3), (3, 3, 2), (2, 4, 3)])
+def test_heuristic_options_match_the_engine_heuristic(rows, cols, k):
+    """Every open position gets exactly the cells ai.heuristic_options() picks from."""
+    by_stones = {}
+    for cells in _open_positions(rows, cols, k):
+        by_stones.setdefault(sum(map(bool, cells)), []).append(cells)
+    for stones, positions in by_stones.items():
+        keys = np.array([x | o << (rows * cols) for x, o in map(masks, positions)],
+                        dtype=np.uint64)
+        options = heuristic_options(keys, stones, rows, cols, k)
+        for cells, choice in zip(positions, options.tolist()):
+            board = MNKBoard(rows, cols, k)
+            for cell, mark in enumerate(cells):
+                if mark:
+                    board.play(cell, mark - 1)
+            expected, _ = ai.heuristic_options(board, to_move(cells))
+            assert choice == sum(1 << cell for cell in expected), cells
+
+
+def test_analyse_counts_and_audits_the_3x3_tree(tmp_path):
+    """Positions, game-tree nodes, results and heuristic deviations match brute force."""
+    value = solve(3, 3, 3)
+    lines = windows(3, 3, 3)
+
+    @lru_cache(maxsize=None)
+    def subtree(cells):
+        if winner(cells, lines) is not None or all(cells):
+            return 1
+        return 1 + sum(subtree(after(cells, cell)) for cell in range(9) if not cells[cell])
+
+    summary = analyse(3, 3, 3, str(tmp_path), workers=1, max_lines=3)
+    assert summary['positions'] == 5478 and summary['value'] == 'draw'
+    assert summary['tree_nodes'] == subtree((0,) * 9) == 549946
+
+    keys = np.load(tmp_path / 'key.npy')
+    result = np.load(tmp_path / 'result.npy')
+    bad = np.load(tmp_path / 'heuristic_bad.npy')
+    deviations = 0
+    for cells in _open_positions(3, 3, 3):
+        x_bits, o_bits = masks(cells)
+        index = int(np.flatnonzero(keys == (x_bits | o_bits << 9))[0])
+        assert result[index] == RESULT[value(cells)]
+        board = MNKBoard(3, 3, 3)
+        for cell, mark in enumerate(cells):
+            if mark:
+                board.play(cell, mark - 1)
+        choices, _ = ai.heuristic_options(board, to_move(cells))
+        worse = sum(-value(after(cells, cell)) < value(cells) for cell in choices)
+        assert bad[index] == worse, cells
+        deviations += worse > 0
+    assert summary['deviations'] == deviations
+    # Each losing line reaches a position the mover could hold, then plays the losing move
+    assert summary['losing_lines']
+    for line in summary['losing_lines']:
+        cells = (0,) * 9
+        for cell in line['moves'][:line['heuristic_move']]:
+            cells = after(cells, cell)
+        assert value(cells) == {'win': 1, 'draw': 0}[line['optimal']]
+        assert value(after(cells, line['moves'][line['heuristic_move']])) == 1
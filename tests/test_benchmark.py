@@ -0,0 +1,45 @@
+"""Check the benchmark harness: headless runs, restored tkinter and regression reports."""
+
+import sys
+
+import ai
+import benchmark
+import book
+
+
+def test_tk_stub_is_removed_after_the_block():
+    """The stub replaces tkinter only inside the block, also when the block raises."""
+    before = sys.modules.get('tkinter')
+    try:
+        with benchmark.tk_stub() as stub:
+            import tkinter  # pylint: disable=import-outside-toplevel
+            assert tkinter is stub
+            raise KeyError
+    except KeyError:
+        pass
+    assert sys.modules.get('tkinter') is before
+
+
+def test_run_benchmarks_is_headless(tmp_path, monkeypatch):
+    """A small run times every hot path and leaves tkinter as it found it."""
+    path = str(tmp_path / 'test.book')
+    book.build_book(path)
+    opened = book.OpeningBook(path)
+    monkeypatch.setattr(book, 'load_book', lambda: opened)
+    monkeypatch.setattr(ai, 'load_book', lambda: opened)
+    before = sys.modules.get('tkinter')
+    results = benchmark.run_benchmarks(seed=1, positions=50)
+    opened.close()
+    assert sys.modules.get('tkinter') is before
+    assert len(results) == 7
+    for result in results:
+        assert result['calls'] == 50
+        assert 0 < result['p50_us'] <= result['p90_us'] <= result['p99_us'] <= result['max_us']
+
+
+def test_compare_ignores_slowdowns_below_the_noise_floor():
+    """Only a slowdown over both the ratio and the absolute floor is a regression."""
+    baseline = [{'name': 'fast', 'p50_us': 0.1}, {'name': 'slow', 'p50_us': 10.0}]
+    results = [{'name': 'fast', 'p50_us': 0.14}, {'name': 'slow', 'p50_us': 12.0},
+               {'name': 'added', 'p50_us': 1.0}]
+    assert benchmark.compare(results, baseline) == ['slow']
@@ -0,0 +1,52 @@
+"""Check the opening book against brute-force minimax."""
+
+import pytest
+
+import ai
+from book import DRAW, LOSS, WIN, OpeningBook, build_book
+from brute_force import after, masks, reachable, solve, windows, winner
+from engine import BitBoard, O, X
+
+VALUE = solve(3, 3, 3)
+LINES = windows(3, 3, 3)
+RESULT = {1: WIN, 0: DRAW, -1: LOSS}
+
+
+@pytest.fixture(scope='module')
+def book(tmp_path_factory):
+    """A book built into a temporary file."""
+    path = str(tmp_path_factory.mktemp('book') / 'test.book')
+    assert build_book(path) == 5478
+    opened = OpeningBook(path)
+    yield opened
+    opened.close()
+
+
+def test_every_reachable_position_matches_minimax(book):
+    """Each reachable position stores its minimax value and an optimal move."""
+    for cells in reachable(3, 3, 3):
+        value, move = book.entry(BitBoard(*masks(cells)))
+        if winner(cells, LINES) is not None or all(cells):
+            assert move is None
+            assert value == (DRAW if winner(cells, LINES) is None else LOSS)
+            continue
+        assert value == RESULT[VALUE(cells)], cells
+        assert not cells[move]
+        assert -VALUE(after(cells, move)) == VALUE(cells), cells
+
+
+def test_unreachable_position_has_no_entry(book):
+    """Codes that no game reaches are not read as a move to cell 0."""
+    board = BitBoard(0b011, 0)  # two X marks and no O mark
+    assert book.entry(board) is None
+    with pytest.raises(ValueError):
+        book.best_move(board)
+
+
+def test_book_move_solves_positions_outside_the_book(book, monkeypatch):
+    """ai.book_move falls back to the solver for unreachable positions."""
+    monkeypatch.setattr(ai, 'load_book', lambda: book)
+    board = BitBoard(0b011, 0)
+    move = ai.computer_move(board, O, 'book', cache=None)
+    assert board.is_free(move)
+    assert ai.computer_move(BitBoard(), X, 'book', cache=None) is not None
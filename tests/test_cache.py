@@ -0,0 +1,73 @@
+"""Check CLOCK eviction in the move cache and the Zobrist key tables."""
+
+import threading
+
+import pytest
+
+from cache import MoveCache
+from zobrist import zobrist_keys
+
+
+def test_clock_spares_referenced_entries():
+    """A full cache evicts the first entry whose reference bit is clear."""
+    cache = MoveCache(3)
+    for key in 'abc':
+        cache.put(key, key.upper())
+    assert cache.get('a') == 'A'
+    cache.put('d', 'D')
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['A', 'C', 'D']
+    assert len(cache) == 3 and cache.evictions == 1
+
+
+def test_clock_sweep_clears_bits_before_evicting():
+    """When every entry is referenced the hand clears them all and takes the next slot."""
+    cache = MoveCache(2)
+    cache.put(1, 'one')
+    cache.put(2, 'two')
+    cache.get(1)
+    cache.get(2)
+    cache.put(3, 'three')
+    assert cache.get(1) is None
+    assert cache.get(2) == 'two' and cache.get(3) == 'three'
+
+
+def test_updates_and_statistics():
+    """Overwriting keeps the size, and clear() resets everything."""
+    cache = MoveCache(4)
+    cache.put('k', 1)
+    cache.put('k', 2)
+    assert cache.get('k') == 2 and cache.get('missing') is None
+    assert cache.stats() == {'size': 1, 'capacity': 4, 'hits': 1, 'misses': 1,
+                             'evictions': 0, 'hit_rate': 0.5}
+    cache.clear()
+    assert len(cache) == 0 and cache.hit_rate() == 0.0 and cache.get('k') is None
+    with pytest.raises(ValueError):
+        MoveCache(0)
+
+
+def test_concurrent_use_keeps_the_size_bounded():
+    """Threads hammering a small cache never push it past capacity."""
+    cache = MoveCache(64)
+
+    def work(offset):
+        for key in range(offset, offset + 2000):
+            cache.put(key % 500, key)
+            cache.get((key * 7) % 500)
+
+    threads = [threading.Thread(target=work, args=(n * 1000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 64
+    assert cache.hits + cache.misses == 8000
+
+
+def test_zobrist_tables_are_fixed_per_board_size():
+    """Keys are 64-bit, distinct and the same table on every call."""
+    keys = zobrist_keys(16)
+    assert keys is zobrist_keys(16)
+    flat = keys[0] + keys[1]
+    assert len(set(flat)) == 32 and all(0 <= key < 1 << 64 for key in flat)
+    assert zobrist_keys(9) != keys
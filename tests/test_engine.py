@@ -0,0 +1,40 @@
+"""Check the bitboard engine against brute-force win detection on every reachable 3x3 position."""
+
+from brute_force import masks, reachable, to_move, windows, winner
+from engine import BitBoard, O, X
+
+LINES = windows(3, 3, 3)
+POSITIONS = sorted(reachable(3, 3, 3))
+
+
+def test_winner_matches_rescan():
+    """BitBoard.winner, is_full and to_move agree with a plain scan of the cells."""
+    for cells in POSITIONS:
+        board = BitBoard(*masks(cells))
+        assert board.winner() == winner(cells, LINES), cells
+        assert board.is_full() == all(cells)
+        assert board.to_move() == to_move(cells)
+        assert list(board.empty_cells()) == [cell for cell in range(9) if not cells[cell]]
+
+
+def test_wins_with_predicts_the_move():
+    """wins_with(cell, player) is True exactly when playing cell completes a line."""
+    for cells in POSITIONS:
+        board = BitBoard(*masks(cells))
+        for cell in board.empty_cells():
+            for player in (X, O):
+                board.play(cell, player)
+                won = board.has_won(player)
+                board.undo(cell, player)
+                assert board.wins_with(cell, player) == won
+
+
+def test_play_and_undo_restore_the_position():
+    """undo reverses play and from_rows reads the GUI's nested lists."""
+    board = BitBoard.from_rows([['X', '', 'O'], ['', 'X', ''], ['', '', '']])
+    assert board.bits == [0b10001, 0b100]
+    key = board.position_key()
+    board.play(8, X)
+    assert board.winner() == X
+    board.undo(8, X)
+    assert board.position_key() == key and board.winner() is None
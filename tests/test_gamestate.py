@@ -0,0 +1,63 @@
+"""Check that GameState behaves like BitBoard and that the pool recycles states."""
+
+import random
+import sys
+
+from engine import BitBoard, O, X
+from gamestate import GameState, GameStatePool
+
+
+def test_random_games_match_bitboard():
+    """Every query agrees with BitBoard through random games with take-backs."""
+    rng = random.Random(3)
+    for _ in range(200):
+        state, board = GameState(), BitBoard()
+        moves = []
+        while board.winner() is None and not board.is_full():
+            player = board.to_move()
+            cell = rng.choice(board.empty_cells())
+            for engine in (state, board):
+                engine.play(cell, player)
+            moves.append((cell, player))
+            if rng.random() < 0.2:
+                cell, player = moves.pop()
+                for engine in (state, board):
+                    engine.undo(cell, player)
+            assert state.position_key() == board.position_key()
+            assert list(state.bits) == board.bits
+            assert state.winner() == board.winner()
+            assert state.is_full() == board.is_full()
+            assert state.to_move() == board.to_move()
+            assert state.empty_cells() == board.empty_cells()
+            for cell in state.empty_cells():
+                assert state.wins_with(cell, O) == board.wins_with(cell, O)
+
+
+def test_snapshot_and_restore():
+    """A snapshot is the packed int and restoring it returns to that position."""
+    state = GameState()
+    state.play(4, X)
+    snapshot = state.snapshot()
+    state.play(0, O)
+    state.restore(snapshot)
+    assert state.packed == snapshot == 1 << 4
+    assert [state.symbol_at(cell) for cell in (0, 4)] == [' ', 'X']
+
+
+def test_state_is_small():
+    """A live game costs one slotted object without a __dict__."""
+    state = GameState()
+    assert not hasattr(state, '__dict__')
+    assert sys.getsizeof(state) < 100
+
+
+def test_pool_recycles_cleared_states():
+    """Released states come back empty and the pool keeps at most max_size."""
+    pool = GameStatePool(max_size=2)
+    states = [pool.acquire() for _ in range(3)]
+    for state in states:
+        state.play(0, X)
+        pool.release(state)
+    assert len(pool) == 2
+    reused = pool.acquire()
+    assert reused in states and reused.packed == 0
@@ -0,0 +1,56 @@
+"""Check bulk grading with arbitrary user keys and repeated attempts."""
+
+import numpy as np
+
+from grading import Grader, iter_csv_chunks
+
+KEY = np.array([0, 1, 2, 3])
+
+
+def test_user_keys_are_dense_whatever_their_values(tmp_path):
+    """String, negative and huge user ids grade without allocating by id."""
+    path = tmp_path / 'submissions.csv'
+    path.write_text("user,question_id,choice\nalice,0,1\n-5,1,2\n1000000000,2,1\nalice,3,4\n",
+                    encoding='utf-8')
+    grader = Grader(KEY).grade(iter_csv_chunks(str(path), chunk_rows=2))
+    users, scores, _ = grader.user_results()
+    assert dict(zip(users, scores.tolist())) == {'alice': 2, '-5': 1, '1000000000': 0}
+    assert len(grader.user_scores) == 3
+
+
+def test_repeated_attempts_count_once_per_question():
+    """A question answered twice scores once, correct if any attempt was."""
+    grader = Grader(KEY)
+    grader.add(np.array([7, 7]), np.array([0, 0]), np.array([1, 1]))
+    grader.add(np.array([7, 7]), np.array([1, 1]), np.array([1, 2]))
+    _, scores, percentages = grader.user_results()
+    assert scores.tolist() == [2]
+    assert percentages.tolist() == [50.0]
+    assert grader.user_attempts.tolist() == [2]
+    assert grader.attempts.tolist() == [2, 2, 0, 0]
+
+
+def test_random_chunks_match_a_plain_recount():
+    """Totals over many chunks equal a per-row recount with a set of seen pairs."""
+    rng = np.random.default_rng(4)
+    key = rng.integers(0, 4, 37)
+    key[5] = -1
+    users = rng.integers(0, 300, 20_000)
+    qids = rng.integers(-1, 40, 20_000)
+    choices = rng.integers(0, 6, 20_000)
+    grader = Grader(key)
+    for start in range(0, 20_000, 3_000):
+        end = start + 3_000
+        grader.add(users[start:end], qids[start:end], choices[start:end])
+
+    seen, right = set(), set()
+    for user, qid, choice in zip(users.tolist(), qids.tolist(), choices.tolist()):
+        if 0 <= qid < len(key) and key[qid] != -1 and 1 <= choice <= 4:
+            seen.add((user, qid))
+            if key[qid] == choice - 1:
+                right.add((user, qid))
+    ids, scores, _ = grader.user_results()
+    expected = {user: sum(1 for pair in right if pair[0] == user) for user in ids}
+    assert dict(zip(ids, scores.tolist())) == expected
+    assert grader.user_attempts.sum() == len(seen)
+    assert grader.rows == 20_000
@@ -0,0 +1,84 @@
+"""Check MoveLog undo/redo and the binary game archive."""
+
+import random
+
+import pytest
+
+from book import position_code
+from engine import BitBoard, O, X
+from history import (DRAW, UNFINISHED, X_WINS, GameRecord, MoveLog, RecordWriter,
+                     iter_records, replay)
+from mnk import MNKBoard
+
+
+def test_codes_follow_undo_and_redo():
+    """Each ply's code is the board's book code or Zobrist key, through undo and redo."""
+    for engine, code_of in ((BitBoard(), position_code), (MNKBoard(4, 5, 3), lambda b: b.key)):
+        log = MoveLog(engine)
+        rng = random.Random(2)
+        for _ in range(40):
+            action = rng.random()
+            if action < 0.25:
+                log.undo()
+            elif action < 0.45:
+                log.redo()
+            elif engine.winner() is None and engine.empty_cells():
+                log.play(rng.choice(list(engine.empty_cells())))
+            assert log.code == code_of(engine)
+            assert len(log) == log.cursor
+        while log.undo():
+            pass
+        assert log.code == 0 and not log.can_undo() and log.can_redo() == bool(log.moves)
+
+
+def test_play_after_undo_drops_the_redo_branch():
+    """A new move replaces the undone ones."""
+    log = MoveLog(BitBoard())
+    for cell in (4, 0, 8):
+        log.play(cell)
+    log.undo()
+    log.undo()
+    log.play(2)
+    assert log.moves == [(4, X), (2, O)] and not log.can_redo()
+    assert log.redo() is None
+
+
+def test_records_round_trip(tmp_path):
+    """Records of several results and board sizes read back and replay to their result."""
+    path = str(tmp_path / 'games.rec')
+    log = MoveLog(BitBoard())
+    for cell in (0, 3, 1, 4, 2):
+        log.play(cell)
+    big = GameRecord(20, 20, 5, UNFINISHED, (399, 0, 300))
+    records = [log.to_record(), GameRecord(3, 3, 3, DRAW, (0, 4, 8, 2, 6, 3, 5, 7, 1)), big]
+    with RecordWriter(path) as writer:
+        writer.write(records[0])
+        writer.write(records[1])
+    with RecordWriter(path) as writer:
+        writer.write(big)
+    assert list(iter_records(path)) == records
+    assert records[0].result == X_WINS
+
+    for record in records:
+        positions = list(replay(record))
+        assert len(positions) == len(record.moves)
+        if positions:
+            engine = positions[-1][1]
+            winner = engine.winner()
+            expected = (X_WINS + winner if winner is not None
+                        else DRAW if engine.is_full() else UNFINISHED)
+            assert expected == record.result
+
+
+def test_damaged_archives_are_rejected(tmp_path):
+    """A wrong header or a cut-off record raises ValueError."""
+    path = tmp_path / 'games.rec'
+    with RecordWriter(str(path)) as writer:
+        writer.write(GameRecord(3, 3, 3, DRAW, (4, 0, 8)))
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
+    path.write_bytes(b'not an archive')
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
@@ -0,0 +1,90 @@
+"""Check the metrics registry, its exports and the game loop's phase timings."""
+
+import json
+import os
+import random
+import signal
+import urllib.request
+
+import pytest
+
+from instrumentation import METRICS, Histogram, Metrics, configure_from_env
+from tictactoe import TicTacToeGame
+
+
+def test_histogram_buckets_are_cumulative():
+    """Observations land in the first bucket whose bound they do not exceed."""
+    histogram = Histogram((0.001, 0.01))
+    for seconds in (0.0005, 0.001, 0.005, 1.0):
+        histogram.observe(seconds)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative() == [(0.001, 2), (0.01, 3), ('+Inf', 4)]
+    assert histogram.count == 4 and histogram.total == pytest.approx(1.0065)
+
+
+def test_disabled_registry_hands_out_no_timers():
+    """Disabled or unsampled calls get None; sampled calls record a lap and a count."""
+    metrics = Metrics()
+    assert metrics.timer() is None
+    metrics.enable(0.0)
+    assert metrics.timer() is None
+    metrics.enable()
+    timer = metrics.timer()
+    timer.lap('board')
+    timer.done('move')
+    assert metrics.counters == {'move': 1}
+    assert sorted(metrics.histograms) == ['board', 'move']
+
+
+def test_exports(tmp_path):
+    """The HTTP endpoint serves Prometheus text and write_jsonl appends snapshots."""
+    metrics = Metrics()
+    metrics.observe('ai', 0.002)
+    metrics.count('move', 3)
+    server = metrics.serve_prometheus(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            text = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+    assert text == metrics.prometheus_text()
+    assert 'tictactoe_phase_seconds_bucket{phase="ai",le="0.005"} 1' in text
+    assert 'tictactoe_events_total{event="move"} 3' in text
+    path = str(tmp_path / 'metrics.jsonl')
+    metrics.write_jsonl(path)
+    metrics.write_jsonl(path)
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 2 and lines[0]['counters'] == {'move': 3}
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'), reason="needs SIGUSR1")
+def test_sigusr1_toggles_metrics_started_off(monkeypatch):
+    """Without TICTACTOE_METRICS the registry is off until SIGUSR1 arrives."""
+    monkeypatch.delenv('TICTACTOE_METRICS', raising=False)
+    monkeypatch.delenv('TICTACTOE_METRICS_PORT', raising=False)
+    previous = signal.getsignal(signal.SIGUSR1)
+    metrics = Metrics()
+    try:
+        configure_from_env(metrics)
+        assert not metrics.enabled
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert metrics.enabled
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+
+
+def test_game_moves_record_their_phases():
+    """A headless single-player move times the board, win check and AI phases."""
+    METRICS.reset()
+    METRICS.enable()
+    try:
+        game = TicTacToeGame(rng=random.Random(0))
+        game.mode = 'single'
+        game.handle_singleplayer_move(1, 1)
+    finally:
+        METRICS.disable()
+    assert {'board', 'win_check', 'ai'} <= set(METRICS.histograms)
+    assert sum(METRICS.counters.values()) == 1
+    METRICS.reset()
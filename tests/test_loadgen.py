@@ -0,0 +1,51 @@
+"""Check the load generator's think times, seeded runs and record/replay."""
+
+import random
+
+import pytest
+
+from loadgen import load_recording, run, think_time
+
+
+def test_think_time_specs():
+    """Each distribution parses and draws in range; malformed specs raise ValueError."""
+    rng = random.Random(0)
+    assert think_time('none')(rng) == 0.0
+    assert think_time('const:1.5')(rng) == 1.5
+    assert all(2 <= think_time('uniform:2:3')(rng) <= 3 for _ in range(100))
+    assert all(think_time('exp:2')(rng) >= 0 for _ in range(100))
+    assert think_time('lognormal:0:1')(rng) > 0
+    for spec in ('gauss:1', 'const', 'uniform:1', 'exp:x', 'exp:0'):
+        with pytest.raises(ValueError):
+            think_time(spec)
+
+
+def test_runs_are_deterministic_per_seed(tmp_path):
+    """The same seed plays the same games; the virtual clock advances by think time only."""
+    path = str(tmp_path / 'games.jsonl')
+    first = run(players=20, games=3, mode='mixed', think='const:1', seed=4, record=path)
+    second = run(players=20, games=3, mode='mixed', think='const:1', seed=4)
+    assert first['games'] == second['games'] == 60
+    assert first['clicks'] == second['clicks'] > 0
+    assert sum(summary['calls'] for summary in first['latency'].values()) == first['clicks']
+    assert first['memory']['samples'][-1][1] == 0
+    # One step per simulated second: every click plus the check that ends each game
+    busiest = max(sum(len(clicks) for _, clicks in played)
+                  for played in load_recording(path).values())
+    assert first['simulated_seconds'] == second['simulated_seconds'] == busiest + 3
+    with pytest.raises(ValueError):
+        run(players=1, games=1, mode='solo')
+
+
+def test_record_then_replay(tmp_path):
+    """Replaying a recording plays the same clicks and writes the same games back."""
+    recorded = str(tmp_path / 'played.jsonl')
+    replayed = str(tmp_path / 'replayed.jsonl')
+    first = run(players=10, games=2, mode='mixed', think='exp:1', seed=7, record=recorded)
+    games = load_recording(recorded)
+    assert sorted(games) == list(range(10))
+    assert all(len(played) == 2 for played in games.values())
+
+    second = run(recording=games, think='exp:1', seed=7, record=replayed)
+    assert (second['games'], second['clicks']) == (first['games'], first['clicks'])
+    assert load_recording(replayed) == games
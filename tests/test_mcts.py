@@ -0,0 +1,48 @@
+"""Check the MCTS opponent's budgets, reproducibility and tactics."""
+
+import random
+
+import pytest
+
+from engine import BitBoard, O, X
+from mcts import MCTSPlayer, search
+from mnk import MNKBoard
+
+
+def test_search_restores_the_engine_and_counts_every_playout():
+    """Root visits add up to the iteration budget and the position is unchanged."""
+    board = BitBoard(0b000010001, 0b000100000)
+    key = board.position_key()
+    stats = search(board, O, iterations=500, rng=random.Random(1))
+    assert board.position_key() == key
+    assert sum(visits for visits, _ in stats.values()) == 500
+    assert set(stats) == set(board.empty_cells())
+
+
+def test_search_needs_a_budget():
+    """Neither budget given is an error rather than an endless search."""
+    with pytest.raises(ValueError):
+        search(BitBoard(), X)
+    with pytest.raises(ValueError):
+        MCTSPlayer(iterations=None, time_limit=None)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_player_wins_and_blocks(workers):
+    """The player takes an immediate win and otherwise blocks the opponent's."""
+    with MCTSPlayer(iterations=2000, time_limit=None, workers=workers) as player:
+        # O holds 0 and 1; X to move holds 3 and 4 and wins at 5
+        assert player.best_move(BitBoard(0b11000, 0b11), X, random.Random(0)) == 5
+        # X holds 0 and 4 and threatens 8; O must block
+        assert player.best_move(BitBoard(0b10001, 0b100), O, random.Random(0)) == 8
+        board = MNKBoard(4, 4, 3)
+        for cell, player_ in ((5, X), (0, O), (6, X), (15, O)):
+            board.play(cell, player_)
+        assert player.best_move(board, X, random.Random(0)) in (4, 7)
+
+
+def test_iteration_budget_is_reproducible():
+    """Seeds come from the caller's RNG, so a fixed seed gives a fixed move."""
+    with MCTSPlayer(iterations=300, time_limit=None, workers=2) as player:
+        moves = {player.best_move(BitBoard(), X, random.Random(5)) for _ in range(3)}
+    assert len(moves) == 1
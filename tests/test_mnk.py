@@ -0,0 +1,62 @@
+"""Check MNKBoard's incremental win and threat counters against a full rescan."""
+
+import random
+
+import pytest
+
+from brute_force import windows, winner
+from engine import O, X
+from mnk import MNKBoard
+
+
+def _cells(board):
+    return tuple(board.cells)
+
+
+def _threats(cells, lines, player):
+    """Windows each empty cell would complete for player, counted from scratch."""
+    counts = [0] * len(cells)
+    mark = player + 1
+    for line in lines:
+        marks = [cells[cell] for cell in line]
+        if marks.count(mark) == len(line) - 1 and marks.count(0) == 1:
+            counts[line[marks.index(0)]] += 1
+    return counts
+
+
+def _check(board, lines):
+    cells = _cells(board)
+    assert board.winner() == winner(cells, lines)
+    for player in (X, O):
+        expected = _threats(cells, lines, player)
+        for cell in range(len(cells)):
+            if not cells[cell]:
+                assert board.wins_with(cell, player) == (expected[cell] > 0), (cells, cell)
+                assert board._threats[player][cell] == expected[cell]  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('rows, cols, k', [(3, 3, 3), (4, 5, 3), (5, 5, 4), (6, 4, 2)])
+def test_counters_match_rescan(rows, cols, k):
+    """Random games with take-backs keep every counter equal to a rescan."""
+    rng = random.Random(rows * 100 + cols * 10 + k)
+    lines = windows(rows, cols, k)
+    board = MNKBoard(rows, cols, k)
+    for _ in range(20):
+        board.reset()
+        while not board.is_full() and board.winner() is None:
+            if board.moves and rng.random() < 0.2:
+                cell = board.moves[-1]
+                board.undo(cell, board.cells[cell] - 1)
+            else:
+                board.play(rng.choice(board.empty_cells()), board.to_move())
+            _check(board, lines)
+
+
+def test_winner_survives_later_moves():
+    """The first completed line decides the game even if the board fills up."""
+    board = MNKBoard(3, 4, 3)
+    for cell in (0, 4, 1, 5, 2):
+        board.play(cell, board.to_move())
+    assert board.winner() == X
+    board.play(6, O)
+    assert board.winner() == X
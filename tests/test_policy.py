@@ -0,0 +1,94 @@
+"""Check the self-play policy network, its batched inference and the batch evaluator."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import ai
+from engine import BitBoard, O, X
+from mnk import MNKBoard
+from policy import BatchEvaluator, PolicyNet, board_array, load_policy
+from simulate import simulate
+
+
+@pytest.fixture(scope='module')
+def net():
+    """A small 3x3 network after a short training run."""
+    trained = PolicyNet(3, 3, 3, hidden=32, seed=0)
+    trained.train(5000, seed=0)
+    return trained
+
+
+def _losses_as_o(policy_net):
+    def play(boards, player, rng):  # pylint: disable=unused-argument
+        return policy_net.policy(boards, player)
+
+    return simulate(4000, 'random', play, seed=1)['X']
+
+
+def test_training_beats_the_untrained_network(net):
+    """Self-play training cuts the games O loses to random play by more than a third."""
+    assert _losses_as_o(net) < 0.66 * _losses_as_o(PolicyNet(3, 3, 3, hidden=32, seed=0))
+
+
+def test_batched_moves_are_legal_and_match_single_moves(net):
+    """One policy() call over many boards picks legal cells, the same as one board at a time."""
+    rng = np.random.default_rng(2)
+    engines = []
+    for _ in range(200):
+        board = BitBoard()
+        for _ in range(4):
+            board.play(int(rng.choice(board.empty_cells())), board.to_move())
+            if board.winner() is not None:
+                break
+        if board.winner() is None and board.to_move() == X:
+            engines.append(board)
+    boards = board_array(engines)
+    moves = net.policy(boards, X)
+    for engine, move in zip(engines, moves):
+        assert engine.is_free(int(move))
+        assert net.best_move(engine, X) == move
+    probabilities = net.probabilities(boards, X)
+    assert np.allclose(probabilities.sum(axis=1), 1)
+    assert (probabilities[boards != 0] == 0).all()
+
+
+def test_save_and_load_round_trip(net, tmp_path):
+    """A saved network loads with the same shape and the same moves."""
+    path = str(tmp_path / 'net.npz')
+    net.save(path)
+    loaded = PolicyNet.load(path)
+    assert (loaded.rows, loaded.cols, loaded.k, loaded.hidden) == (3, 3, 3, 32)
+    boards = board_array([BitBoard(), BitBoard(0b10000, 0)])
+    assert np.array_equal(loaded.policy(boards, X), net.policy(boards, X))
+
+
+def test_linear_network_on_a_larger_board():
+    """hidden=0 gives a linear model that still plays legal moves on m,n,k boards."""
+    linear = PolicyNet(4, 5, 4, hidden=0, seed=3)
+    linear.train(300, seed=3)
+    board = MNKBoard(4, 5, 4)
+    board.play(7, X)
+    assert board.is_free(linear.best_move(board, O))
+
+
+def test_evaluator_answers_concurrent_requests_in_one_batch(net):
+    """Requests made within one tick share a single evaluation."""
+    evaluator = BatchEvaluator(net, tick=0.01)
+    engines = [BitBoard(1 << cell, 0) for cell in range(9)]
+
+    async def run():
+        return await asyncio.gather(*(evaluator.choose(engine, O) for engine in engines))
+
+    moves = asyncio.run(run())
+    assert evaluator.batches == 1 and evaluator.requests == 9
+    assert moves == [net.best_move(engine, O) for engine in engines]
+
+
+def test_large_boards_are_not_trained_on_demand():
+    """Without a saved file, boards over MAX_AUTO_CELLS raise instead of training for minutes."""
+    with pytest.raises(ValueError, match='python policy.py 6 6 4'):
+        load_policy(6, 6, 4)
+    assert not ai.available('policy', 6, 6, 4)
+    assert ai.available('policy', 4, 4, 3)
@@ -0,0 +1,58 @@
+"""Check the Quiz class and the SQLite question bank it reads from."""
+
+import os
+import subprocess
+import sys
+
+from questionbank import QuestionBank
+from quiz import Quiz
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _questions(count, category='', difficulty=0):
+    return [{"question": f"Q{n}", "choices": ["a", "b", "c", "d"], "answer_index": n % 4,
+             "category": category, "difficulty": difficulty}
+            for n in range(count)]
+
+
+def test_next_question_is_kept_until_answered():
+    """get_next_question peeks; only check_answer moves on to the next question."""
+    quiz = Quiz(iter(_questions(3)))
+    first = quiz.get_next_question()
+    assert quiz.get_next_question() is first
+    assert quiz.check_answer(first, 1)
+    second = quiz.get_next_question()
+    assert second['question'] == 'Q1' and quiz.get_next_question() is second
+    assert not quiz.check_answer(second, 1)
+    quiz.check_answer(quiz.get_next_question(), 3)
+    assert quiz.get_next_question() is None and quiz.get_next_question() is None
+    assert (quiz.score, quiz.question_index) == (2, 3)
+
+
+def test_bank_filters_and_streams_in_batches():
+    """Filters use the indexed columns and iteration reads every matching row once."""
+    bank = QuestionBank(batch_size=4)
+    bank.add_many(_questions(10, 'maths', 1))
+    bank.add_many(_questions(5, 'maths', 2))
+    new_id = bank.add(_questions(1, 'art')[0])
+    assert len(bank) == 16
+    assert bank.count(category='maths') == 15
+    assert bank.count(category='maths', difficulty=2) == 5
+    assert bank.ids(category='art') == [new_id]
+    assert bank.get(new_id)['choices'] == ['a', 'b', 'c', 'd']
+    assert bank.get(new_id + 1) is None
+    streamed = list(bank.iter_questions(difficulty=1))
+    assert [q['id'] for q in streamed] == bank.ids(difficulty=1) == list(range(1, 11))
+    assert Quiz(bank).get_next_question() == bank.get(1)
+    plan = bank._conn.execute(  # pylint: disable=protected-access
+        "EXPLAIN QUERY PLAN SELECT id FROM questions WHERE category = ? AND difficulty = ?",
+        ('maths', 1)).fetchall()
+    assert 'idx_questions_category' in str(plan)
+    bank.close()
+
+
+def test_quiz_imports_without_sqlite():
+    """Only the command line entry point needs the question bank."""
+    code = "import sys, quiz; sys.exit('sqlite3' in sys.modules or 'questionbank' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=False).returncode == 0
@@ -0,0 +1,47 @@
+"""Check the quiz service protocol with concurrent clients on a local socket."""
+
+import asyncio
+import json
+
+from quiz import questions as EXAMPLE_QUESTIONS
+from quiz_server import QuizService
+
+
+def test_concurrent_players_keep_their_own_scores():
+    """Each client gets every question, its own score and a retry after bad input."""
+    service = QuizService(EXAMPLE_QUESTIONS)
+
+    async def player(port, answers):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        messages = [json.loads(await reader.readline())]
+        for answer in answers:
+            writer.write(answer + b'\n')
+            messages.append(json.loads(await reader.readline()))
+            if 'done' not in messages[-1]:
+                messages.append(json.loads(await reader.readline()))
+        writer.close()
+        return messages
+
+    async def run():
+        listener = await asyncio.start_server(service.handle_client, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            right = [player(port, [b'3', b'3']) for _ in range(10)]
+            wrong = [player(port, [b'9', b'1', b'3']) for _ in range(10)]
+            results = await asyncio.gather(*right, *wrong)
+        await asyncio.sleep(0.01)
+        return results[:10], results[10:]
+
+    right, wrong = asyncio.run(run())
+    for messages in right:
+        assert messages[0]['question_index'] == 0
+        assert messages[0]['choices'] == EXAMPLE_QUESTIONS[0]['choices']
+        assert messages[1] == {"correct": True, "score": 1}
+        assert messages[2]['question_index'] == 1
+        assert messages[-1] == {"done": True, "score": 2, "total": 2}
+    for messages in wrong:
+        assert messages[1] == {"error": "answer with 1-4"}
+        assert messages[2] == messages[0]
+        assert messages[3] == {"correct": False, "score": 0}
+        assert messages[-1] == {"done": True, "score": 1, "total": 2}
+    assert service.completed == 20 and service.active == 0
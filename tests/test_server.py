@@ -0,0 +1,92 @@
+"""Check the game server's request handling and its TCP protocol."""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+import server
+from server import GameServer, Session
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_out_of_range_cell_is_reported_as_such():
+    """Cells off the board and taken cells get different errors."""
+    session = Session()
+    assert session.handle('MOVE 9') == 'ERR cell 9 out of range'
+    assert session.handle('MOVE 4').startswith('OK ')
+    assert session.handle('MOVE 4') == 'ERR cell 4 is not free'
+
+
+def test_session_plays_to_the_end():
+    """A game against perfect play ends in a draw or a loss, then refuses moves."""
+    session = Session('perfect')
+    assert session.handle('NEW') == 'OK ......... play'
+    while session.status == 'play':
+        cell = session.render().index('.')
+        assert session.handle(f'MOVE {cell}').startswith('OK ')
+    assert session.status in ('draw', 'o_wins')
+    assert session.handle('MOVE 0') == 'ERR game is over'
+    assert session.handle('NEW nope') == 'ERR unknown ai nope'
+    assert session.handle('QUIT') is None
+
+
+def test_clients_are_served_over_tcp():
+    """Concurrent clients each get their own game and their state is released on QUIT."""
+    game_server = GameServer('perfect', seed=0)
+
+    async def client(port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        replies = []
+        for line in (b'MOVE 4\n', b'BOARD\n', b'QUIT\n'):
+            writer.write(line)
+            replies.append((await reader.readline()).decode().strip())
+        writer.close()
+        return replies
+
+    async def run():
+        listener = await asyncio.start_server(game_server.handle_client, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            results = await asyncio.gather(*(client(port) for _ in range(20)))
+        await asyncio.sleep(0.01)
+        return results
+
+    for moved, board, closed in asyncio.run(run()):
+        assert moved == 'OK O...X.... play 0'
+        assert board == moved[:-2]
+        assert closed == ''
+    assert game_server.active == 0
+    assert len(game_server.pool) == 20
+
+
+def test_preload_leaves_numpy_and_the_network_alone(tmp_path):
+    """Starting a server builds the solver and book only; NumPy is not imported."""
+    path = str(tmp_path / 'test.book')
+    code = ("import sys, book, server; "
+            f"server.load_book = lambda: book.load_book({path!r}); "
+            "server.GameServer().preload(); "
+            "sys.exit('numpy' in sys.modules or 'policy' in sys.modules)")
+    assert subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=False).returncode == 0
+    assert os.path.exists(path)
+
+
+def test_evaluator_is_built_once_off_the_event_loop(monkeypatch):
+    """Requests that arrive while the network loads share one build."""
+    calls = []
+
+    def build():
+        calls.append(threading.current_thread())
+        return object()
+
+    monkeypatch.setattr(server, '_build_evaluator', build)
+    game_server = GameServer('policy')
+
+    async def run():
+        return await asyncio.gather(*(game_server.get_evaluator() for _ in range(5)))
+
+    evaluators = asyncio.run(run())
+    assert len(calls) == 1 and calls[0] is not threading.main_thread()
+    assert all(evaluator is evaluators[0] for evaluator in evaluators)
@@ -0,0 +1,35 @@
+"""Check the negamax solver against brute-force minimax on every reachable 3x3 position."""
+
+from brute_force import after, masks, reachable, solve, windows, winner
+from engine import BitBoard
+from solver import Solver
+
+VALUE = solve(3, 3, 3)
+LINES = windows(3, 3, 3)
+OPEN = sorted(cells for cells in reachable(3, 3, 3)
+              if winner(cells, LINES) is None and not all(cells))
+
+
+def _sign(score):
+    return (score > 0) - (score < 0)
+
+
+def test_value_matches_minimax():
+    """Solver.value has the sign of the minimax value in every open position."""
+    solver = Solver()
+    for cells in OPEN:
+        assert _sign(solver.value(BitBoard(*masks(cells)))) == VALUE(cells), cells
+
+
+def test_best_move_is_optimal():
+    """Solver.best_move keeps the minimax value of every open position."""
+    solver = Solver()
+    for cells in OPEN:
+        move = solver.best_move(BitBoard(*masks(cells)))
+        assert not cells[move]
+        assert -VALUE(after(cells, move)) == VALUE(cells), cells
+
+
+def test_empty_board_is_a_draw():
+    """Perfect play from the empty board draws."""
+    assert Solver().value(BitBoard()) == 0
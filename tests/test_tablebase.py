@@ -0,0 +1,63 @@
+"""Check the retrograde tablebase against brute-force minimax on 3x3."""
+
+import numpy as np
+import pytest
+
+from book import DRAW, LOSS, WIN
+from brute_force import after, masks, reachable, solve, windows, winner
+from engine import BitBoard
+from tablebase import DISTANCE_BITS, DISTANCE_MASK, Tablebase, build_tablebase, generate
+
+VALUE = solve(3, 3, 3)
+LINES = windows(3, 3, 3)
+RESULT = {1: WIN, 0: DRAW, -1: LOSS}
+POSITIONS = reachable(3, 3, 3)
+
+
+def _key(cells):
+    x_bits, o_bits = masks(cells)
+    return x_bits | o_bits << 9
+
+
+def test_generate_labels_every_position():
+    """generate() holds exactly the reachable positions, labelled with their minimax value."""
+    layers = generate(3, 3, 3, workers=1)
+    labels = {}
+    for keys, values in layers:
+        labels.update(zip(keys.tolist(), values.tolist()))
+    assert len(labels) == len(POSITIONS) == 5478
+    for cells in POSITIONS:
+        value = labels[_key(cells)]
+        ended = winner(cells, LINES) is not None or all(cells)
+        assert (value & DISTANCE_MASK == 0) == ended, cells
+        assert value >> DISTANCE_BITS == RESULT[VALUE(cells)], cells
+
+
+@pytest.fixture(scope='module')
+def tablebase(tmp_path_factory):
+    """A 3x3 tablebase written to a temporary file."""
+    path = str(tmp_path_factory.mktemp('tablebase') / 'test.tb')
+    build_tablebase(3, 3, 3, path, workers=1)
+    return Tablebase(path)
+
+
+def test_best_move_is_optimal(tablebase):
+    """Tablebase.best_move keeps the minimax value of every open position."""
+    for cells in POSITIONS:
+        board = BitBoard(*masks(cells))
+        move = tablebase.best_move(board)
+        if winner(cells, LINES) is not None or all(cells):
+            assert move is None
+            continue
+        assert -VALUE(after(cells, move)) == VALUE(cells), cells
+
+
+def test_chunked_generation_matches_a_single_chunk(monkeypatch):
+    """Splitting layers across worker tasks changes nothing in either pass."""
+    whole = generate(3, 4, 3, workers=1)
+    monkeypatch.setattr('tablebase.CHUNK_SIZE', 500)
+    chunked = generate(3, 4, 3, workers=2)
+    assert len(chunked) == len(whole)
+    for (keys, values), (chunk_keys, chunk_values) in zip(whole, chunked):
+        assert np.array_equal(keys, chunk_keys) and np.array_equal(values, chunk_values)
+    assert max(len(keys) for keys, _ in whole) > 10 * 500
@@ -0,0 +1,51 @@
+"""Check undo and redo in headless games."""
+
+import random
+
+from tictactoe import TicTacToeGame
+
+
+def _single_game():
+    game = TicTacToeGame(rng=random.Random(0))
+    game.mode = 'single'
+    return game
+
+
+def test_singleplayer_undo_returns_the_turn_to_the_player():
+    """Undo takes back the computer's reply with the player's move."""
+    game = _single_game()
+    game.handle_singleplayer_move(0, 0)
+    assert game.sign == 2
+    game.undo_move()
+    assert game.sign == 0
+    assert all(cell == ' ' for row in game.board for cell in row)
+    game.handle_singleplayer_move(2, 2)
+    assert game.board[2][2] == 'X'
+    assert game.sign == 2
+
+
+def test_singleplayer_redo_replays_both_moves():
+    """Redo restores the player's move and the computer's reply."""
+    game = _single_game()
+    game.handle_singleplayer_move(0, 0)
+    before = [row[:] for row in game.board]
+    game.undo_move()
+    game.redo_move()
+    assert game.board == before
+    assert game.sign == 2
+
+
+def test_undo_after_a_win_reopens_the_board():
+    """Taking back a winning move unlocks the board and redo locks it again."""
+    game = TicTacToeGame()
+    game.mode = 'multi'
+    for i, j in ((0, 0), (1, 0), (0, 1), (1, 1), (0, 2)):
+        game.handle_multiplayer_move(i, j)
+    assert game.stop_game
+    game.undo_move()
+    assert not game.stop_game
+    game.redo_move()
+    assert game.stop_game
+    game.undo_move()
+    game.handle_multiplayer_move(2, 2)
+    assert game.board[2][2] == 'X'
@@ -0,0 +1,28 @@
+"""Check the tournament runner's reproducibility and its confidence intervals."""
+
+from tournament import run_tournament, wilson_interval
+
+
+def _final(workers):
+    tallies = {}
+    for tally in run_tournament(['random', 'heuristic'], 3000, seed=7,
+                                workers=workers, shard_size=1000):
+        tallies[tally.policy_x, tally.policy_o] = (tally.wins, tally.draws, tally.losses)
+    return tallies
+
+
+def test_results_do_not_depend_on_the_worker_count():
+    """The same seed and shard size give the same tallies on one worker or two."""
+    final = _final(1)
+    assert len(final) == 4
+    assert all(sum(counts) == 3000 for counts in final.values())
+    assert _final(2) == final
+
+
+def test_wilson_interval_brackets_the_proportion():
+    """The interval contains the observed proportion and stays inside [0, 1]."""
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(30, 100)
+    assert 0.0 < low < 0.3 < high < 1.0
+    low, high = wilson_interval(100, 100)
+    assert 0.9 < low < high <= 1.0
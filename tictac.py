@@ -1,12 +1,21 @@
-
 """
 Tic Tac Toe game with GUI interface.
 
 This script allows two players to play Tic Tac Toe on a 3x3 grid.
 It features a graphical interface, win/tie detection, and alternating turns.
+
+tkinter is imported only when a window is opened, so the game logic can be
+imported without a display.
+
+Classes:
+	TicTacToe: Game state and move handling for the two-player board.
+
+Functions:
+	main(): Open the game window and run the event loop.
 """
-# Importing Packages from tkinter
-from tkinter import Button, messagebox, Tk
+# Bitboard engine shared with tictactoe.py
+from engine import BitBoard, PLAYERS, SYMBOLS, SIZE
+from history import MoveLog
 # Initialize the game board buttons
 b = [
     [0, 0, 0],
@@ -21,6 +30,19 @@ states = [
     [0, 0, 0]
 ]
 
+
+def _show_result(title, message):
+    """
+    Announce the end of the game in a message box.
+
+    Args:
+        title (str): Message box title.
+        message (str): Message text.
+    """
+    from tkinter import messagebox  # pylint: disable=import-outside-toplevel
+    messagebox.showinfo(title, message)
+
+
 class TicTacToe:
     """
     A class representing a Tic Tac Toe game with a graphical interface.
@@ -31,10 +53,14 @@ class TicTacToe:
     Attributes:
         current_player (str): The symbol ('X' or 'O') of the current player.
         stop_game (bool): Flag indicating whether the game has ended.
+        engine (BitBoard): Bitboard mirror of states used for win/tie detection.
+        history (MoveLog): Moves played so far, with undo/redo.
     """
     def __init__(self):
         self.current_player = 'X'
         self.stop_game = False
+        self.engine = BitBoard()
+        self.history = MoveLog(self.engine)
 
     def clicked(self, r, c):
         """
@@ -47,11 +73,13 @@ class TicTacToe:
         if self.current_player == "X" and states[r][c] == 0 and not self.stop_game:
             b[r][c].configure(text="X")
             states[r][c] = 'X'
+            self.history.play(SIZE * r + c, PLAYERS['X'])
             self.current_player = 'O'
 
         if self.current_player == 'O' and states[r][c] == 0 and not self.stop_game:
             b[r][c].configure(text='O')
             states[r][c] = "O"
+            self.history.play(SIZE * r + c, PLAYERS['O'])
             self.current_player = "X"
 
         self.check_if_win()
@@ -61,66 +89,46 @@ class TicTacToe:
         Check for a win or tie after each move and display a message box if the game ends.
         """
 
-        # Check rows
-        for row in range(3):
-            if states[row][0] == states[row][1] == states[row][2] != 0:
-                self.stop_game = True
-                messagebox.showinfo("Winner", states[row][0] + " Won!")
-                return
-
-            # Check columns
-            if states[0][row] == states[1][row] == states[2][row] != 0:
-                self.stop_game = True
-                messagebox.showinfo("Winner", states[0][row] + " Won!")
-                return
-
-        # Check diagonals
-        if states[0][0] == states[1][1] == states[2][2] != 0:
+        # Check rows, columns and diagonals
+        player = self.engine.winner()
+        if player is not None:
             self.stop_game = True
-            messagebox.showinfo("Winner", states[0][0] + " Won!")
-            return
-
-        if states[0][2] == states[1][1] == states[2][0] != 0:
-            self.stop_game = True
-            messagebox.showinfo("Winner", states[0][2] + " Won!")
+            _show_result("Winner", SYMBOLS[player] + " Won!")
             return
 
         # Check for tie
-        if all(states[x][y] != 0 for x in range(3) for y in range(3)):
+        if self.engine.is_full():
             self.stop_game = True
-            messagebox.showinfo("Tie", "It's a tie!")
+            _show_result("Tie", "It's a tie!")
 
-# Initialize game
-game = TicTacToe()
 
-# Design window
-#Creating the Canvas
-root = Tk()
-# Title of the window
-root.title("GeeksForGeeks-:Tic Tac Toe")
-root.resizable(0,0)
+def main():
+    """Open the game window and run the tkinter event loop."""
+    # Imported here so the game class loads without a display
+    from tkinter import Button, Tk  # pylint: disable=import-outside-toplevel
 
-#Button
-b = [
-    [0,0,0],
-    [0,0,0],
-    [0,0,0]]
+    # Initialize game
+    game = TicTacToe()
 
-#text for buttons
-states = [
-    [0,0,0],
-    [0,0,0],
-    [0,0,0]]
-
-# Create buttons
-for i in range(3):
-    for j in range(3):
-        b[i][j] = Button(
-            height=4, width=8,
-            font=("Helvetica", "20"),
-            command=lambda r=i, c=j: game.clicked(r, c)
-        )
-        b[i][j].grid(row=i, column=j)
-
-
-root.mainloop()
+    # Design window
+    #Creating the Canvas
+    root = Tk()
+    # Title of the window
+    root.title("GeeksForGeeks-:Tic Tac Toe")
+    root.resizable(0,0)
+
+    # Create buttons
+    for i in range(SIZE):
+        for j in range(SIZE):
+            b[i][j] = Button(
+                height=4, width=8,
+                font=("Helvetica", "20"),
+                command=lambda r=i, c=j: game.clicked(r, c)
+            )
+            b[i][j].grid(row=i, column=j)
+
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()
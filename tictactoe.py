@@ -1,10 +1,12 @@
-
 """
 Tic Tac Toe game with GUI using tkinter.
 
 This script allows users to play Tic Tac Toe in single-player 
 (against computer) or multiplayer mode.
 It features a graphical interface, win/tie detection, and computer AI for single-player mode.
+The board is drawn on one Canvas (see renderer.py) inside a single root
+window that is reused for every game, and the move handlers also run
+without any window for headless use.
 
 Functions:
 	winner(b, l): Check if a player has won.
@@ -22,12 +24,20 @@ Functions:
 
 
 # Standard library imports
+import os
 import random
-from functools import partial
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+
+# Local imports
+from engine import BitBoard, PLAYERS
+from mnk import MNKBoard
+from history import MoveLog, RecordWriter
+from ai import computer_move, available
+from instrumentation import METRICS, configure_from_env
+from renderer import BoardCanvas
 
-# Third-party imports
-from tkinter import Tk, Button, DISABLED, ACTIVE, messagebox
+# Milliseconds between checks for the computer's move, one frame at 60 fps
+POLL_INTERVAL = 16
 
 class TicTacToeGame:
     """
@@ -38,21 +48,75 @@ class TicTacToeGame:
     both player vs player and player vs computer gameplay modes.
 
     Attributes:
-        board (list): 3x3 game board representing the current game state
+        board (list): rows x cols game board representing the current game state
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+        k (int): Marks in a row needed to win
+        engine: Mirror of board used for win detection and the AI; a BitBoard
+            for the classic 3x3 game, otherwise an MNKBoard
+        history (MoveLog): Moves played so far, with undo/redo
+        rng: Random source for the heuristic AI's tie-breaks and MCTS seeds
         sign (int): Counter to track player turns (even=X, odd=O)
-        button (list): 2D list of tkinter Button widgets for the game board GUI
+        root: The tkinter root window, created by start_game(); None when headless
+        view (BoardCanvas): Canvas the board is drawn on, or None when headless
+        menu: Frame holding the main menu buttons
+        mode (str): 'single' or 'multi' while a game is shown, otherwise None
+        ai (str): Computer strategy, 'heuristic' (rule based), 'perfect' (solver),
+            'book' (precomputed move table), 'mcts' (Monte Carlo Tree Search),
+            'tablebase' (retrograde-analysis table for boards of up to 16 cells)
+            or 'policy' (network trained by self-play); the first move with
+            either builds its file if missing, up to about 11 s on a 4x4 board
+        executor (ThreadPoolExecutor): Background thread that computes the
+            computer's moves in single-player mode, started on first use
+        pending (Future): The computer move being computed, or None
+        archive (str): File every finished game is appended to as a
+            history.GameRecord, or None
     """
 
-    def __init__(self):
-        """Initialize an empty game board and turn counter."""
+    def __init__(self, ai='heuristic', rows=3, cols=3, k=3, rng=None, archive=None):
+        """
+        Initialize an empty game board and turn counter.
+
+        Args:
+            ai (str, optional): Computer strategy, 'heuristic', 'perfect',
+                'book', 'mcts', 'tablebase' or 'policy'. Defaults to 'heuristic'.
+            rows (int, optional): Number of rows. Defaults to 3.
+            cols (int, optional): Number of columns. Defaults to 3.
+            k (int, optional): Marks in a row needed to win. Defaults to 3.
+            rng (random.Random, optional): Random source for the AI, for
+                reproducible games. Defaults to the global random module.
+            archive (str, optional): Game record file to append finished
+                games to. Defaults to None, keeping no records.
+        Raises:
+            ValueError: If ai cannot play on the requested board (see ai.available).
+        """
+        classic = (rows, cols, k) == (3, 3, 3)
+        if not available(ai, rows, cols, k):
+            raise ValueError(f"ai={ai!r} is not available on a {rows}x{cols} board with k={k}")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
         # Creates an empty board
-        self.board = [[" " for x in range(3)] for y in range(3)]
+        self.board = [[" " for x in range(cols)] for y in range(rows)]
+        # Engine kept in sync with self.board by place()
+        self.engine = BitBoard() if classic else MNKBoard(rows, cols, k)
+        self.history = MoveLog(self.engine)
         # Turn counter: even=X's turn, odd=O's turn
         self.sign = 0
-        # Will store the GUI buttons
-        self.button = None
+        # GUI, built by start_game(); the handlers skip drawing while it is None
+        self.root = None
+        self.view = None
+        self.menu = None
+        self.mode = None
         # Flag to indicate if the game should stop (for single-player mode)
         self.stop_game = False
+        # Strategy used by get_computer_move
+        self.ai = ai
+        self.rng = rng if rng is not None else random
+        # Computer moves run off the Tk thread so the window stays responsive
+        self.executor = None
+        self.pending = None
+        self.archive = archive
 
     def winner(self, l, board=None):
         """
@@ -64,48 +128,159 @@ class TicTacToeGame:
         Returns:
             bool: True if the player has won, False otherwise.
         """
-        b = board if board is not None else self.board
-        return ((b[0][0] == l and b[0][1] == l and b[0][2] == l) or
-                (b[1][0] == l and b[1][1] == l and b[1][2] == l) or
-                (b[2][0] == l and b[2][1] == l and b[2][2] == l) or
-                (b[0][0] == l and b[1][0] == l and b[2][0] == l) or
-                (b[0][1] == l and b[1][1] == l and b[2][1] == l) or
-                (b[0][2] == l and b[1][2] == l and b[2][2] == l) or
-                (b[0][0] == l and b[1][1] == l and b[2][2] == l) or
-                (b[0][2] == l and b[1][1] == l and b[2][0] == l))
+        if board is None:
+            engine = self.engine
+        elif len(board) == len(board[0]) == self.k == 3:
+            engine = BitBoard.from_rows(board)
+        else:
+            engine = MNKBoard.from_rows(board, self.k)
+        return engine.has_won(PLAYERS[l])
+
+    def place(self, i, j, l):
+        """
+        Put player l's symbol on the cell at (i, j).
+
+        Args:
+            i (int): Row index.
+            j (int): Column index.
+            l (str): The player's symbol ('X' or 'O').
+        """
+        self.board[i][j] = l
+        self.history.play(self.cols * i + j, PLAYERS[l])
+
+    def undo_move(self, *_args):
+        """
+        Take back the last move, clearing its cell if the board is shown.
+
+        A computer move still being computed is cancelled first. In
+        single-player mode the computer's reply and the player's move are
+        taken back together, so it is the player's turn again. Usable as a
+        Tk event handler.
+
+        Returns:
+            list: The [row, col] of the last cell cleared, or None if there was no move.
+        """
+        self.cancel_computer_move()
+        cleared = self._step(self.history.undo, " ", -1)
+        if cleared is not None and self.mode == 'single' and self.sign % 2:
+            cleared = self._step(self.history.undo, " ", -1) or cleared
+        self._draw()
+        return cleared
+
+    def redo_move(self, *_args):
+        """
+        Replay the last undone move, redrawing its cell if the board is shown.
+
+        In single-player mode the computer's reply is replayed with the
+        player's move. Usable as a Tk event handler.
+
+        Returns:
+            list: The [row, col] of the last cell replayed, or None if there was nothing to redo.
+        """
+        if self.pending is not None:
+            return None
+        replayed = self._step(self.history.redo, None, 1)
+        if replayed is not None and self.mode == 'single' and self.sign % 2:
+            replayed = self._step(self.history.redo, None, 1) or replayed
+        self._draw()
+        return replayed
+
+    def _step(self, action, symbol, turn):
+        """
+        Apply one undo or redo to the board and turn counter.
 
-    def handle_multiplayer_move(self, i, j, gb, l1, l2):
+        Args:
+            action (callable): self.history.undo or self.history.redo.
+            symbol (str): Symbol to put on the cell, or None for the mover's symbol.
+            turn (int): -1 for an undo, 1 for a redo.
+        Returns:
+            list: The [row, col] changed, or None if there was nothing to do.
+        """
+        move = action()
+        if move is None:
+            return None
+        i, j = divmod(move[0], self.cols)
+        self.board[i][j] = "XO"[move[1]] if symbol is None else symbol
+        self.sign += turn
+        # A take-back reopens a finished game; a replay may finish it again
+        self.stop_game = self.engine.winner() is not None or self.engine.is_full()
+        return [i, j]
+
+    def new_game(self):
+        """
+        Clear the board for a new game, keeping the window and engine objects.
+        """
+        self.cancel_computer_move()
+        for row in self.board:
+            row[:] = [" "] * self.cols
+        self.engine.reset()
+        self.history = MoveLog(self.engine)
+        self.sign = 0
+        self.stop_game = False
+        self._draw()
+
+    def _draw(self):
+        """
+        Bring the board view, if any, up to date with the game state.
+        """
+        if self.view is not None:
+            self.view.render(self.board)
+            self.view.set_turn(self.sign % 2)
+
+    def _announce(self, result):
+        """
+        End the game, show the result and go back to the menu.
+
+        Args:
+            result (tuple): (title, message) for the end-of-game box.
+        """
+        self.stop_game = True
+        if self.archive is not None:
+            with RecordWriter(self.archive) as writer:
+                writer.write(self.history.to_record())
+        if self.root is None:
+            return
+        from tkinter import messagebox  # pylint: disable=import-outside-toplevel
+        messagebox.showinfo(*result)
+        self.show_menu()
+
+    def handle_multiplayer_move(self, i, j):
         """
         Handle a player's move in multiplayer mode, update board and check for win/tie.
 
+        When instrumentation is enabled, the time spent on the board, the
+        win/tie checks and the GUI is recorded per phase.
+
         Args:
             i (int): Row index.
             j (int): Column index.
-            gb: Game board window.
-            l1: Player 1 label/button.
-            l2: Player 2 label/button.
         """
+        if self.stop_game:
+            return
+        timer = METRICS.timer()
         if self.board[i][j] == ' ':
-            if self.sign % 2 == 0:
-                l1.config(state=DISABLED)
-                l2.config(state=ACTIVE)
-                self.board[i][j] = "X"
-            else:
-                l2.config(state=DISABLED)
-                l1.config(state=ACTIVE)
-                self.board[i][j] = "O"
+            symbol = "X" if self.sign % 2 == 0 else "O"
+            self.place(i, j, symbol)
             self.sign += 1
-            self.button[i][j].config(text=self.board[i][j])
+            if timer:
+                timer.lap('board')
+            self._draw()
+            if timer:
+                timer.lap('gui')
 
         if self.winner("X"):
-            gb.destroy()
-            messagebox.showinfo("Winner", "Player 1 won the match")
+            result = ("Winner", "Player 1 won the match")
         elif self.winner("O"):
-            gb.destroy()
-            messagebox.showinfo("Winner", "Player 2 won the match")
+            result = ("Winner", "Player 2 won the match")
         elif self.is_full():
-            gb.destroy()
-            messagebox.showinfo("Tie Game", "Tie Game")
+            result = ("Tie Game", "Tie Game")
+        else:
+            result = None
+        if timer:
+            timer.lap('win_check')
+            timer.done('multiplayer_move')
+        if result:
+            self._announce(result)
 
     def is_free(self, i, j):
         """
@@ -117,7 +292,7 @@ class TicTacToeGame:
         Returns:
             bool: True if cell is free, False otherwise.
         """
-        return self.board[i][j] == " "
+        return self.engine.is_free(self.cols * i + j)
 
     def is_full(self):
         """
@@ -126,213 +301,246 @@ class TicTacToeGame:
         Returns:
             bool: True if board is full, False otherwise.
         """
-        for row in self.board:
-            if ' ' in row:
-                return False
-        return True
+        return self.engine.is_full()
 
-    def create_multiplayer_board(self, game_board, l1, l2):
+    def get_computer_move(self, engine=None):
         """
-        Create the multiplayer game board GUI.
-
-        Args:
-            game_board: The main game window.
-            l1: Player 1 label/button.
-            l2: Player 2 label/button.
-        """
-        self.button = []
-        for i in range(3):
-            m = 3+i
-            self.button.append([])
-            for j in range(3):
-                get_t = partial(self.handle_multiplayer_move, i, j, game_board, l1, l2)
-                self.button[i].append(
-                    Button(
-                        game_board,
-                        bd=5,
-                        command=get_t,
-                        height=4,
-                        width=8
-                    )
-                )
-                self.button[i][j].grid(row=m, column=j)
-        game_board.mainloop()
-
-    def get_computer_move(self):
-        """
-        Decide the computer's next move using basic AI.
-        
-        The AI follows these rules in order:
+        Decide the computer's next move.
+
+        With ai='perfect' the move comes from the negamax solver and with
+        ai='book' from the precomputed move table; both are never losing.
+        With ai='mcts' it comes from a time-budgeted tree search, which also
+        works on boards too large to solve, and with ai='tablebase' from the
+        endgame tablebase, which plays small boards such as 4x4 perfectly.
+        With ai='policy' a network trained by self-play picks the move.
+        Otherwise the basic AI follows these rules in order:
         1. Win if possible
         2. Block opponent's win
         3. Take center if free
         4. Take a corner if free
         5. Take any edge
+        6. Take any cell next to a mark (larger boards only)
 
+        Args:
+            engine (optional): Position to decide on. Defaults to the game's
+                engine; background moves pass a copy so the search never
+                shares a board with the Tk thread.
         Returns:
             list: The [row, col] of the next move, or None if no moves left.
         """
-        possible_moves = []
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == ' ':
-                    possible_moves.append([i, j])
-
-        if not possible_moves:
+        if engine is None:
+            engine = self.engine
+        cell = computer_move(engine, PLAYERS['O'], self.ai, self.rng)
+        if cell is None:
             return None
+        return list(divmod(cell, self.cols))
 
-        # Check for winning move or blocking opponent's win
-        for symbol in ['O', 'X']:
-            for move in possible_moves:
-                board_copy = deepcopy(self.board)
-                board_copy[move[0]][move[1]] = symbol
-                if self.winner(symbol, board_copy):
-                    return move
-
-        # Take center if available
-        if [1, 1] in possible_moves:
-            return [1, 1]
-
-        # Take corners
-        corners = [move for move in possible_moves
-                  if move in [[0, 0], [0, 2], [2, 0], [2, 2]]]
-        if corners:
-            return corners[random.randint(0, len(corners)-1)]
-
-        # Take edges
-        edges = [move for move in possible_moves
-                if move in [[0, 1], [1, 0], [1, 2], [2, 1]]]
-        if edges:
-            return edges[random.randint(0, len(edges)-1)]
-
-        return None
-
-    def handle_singleplayer_move(self, i, j, gb, l1, l2):
+    def handle_singleplayer_move(self, i, j):
         """
         Handle a move in single-player mode, update board, check 
         for win/tie, and trigger computer move.
+
+        With a window open, the computer's reply is computed on a background
+        thread and applied by poll_computer_move(), so the window keeps
+        redrawing and handling events while the AI thinks; clicks are ignored
+        until the reply lands. Without a window the reply is computed inline.
+
+        When instrumentation is enabled, the time spent on the board, the
+        win/tie checks, the AI and the GUI is recorded per phase.
+
         Args:
             i (int): Row index.
             j (int): Column index.
-            gb: Game board window.
-            l1: Player label/button.
-            l2: Computer label/button.
         """
-        if self.board[i][j] == ' ' and not self.stop_game:
+        if self.board[i][j] == ' ' and not self.stop_game and self.pending is None:
             # Player's move
             if self.sign % 2 == 0:
-                l1.config(state=DISABLED)
-                l2.config(state=ACTIVE)
-                self.board[i][j] = "X"
-                self.button[i][j].config(text="X")
+                timer = METRICS.timer()
+                self.place(i, j, "X")
                 self.sign += 1
+                if timer:
+                    timer.lap('board')
+                self._draw()
+                if timer:
+                    timer.lap('gui')
 
                 # Check if player won or game is tied
                 if self.winner("X"):
-                    gb.destroy()
-                    messagebox.showinfo("Winner", "Player won the match")
-                    return
-                if self.is_full():
-                    gb.destroy()
-                    messagebox.showinfo("Tie Game", "Tie Game")
-                    return
+                    result = ("Winner", "Player won the match")
+                elif self.is_full():
+                    result = ("Tie Game", "Tie Game")
+                else:
+                    result = None
+                if timer:
+                    timer.lap('win_check')
 
                 # Computer's move
-                move = self.get_computer_move()
-                if move:
-                    self.button[move[0]][move[1]].config(state=DISABLED)
-                    self.board[move[0]][move[1]] = "O"
-                    self.button[move[0]][move[1]].config(text="O")
-                    self.sign += 1
+                if result is not None:
+                    self._end_singleplayer_move(result, timer)
+                elif self.root is None:
+                    self._apply_computer_move(self.get_computer_move(), timer)
+                else:
+                    self.start_computer_move(timer)
+
+    def start_computer_move(self, timer=None):
+        """
+        Start computing the computer's move in the background.
 
-                    # Check if computer won
-                    if self.winner("O"):
-                        gb.destroy()
-                        messagebox.showinfo("Winner", "Computer won the match")
+        Args:
+            timer (PhaseTimer, optional): Timer of the move being handled.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = self.executor.submit(self.get_computer_move, self.engine.copy())
+        self.root.after(POLL_INTERVAL, self.poll_computer_move, timer)
 
-    def create_singleplayer_board(self, game_board, l1, l2):
+    def poll_computer_move(self, timer=None):
         """
-        Create the single-player game board GUI.
+        Apply the computer's move if it is ready, otherwise check again later.
 
         Args:
-            game_board: The main game window.
-            l1: Player label/button.
-            l2: Computer label/button.
-        """
-        self.button = []
-        for i in range(3):
-            m = 3+i
-            self.button.append([])
-            for j in range(3):
-                get_t = partial(self.handle_singleplayer_move, i, j, game_board, l1, l2)
-                self.button[i].append(
-                    Button(
-                        game_board,
-                        bd=5,
-                        command=get_t,
-                        height=4,
-                        width=8
-                    )
-                )
-                self.button[i][j].grid(row=m, column=j)
-        game_board.mainloop()
+            timer (PhaseTimer, optional): Timer of the move being handled.
+        """
+        future = self.pending
+        if future is None or future.cancelled():
+            # Cancelled by cancel_computer_move()
+            return
+        if not future.done():
+            self.root.after(POLL_INTERVAL, self.poll_computer_move, timer)
+            return
+        self.pending = None
+        self._apply_computer_move(future.result(), timer)
+
+    def cancel_computer_move(self, *_args):
+        """
+        Drop the computer move being computed, if any; usable as a Tk event handler.
 
-    # Game initialization methods
+        A search that has already started runs to the end of its budget in
+        the background, but its result is discarded.
+        """
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
 
+    def _apply_computer_move(self, move, timer):
+        """
+        Play the computer's move and check whether it won.
 
-    def start_singleplayer(self, menu):
+        Args:
+            move (list): [row, col] from get_computer_move(), or None.
+            timer (PhaseTimer): Timer of the move being handled, or None.
         """
-        Initialize and start a single-player game against the computer.
+        if timer:
+            timer.lap('ai')
+        result = None
+        if move:
+            self.place(move[0], move[1], "O")
+            self.sign += 1
+            if timer:
+                timer.lap('board')
+            self._draw()
+            if timer:
+                timer.lap('gui')
+
+            # Check if computer won
+            if self.winner("O"):
+                result = ("Winner", "Computer won the match")
+            if timer:
+                timer.lap('win_check')
+        self._end_singleplayer_move(result, timer)
+
+    def _end_singleplayer_move(self, result, timer):
+        """
+        Finish handling a single-player move, announcing the result if the game ended.
 
         Args:
-            menu: The main menu window.
+            result (tuple): (title, message) for the end-of-game box, or None.
+            timer (PhaseTimer): Timer of the move being handled, or None.
         """
-        menu.destroy()
-        game_board = Tk()
-        game_board.title("Tic Tac Toe")
+        if timer:
+            timer.done('singleplayer_move')
+        if result:
+            self._announce(result)
+
+    # Game initialization methods
+
 
-        # Create player buttons/labels
-        l1 = Button(game_board, text="Player : X", width=10)
-        l1.grid(row=1, column=1)
-        l2 = Button(game_board, text="Computer : O", width=10, state=DISABLED)
-        l2.grid(row=2, column=1)
+    def handle_click(self, i, j):
+        """
+        Route a click on the board to the handler of the current mode.
+
+        Args:
+            i (int): Row index.
+            j (int): Column index.
+        """
+        if self.mode == 'single':
+            self.handle_singleplayer_move(i, j)
+        elif self.mode == 'multi':
+            self.handle_multiplayer_move(i, j)
 
-        # Initialize game board
-        self.create_singleplayer_board(game_board, l1, l2)
+    def start_singleplayer(self):
+        """
+        Initialize and start a single-player game against the computer.
+        """
+        self._show_board('single', "Player : X", "Computer : O")
 
     # Initialize the game board for multiplayer mode
 
 
-    def start_multiplayer(self, menu):
+    def start_multiplayer(self):
         """
         Initialize and start a multiplayer game.
-
-        Args:
-            menu: The main menu window.
         """
-        menu.destroy()
-        game_board = Tk()
-        game_board.title("Tic Tac Toe")
+        self._show_board('multi', "Player 1 : X", "Player 2 : O")
 
-        # Create player buttons/labels
-        l1 = Button(game_board, text="Player 1 : X", width=10)
-        l1.grid(row=1, column=1)
-        l2 = Button(game_board, text="Player 2 : O", width=10, state=DISABLED)
-        l2.grid(row=2, column=1)
+    def _show_board(self, mode, x_label, o_label):
+        """
+        Swap the menu for a fresh board in the same window.
 
-        # Initialize game board
-        self.create_multiplayer_board(game_board, l1, l2)
+        Args:
+            mode (str): 'single' or 'multi'.
+            x_label (str): Turn label for X.
+            o_label (str): Turn label for O.
+        """
+        self.mode = mode
+        self.menu.pack_forget()
+        # Let the window take the board's natural size
+        self.root.geometry("")
+        self.view.set_labels(x_label, o_label)
+        self.new_game()
+        self.view.show()
+
+    def show_menu(self):
+        """
+        Hide the board and show the main menu.
+        """
+        self.cancel_computer_move()
+        self.mode = None
+        self.view.hide()
+        self.root.geometry("250x250")
+        self.menu.pack()
 
     def start_game(self):
         """
         Launch the main menu and handle user selection for game mode or exit.
+
+        The root window, menu and board canvas are built once here and
+        reused for every game until the user exits.
         """
-        menu = Tk()
-        menu.geometry("250x250")
-        menu.title("Tic Tac Toe")
+        from tkinter import Tk, Frame, Button  # pylint: disable=import-outside-toplevel
+
+        self.root = Tk()
+        self.root.title("Tic Tac Toe")
+        self.menu = Frame(self.root)
+        self.view = BoardCanvas(self.root, self.rows, self.cols, self.handle_click)
+        # Closing the window abandons any move the computer is still computing
+        self.root.bind('<Destroy>', self.cancel_computer_move, add='+')
+        # Ctrl+Z takes back a move and Ctrl+Y replays it
+        self.root.bind('<Control-z>', self.undo_move)
+        self.root.bind('<Control-y>', self.redo_move)
 
         # Create menu buttons
-        head = Button(menu,
+        head = Button(self.menu,
                     text="---Welcome to tic-tac-toe---",
                     activeforeground='red',
                     activebackground="yellow",
@@ -342,9 +550,9 @@ class TicTacToeGame:
                     font='summer',
                     bd=5)
 
-        b1 = Button(menu,
+        b1 = Button(self.menu,
                     text="Single Player",
-                    command=lambda: self.start_singleplayer(menu),
+                    command=self.start_singleplayer,
                     activeforeground='red',
                     activebackground="yellow",
                     bg="red",
@@ -353,9 +561,9 @@ class TicTacToeGame:
                     font='summer',
                     bd=5)
 
-        b2 = Button(menu,
+        b2 = Button(self.menu,
                     text="Multi Player",
-                    command=lambda: self.start_multiplayer(menu),
+                    command=self.start_multiplayer,
                     activeforeground='red',
                     activebackground="yellow",
                     bg="red",
@@ -364,9 +572,9 @@ class TicTacToeGame:
                     font='summer',
                     bd=5)
 
-        b3 = Button(menu,
+        b3 = Button(self.menu,
                     text="Exit",
-                    command=menu.quit,
+                    command=self.root.quit,
                     activeforeground='red',
                     activebackground="yellow",
                     bg="red",
@@ -381,10 +589,14 @@ class TicTacToeGame:
         b2.pack(side='top')
         b3.pack(side='top')
 
-        menu.mainloop()
+        self.show_menu()
+        self.root.mainloop()
 
 
 # Initialize and start game
 if __name__ == '__main__':
-    game = TicTacToeGame()
+    configure_from_env()
+    # Finished games are archived when TICTACTOE_ARCHIVE names a file
+    game = TicTacToeGame(archive=os.environ.get('TICTACTOE_ARCHIVE'))
     game.start_game()
+    METRICS.write_jsonl()
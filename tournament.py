@@ -0,0 +1,188 @@
+"""
+tournament.py
+
+Multi-process self-play tournament between Tic Tac Toe policies.
+
+Every ordered pairing of the chosen policies plays the requested number of
+games. Games are split into shards that run on a ProcessPoolExecutor, each
+with its own RNG stream spawned from one root seed, so a run is reproducible
+for a given seed and shard size no matter how many workers execute it.
+Tallies are updated as shards finish and reported with 95% Wilson score
+confidence intervals.
+
+Usage:
+    python tournament.py [--policies NAME ...] [--games N] [--seed SEED] [--workers N]
+
+Classes:
+	Tally: Running win/draw/loss counts for one pairing.
+
+Functions:
+	wilson_interval(successes, trials, z): Confidence interval for a proportion.
+	run_tournament(policies, games, seed, workers, shard_size): Yield tallies as shards finish.
+"""
+
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from book import load_book
+from simulate import POLICIES, simulate
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """
+    Return the Wilson score interval for a binomial proportion.
+
+    Args:
+        successes (int): Number of successes.
+        trials (int): Number of trials.
+        z (float, optional): Normal quantile; 1.96 gives 95%. Defaults to 1.96.
+    Returns:
+        tuple: (low, high) bounds in [0, 1].
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class Tally:
+    """
+    Running results of one pairing, from X's point of view.
+
+    Attributes:
+        policy_x (str): Policy playing X (moves first).
+        policy_o (str): Policy playing O.
+        wins (int): Games won by X.
+        draws (int): Drawn games.
+        losses (int): Games won by O.
+    """
+
+    def __init__(self, policy_x, policy_o):
+        """
+        Initialize an empty tally.
+
+        Args:
+            policy_x (str): Policy playing X.
+            policy_o (str): Policy playing O.
+        """
+        self.policy_x = policy_x
+        self.policy_o = policy_o
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    @property
+    def games(self):
+        """int: Games recorded so far."""
+        return self.wins + self.draws + self.losses
+
+    def add(self, results):
+        """
+        Add the results of a finished shard.
+
+        Args:
+            results (dict): Counts under 'X', 'O' and 'draw', as returned by simulate().
+        """
+        self.wins += results['X']
+        self.draws += results['draw']
+        self.losses += results['O']
+
+    def summary(self):
+        """
+        Format the tally with 95% confidence intervals.
+
+        Returns:
+            str: One line per pairing.
+        """
+        parts = []
+        for label, count in (('W', self.wins), ('D', self.draws), ('L', self.losses)):
+            low, high = wilson_interval(count, self.games)
+            parts.append(f"{label} {count / max(self.games, 1):6.2%} [{low:6.2%}, {high:6.2%}]")
+        return f"{self.policy_x:>10} vs {self.policy_o:<10} n={self.games:<10} " + "  ".join(parts)
+
+
+def _play_shard(policy_x, policy_o, games, seed):
+    """
+    Play one shard of games in a worker process.
+
+    Args:
+        policy_x (str): Policy name for X.
+        policy_o (str): Policy name for O.
+        games (int): Games in the shard.
+        seed (numpy.random.SeedSequence): The shard's RNG stream.
+    Returns:
+        tuple: (policy_x, policy_o, results dict)
+    """
+    return policy_x, policy_o, simulate(games, policy_x, policy_o, seed=seed)
+
+
+def run_tournament(policies, games, seed=None, workers=None, shard_size=100_000):
+    """
+    Play every ordered pairing of policies and yield updated tallies as shards finish.
+
+    Args:
+        policies (list): Policy names registered in simulate.POLICIES.
+        games (int): Games per pairing.
+        seed (int, optional): Root seed for a reproducible run. Defaults to None.
+        workers (int, optional): Worker processes. Defaults to the CPU count.
+        shard_size (int, optional): Games per shard. Defaults to 100,000.
+    Yields:
+        Tally: The tally of the pairing whose shard just finished.
+    Raises:
+        ValueError: If a policy name is not registered.
+    """
+    for name in policies:
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy {name!r}; choose from {sorted(POLICIES)}")
+
+    # Build the book and the network here, once: workers that found the file
+    # missing would each generate the same one and race on writing it
+    if 'solver' in policies:
+        load_book()
+    if 'policy' in policies:
+        from policy import load_policy  # pylint: disable=import-outside-toplevel
+        load_policy(3, 3, 3)
+
+    tallies = {}
+    shards = []
+    for policy_x in policies:
+        for policy_o in policies:
+            tallies[policy_x, policy_o] = Tally(policy_x, policy_o)
+            for start in range(0, games, shard_size):
+                shards.append((policy_x, policy_o, min(shard_size, games - start)))
+
+    seeds = np.random.SeedSequence(seed).spawn(len(shards))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_play_shard, *shard, shard_seed)
+                   for shard, shard_seed in zip(shards, seeds)]
+        for future in as_completed(futures):
+            policy_x, policy_o, results = future.result()
+            tally = tallies[policy_x, policy_o]
+            tally.add(results)
+            yield tally
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a self-play tournament between policies.")
+    parser.add_argument('--policies', nargs='+', default=sorted(POLICIES),
+                        choices=sorted(POLICIES), help="policies to include")
+    parser.add_argument('--games', type=int, default=1_000_000, help="games per pairing")
+    parser.add_argument('--seed', type=int, default=None, help="root random seed")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    parser.add_argument('--shard-size', type=int, default=100_000, help="games per shard")
+    args = parser.parse_args()
+
+    final = {}
+    for update in run_tournament(args.policies, args.games, args.seed,
+                                 args.workers, args.shard_size):
+        final[update.policy_x, update.policy_o] = update
+        print(update.summary(), flush=True)
+    print()
+    for pairing in sorted(final):
+        print(final[pairing].summary())
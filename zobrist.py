@@ -0,0 +1,37 @@
+"""
+zobrist.py
+
+Zobrist keys for hashing board positions incrementally.
+
+Every (player, cell) pair gets a fixed random 64-bit number, and a position's
+key is the XOR of the numbers of its marks. Playing or undoing a move changes
+the key with a single XOR, so engines can keep it up to date at no real cost.
+Tables are generated from a fixed seed per board size, so keys agree across
+processes and runs.
+
+Functions:
+	zobrist_keys(cells): Return the shared key table for a board of that many cells.
+"""
+
+import random
+
+SEED = 0x7A0B
+
+_TABLES = {}
+
+
+def zobrist_keys(cells):
+    """
+    Return the key table for a board with the given number of cells.
+
+    Args:
+        cells (int): Number of cells on the board.
+    Returns:
+        tuple: keys[player][cell], 64-bit ints indexed by X/O and cell.
+    """
+    table = _TABLES.get(cells)
+    if table is None:
+        rng = random.Random(SEED * 1_000_003 + cells)
+        table = tuple(tuple(rng.getrandbits(64) for _ in range(cells)) for _ in range(2))
+        _TABLES[cells] = table
+    return table